@@ -1,49 +1,32 @@
+import rna_fold
+import rna_structure
+
+
 def parens(dotpar):
     """Checks dot-parenthesis for valid number of open/close parens"""
     return dotpar.count('(') == dotpar.count(')')
 
 
 def dotparen_to_bp(dotpar):
-    # Declare variables
-    openpar = []
-    closepar = []
-    mylist = []
-    mytuple = ()
-    # USE ENUMERATE!!!!!!!!
-    for i in range(0, len(dotpar)):
-        if dotpar[i] == '(':
-            openpar += str(i)
-        elif dotpar[i] == ')':
-            closepar += str(i)
-    i = 0
-    count = len(openpar)
-    while i < count:
-        mytuple = (openpar.pop(0), closepar.pop())
-        mylist.append(mytuple)
-        i += 1
-    return tuple(mylist)
+    """Tuple of (i, j) base pairs of a dot-paren structure"""
+    return tuple(rna_structure.base_pairs(dotpar))
 
 
 def valid_parenbp(seq, a, wobble=True):
     if wobble is True:
-        return seq[a[0]] + seq[a[1]] in ('GC', 'CG', 'AT', 'TA', 'GU', 'UG')
+        return seq[a[0]] + seq[a[1]] in ('GC', 'CG', 'AT', 'TA', 'AU', 'UA',
+                                         'GU', 'UG')
     else:
-        return seq[a[0]] + seq[a[1]] in ('GC', 'CG', 'AT', 'TA')
-
+        return seq[a[0]] + seq[a[1]] in ('GC', 'CG', 'AT', 'TA', 'AU', 'UA')
 
-def sterics(dotparen):
-#   Need to calulate a difference between two coordinates
-#    if '(..)' in dotparen:
-#        return False
 
 def rna_ss_validator(seq, sec_struc, wobble=True):
-    if parens(sec_struc) == False:
-        return False
-    if sterics(sec_struc) == False:
-        return False
-    for i in range(0, len(dotparen_to_bp(sec_struc))):
-        print(valid_parenbp(*dotparen_to_bp(sec_struc)[i]))
-    return True
+    return rna_structure.rna_ss_validator(seq, sec_struc, wobble=wobble)
+
 
 rna_ss_validator('GCAUCUAUGC', '(((....)))')
-sterics('(((....)))')
+
+
+# Predict a structure and check it
+struc, energy = rna_fold.fold('GCAUCUAUGC')
+rna_ss_validator('GCAUCUAUGC', struc)
@@ -1,17 +1,7 @@
 import os
 
-
-def gc_map(seq, block_size, gc_thresh):
-    seq = seq.lower()
-    dnastr = ''
-    for i in range(0, len(seq) // block_size * block_size, block_size):
-        g_con = seq[i: i + block_size].count('g')
-        c_con = seq[i: i + block_size].count('c')
-        if (g_con + c_con) / block_size > gc_thresh:
-            dnastr += seq[i: i+block_size].upper()
-        else:
-            dnastr += seq[i: i+block_size].lower()
-    return dnastr
+import fasta
+import gc_profile
 
 
 def sixty_chunks(seq):
@@ -21,14 +11,9 @@ def sixty_chunks(seq):
     return dna_data
 
 
-dna_string = ''
-
-with open('data/salmonella_spi1_region.fna', 'r') as f:
-    for i, line in enumerate(f):
-        if i > 0:
-            dna_string += line.rstrip()
+dna_string = fasta.read_fasta_seq('data/salmonella_spi1_region.fna')
 
-dna_string = gc_map(dna_string, 1000, 0.45)
+dna_string = gc_profile.gc_map(dna_string, 1000, 0.45)
 dna_list = sixty_chunks(dna_string)
 
 
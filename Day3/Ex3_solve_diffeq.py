@@ -2,6 +2,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+import ode
+
 
 # Specify constants parameter
 alpha = 1
@@ -15,18 +17,10 @@ delta_t = 0.01
 # Make an array of time points, evenly spaced up to 60
 t = np.arange(0, 60, delta_t)
 
-# Make array to store number of rabbits and foxicies
-r = np.empty_like(t)
-f = np.empty_like(t)
-
-# Set the initial number of rabbits and fox
-r[0] = 10
-f[0] = 1
-
-# Write a for loop to keep updating n as time goes on
-for i in range(1, len(t)):
-    r[i] = r[i-1] + delta_t * (alpha * r[i-1] - beta * f[i-1] * r[i-1])
-    f[i] = f[i-1] + delta_t * (delta * f[i-1] * r[i-1] - gamma * f[i-1])
+# Integrate from 10 rabbits and 1 fox with fourth order Runge-Kutta
+_, y = ode.rk4(ode.lotka_volterra, [10, 1], t,
+               args=(alpha, beta, gamma, delta))
+r, f = y[:, 0], y[:, 1]
 
 fig, ax = plt.subplots(1, 1)
 ax.set_xlabel('time')
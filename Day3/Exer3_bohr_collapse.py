@@ -3,22 +3,19 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+import data_cache
+import fold_change
+
 
 def bohr_parameter(c, RK, Kda=0.017, Kdi=0.002, Kswitch=5.8):
     """Attempt to data collapse the fold-change induction"""
-    first_term = -np.log(RK)
-    top_term = (1 + (c / Kda))**2
-    bot_term = (1 + (c / Kda))**2 + Kswitch * (1 + (c / Kdi))**2
-    second_term = np.log(top_term / bot_term)
-    bohr = first_term - second_term
-    return bohr
+    return fold_change.bohr_parameter(c, RK, Kda=Kda, Kdi=Kdi,
+                                      Kswitch=Kswitch)
 
 
 def fold_change_bohr(bohr_parameter):
     """Calculates fold change in terms of the bohr parameter"""
-    bot_term = 1 + np.exp(-bohr_parameter)
-    inv_term = 1 / bot_term
-    return inv_term
+    return fold_change.fold_change_bohr(bohr_parameter)
 
 
 # Graph Settings
@@ -28,9 +25,12 @@ colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728',
 sns.set(style='whitegrid', palette=colors, rc={'axes.labelsize': 16})
 
 # Data Extraction
-data_wt = np.loadtxt('data/wt_lac.csv', skiprows=3, delimiter=',')
-data_q18a = np.loadtxt('data/q18a_lac.csv', skiprows=3, delimiter=',')
-data_q18m = np.loadtxt('data/q18m_lac.csv', skiprows=3, delimiter=',')
+data_wt = data_cache.cached_loadtxt('data/wt_lac.csv', skiprows=3,
+                                    delimiter=',')
+data_q18a = data_cache.cached_loadtxt('data/q18a_lac.csv', skiprows=3,
+                                      delimiter=',')
+data_q18m = data_cache.cached_loadtxt('data/q18m_lac.csv', skiprows=3,
+                                      delimiter=',')
 
 # Data slicing
 wt_x = data_wt[:, 0]
@@ -45,10 +45,18 @@ theo_conc = np.logspace(-7, 1)
 bohr_values = np.linspace(-6, 6, 200)
 bohr_param = bohr_parameter(theo_conc, 16)
 
+# Fit RK of each mutant, with shared Kda and Kdi
+fit = fold_change.fit_fold_change(
+    np.concatenate((wt_x, q18a_x, q18m_x)),
+    np.concatenate((wt_y, q18a_y, q18m_y)),
+    np.repeat([0, 1, 2], [len(wt_x), len(q18a_x), len(q18m_x)]),
+    fixed={'Kswitch': 5.8})
+RK_wt, RK_q18a, RK_q18m = fit.RK
+
 # Get bohr parameters
-bohr_wt = bohr_parameter(wt_x, 141.5)
-bohr_q18a = bohr_parameter(q18a_x, 16.56)
-bohr_q18m = bohr_parameter(q18m_x, 1332)
+bohr_wt = bohr_parameter(wt_x, RK_wt, Kda=fit.Kda, Kdi=fit.Kdi)
+bohr_q18a = bohr_parameter(q18a_x, RK_q18a, Kda=fit.Kda, Kdi=fit.Kdi)
+bohr_q18m = bohr_parameter(q18m_x, RK_q18m, Kda=fit.Kda, Kdi=fit.Kdi)
 
 
 fig, ax = plt.subplots(1, 1)
@@ -3,14 +3,13 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+import data_cache
+import fold_change as fc_model
+
 
 def fold_change(c, RK, Kda=0.017, Kdi=0.002, Kswitch=5.8):
     """fold change equation evaluated"""
-    # Calculate the top term and bottom term
-    top_term = RK * (1 + (c / Kda))**2
-    bot_term = (1 + (c / Kda))**2 + Kswitch * (1 + (c / Kdi))**2
-    inv_result = 1 / (1 + top_term / bot_term)
-    return inv_result
+    return fc_model.fold_change(c, RK, Kda=Kda, Kdi=Kdi, Kswitch=Kswitch)
 
 
 # Graph settings
@@ -20,9 +19,12 @@ colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728',
 sns.set(style='whitegrid', palette=colors, rc={'axes.labelsize': 16})
 
 # Load the data and slice x (IPTG) and y (Fold change).
-data_wt = np.loadtxt('data/wt_lac.csv', skiprows=3, delimiter=',')
-data_q18a = np.loadtxt('data/q18a_lac.csv', skiprows=3, delimiter=',')
-data_q18m = np.loadtxt('data/q18m_lac.csv', skiprows=3, delimiter=',')
+data_wt = data_cache.cached_loadtxt('data/wt_lac.csv', skiprows=3,
+                                    delimiter=',')
+data_q18a = data_cache.cached_loadtxt('data/q18a_lac.csv', skiprows=3,
+                                      delimiter=',')
+data_q18m = data_cache.cached_loadtxt('data/q18m_lac.csv', skiprows=3,
+                                      delimiter=',')
 
 wt_x = data_wt[:, 0]
 q18a_x = data_q18a[:, 0]
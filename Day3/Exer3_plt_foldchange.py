@@ -3,14 +3,19 @@ import numpy as np
 # Plotting modules and settings.
 import matplotlib.pyplot as plt
 import seaborn as sns
+
+import data_cache
 colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728',
           '#9467bd', '#8c564b', '#e377c2', '#7f7f7f',
           '#bcbd22', '#17becf']
 sns.set(style='whitegrid', palette=colors, rc={'axes.labelsize': 16})
 
-data_wt = np.loadtxt('data/wt_lac.csv', skiprows=3, delimiter=',')
-data_q18a = np.loadtxt('data/q18a_lac.csv', skiprows=3, delimiter=',')
-data_q18m = np.loadtxt('data/q18m_lac.csv', skiprows=3, delimiter=',')
+data_wt = data_cache.cached_loadtxt('data/wt_lac.csv', skiprows=3,
+                                    delimiter=',')
+data_q18a = data_cache.cached_loadtxt('data/q18a_lac.csv', skiprows=3,
+                                      delimiter=',')
+data_q18m = data_cache.cached_loadtxt('data/q18m_lac.csv', skiprows=3,
+                                      delimiter=',')
 
 wt_x = data_wt[:, 0]
 q18a_x = data_q18a[:, 0]
@@ -3,6 +3,8 @@ import matplotlib.pyplot as plt
 
 import seaborn as sns
 
+import spikes
+
 colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728',
           '#9467bd', '#8c564b', '#e377c2', '#7f7f7f',
           '#bcbd22', '#17becf']
@@ -23,4 +25,9 @@ _ = ax.set_ylabel('V (mµV)')
 
 _ = ax.plot(t, V)
 
+# Mark detected spikes
+spike_times, _ = spikes.detect_spikes('data/retina_spikes.csv')
+_ = ax.plot(spike_times, np.interp(spike_times, t, V), marker='.',
+            linestyle='none')
+
 plt.show()
@@ -1,5 +1,7 @@
 import pandas as pd
 
+import frame_memory
+
 # Read in data files with pandas with no row headings.
 df_high = pd.read_csv('data/xa_high_food.csv', comment='#', header=None)
 df_low = pd.read_csv('data/xa_low_food.csv', comment='#', header=None)
@@ -22,3 +24,7 @@ inds = (df['food density'] == 'high') & (df['cross-sectional area (sq micron)']
 df.to_csv('xa_combined.csv', index=False)
 
 df_reloaded = pd.read_csv('xa_combined.csv')
+
+# Store food density as a categorical, and report the memory saved
+df_small = frame_memory.optimize_frame(df_reloaded)
+print(frame_memory.memory_report(df_reloaded, df_small))
@@ -0,0 +1,157 @@
+"""
+Conversion between one- and three-letter amino acid abbreviations.
+"""
+import numpy as np
+
+import bioinfo_dicts
+
+# Three-letter abbreviation of each one-letter code, as fixed-width rows
+# of bytes indexed by the byte of the one-letter code, either case
+_three_letter = np.zeros((256, 3), dtype=np.uint8)
+_valid = np.zeros(256, dtype=bool)
+for _one, _three in bioinfo_dicts.aa.items():
+    for _code in (ord(_one), ord(_one.lower())):
+        _three_letter[_code] = np.frombuffer(_three.encode('ascii'),
+                                             dtype=np.uint8)
+        _valid[_code] = True
+del _one, _three, _code
+
+# Three-letter abbreviations packed into integers, sorted, with the
+# corresponding one-letter codes
+_packed_three = np.array([int.from_bytes(three.upper().encode('ascii'), 'big')
+                          for three in bioinfo_dicts.aa.values()])
+_one_letter = np.frombuffer(''.join(bioinfo_dicts.aa.keys()).encode('ascii'),
+                            dtype=np.uint8)
+_order = np.argsort(_packed_three)
+_packed_three, _one_letter = _packed_three[_order], _one_letter[_order]
+del _order
+
+
+def _as_list(seqs):
+    """Wrap a single sequence in a list, noting whether we did."""
+    if isinstance(seqs, str):
+        return [seqs], True
+    return list(seqs), False
+
+
+def _as_output(out, seqs, single):
+    """Return output in the form the sequences were given in."""
+    if single:
+        return out[0]
+    if isinstance(seqs, np.ndarray):
+        return np.array(out, dtype=object)
+    return out
+
+
+def _offsets(lengths):
+    """Start and stop of each sequence in a concatenated buffer."""
+    stops = np.cumsum(lengths)
+    return stops - lengths, stops
+
+
+def _check_sep(sep):
+    """Check that a separator is a single ASCII character or ''."""
+    if not isinstance(sep, str) or len(sep) > 1 \
+            or (sep and ord(sep) > 127):
+        raise RuntimeError(repr(sep) + ' is not a valid separator.')
+
+
+def one_to_three(seqs, sep='-'):
+    """
+    Convert protein sequences from one-letter to three-letter
+    abbreviations.
+
+    All sequences are converted together: their residues are looked
+    up in a fixed-width table into one preallocated buffer, from which
+    each output sequence is sliced.
+
+    Parameters
+    ----------
+    seqs : str, list of str, or ndarray of str
+        Protein sequence(s) with one-letter abbreviations, in upper or
+        lower case.
+    sep : str, default '-'
+        Single character placed between three-letter abbreviations, or
+        '' for none.
+
+    Returns
+    -------
+    output : str, list of str, or ndarray of str
+        Converted sequence(s), e.g., 'Ala-Cys' for 'AC'.
+    """
+    _check_sep(sep)
+    seqs_list, single = _as_list(seqs)
+    lengths = np.array([len(seq) for seq in seqs_list], dtype=np.int64)
+
+    residues = np.frombuffer(''.join(seqs_list).encode('ascii', 'replace'),
+                             dtype=np.uint8)
+    invalid = np.flatnonzero(~_valid[residues])
+    if len(invalid) > 0:
+        bad = ''.join(seqs_list)[invalid[0]]
+        raise RuntimeError(bad.upper() + ' is not a valid amino acid.')
+
+    # Each residue takes three letters plus a separator
+    width = 3 + len(sep)
+    buf = np.empty((len(residues), width), dtype=np.uint8)
+    buf[:, :3] = _three_letter[residues]
+    if sep:
+        buf[:, 3] = ord(sep)
+    buf = buf.tobytes().decode('ascii')
+
+    starts, stops = _offsets(lengths * width)
+    out = [buf[start:stop-len(sep)] if stop > start else ''
+           for start, stop in zip(starts, stops)]
+
+    return _as_output(out, seqs, single)
+
+
+def three_to_one(seqs, sep='-'):
+    """
+    Convert protein sequences from three-letter to one-letter
+    abbreviations.
+
+    Parameters
+    ----------
+    seqs : str, list of str, or ndarray of str
+        Protein sequence(s) with three-letter abbreviations, in any
+        case, e.g., 'Ala-Cys'.
+    sep : str, default '-'
+        Single character between three-letter abbreviations, or '' for
+        none.
+
+    Returns
+    -------
+    output : str, list of str, or ndarray of str
+        Converted sequence(s), e.g., 'AC' for 'Ala-Cys'.
+    """
+    _check_sep(sep)
+    seqs_list, single = _as_list(seqs)
+    width = 3 + len(sep)
+
+    # Add a trailing separator so that every residue takes `width` bytes
+    padded = [seq + sep if seq else '' for seq in seqs_list]
+    lengths = np.array([len(seq) for seq in padded], dtype=np.int64)
+    for seq, length in zip(padded, lengths):
+        if length % width != 0 or (sep and seq[3::width].replace(sep, '')):
+            raise RuntimeError(seq[:-len(sep) or None]
+                               + ' is not a valid three-letter sequence.')
+
+    # Upper case after encoding, so that every character stays one byte
+    buf = np.frombuffer(''.join(padded).encode('ascii', 'replace').upper(),
+                        dtype=np.uint8).reshape(-1, width)
+
+    packed = (buf[:, 0].astype(np.int64) << 16
+              | buf[:, 1].astype(np.int64) << 8
+              | buf[:, 2])
+    inds = np.minimum(np.searchsorted(_packed_three, packed),
+                      len(_packed_three) - 1)
+    invalid = np.flatnonzero(_packed_three[inds] != packed)
+    if len(invalid) > 0:
+        code = buf[invalid[0], :3].tobytes().decode('ascii', 'replace')
+        raise RuntimeError(code.capitalize() + ' is not a valid amino acid.')
+
+    buf = _one_letter[inds].tobytes().decode('ascii')
+    starts, stops = _offsets(lengths // width)
+    out = [buf[start:stop] for start, stop in zip(starts, stops)]
+
+    return _as_output(out, seqs, single)
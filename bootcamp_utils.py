@@ -1,14 +1,20 @@
+import collections
+import concurrent.futures
+
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
-import bkcharts
 import bokeh.io
 import bokeh.models
 import bokeh.palettes
 import bokeh.plotting
 
-def ecdf(data, formal=False, buff=0.1, min_x=None, max_x=None):
+import parallel
+
+
+def ecdf(data, formal=False, buff=0.1, min_x=None, max_x=None,
+         n_points=None):
     """
     Generate `x` and `y` values for plotting an ECDF.
 
@@ -29,6 +35,10 @@ def ecdf(data, formal=False, buff=0.1, min_x=None, max_x=None):
     max_x : float, default None
         Maximum value of `x` to include on plot. Overrides `buff`.
         Ignored if `formal` is False.
+    n_points : int, default None
+        If given, thin the ECDF to at most `n_points` evenly spaced
+        values of `y`. Useful for keeping plots of large data sets
+        small.
 
     Returns
     -------
@@ -39,12 +49,13 @@ def ecdf(data, formal=False, buff=0.1, min_x=None, max_x=None):
     """
 
     if formal:
-        return _ecdf_formal(data, buff=buff, min_x=min_x, max_x=max_x)
+        return _ecdf_formal(data, buff=buff, min_x=min_x, max_x=max_x,
+                            n_points=n_points)
     else:
-        return _ecdf_dots(data)
+        return _ecdf_dots(data, n_points=n_points)
 
 
-def _ecdf_dots(data):
+def _ecdf_dots(data, n_points=None):
     """
     Compute `x` and `y` values for plotting an ECDF.
 
@@ -52,6 +63,9 @@ def _ecdf_dots(data):
     ----------
     data : array_like
         Array of data to be plotted as an ECDF.
+    n_points : int, default None
+        If given, thin the ECDF to at most `n_points` evenly spaced
+        values of `y`.
 
     Returns
     -------
@@ -60,10 +74,17 @@ def _ecdf_dots(data):
     y : array
         `y` values for plotting
     """
-    return np.sort(data), np.arange(1, len(data)+1) / len(data)
+    x, y = np.sort(data), np.arange(1, len(data)+1) / len(data)
+
+    if n_points is not None and len(x) > n_points:
+        # Index of the first y at or above each multiple of 1 / n_points
+        inds = (np.arange(1, n_points+1)*len(x) + n_points - 1) // n_points
+        return x[inds - 1], y[inds - 1]
+
+    return x, y
 
 
-def _ecdf_formal(data, buff=0.1, min_x=None, max_x=None):
+def _ecdf_formal(data, buff=0.1, min_x=None, max_x=None, n_points=None):
     """
     Generate `x` and `y` values for plotting a formal ECDF.
 
@@ -78,6 +99,9 @@ def _ecdf_formal(data, buff=0.1, min_x=None, max_x=None):
         Minimum value of `x` to include on plot. Overrides `buff`.
     max_x : float, default None
         Maximum value of `x` to include on plot. Overrides `buff`.
+    n_points : int, default None
+        If given, thin the ECDF to at most `n_points` evenly spaced
+        values of `y`.
 
     Returns
     -------
@@ -87,8 +111,37 @@ def _ecdf_formal(data, buff=0.1, min_x=None, max_x=None):
         `y` values for plotting
     """
     # Get x and y values for data points
-    x, y = _ecdf_dots(data)
+    x, y = _ecdf_dots(data, n_points=n_points)
+
+    return _ecdf_steps(x, y, buff=buff, min_x=min_x, max_x=max_x)
+
+
+def _ecdf_steps(x, y, buff=0.1, min_x=None, max_x=None):
+    """
+    Convert "dot" style ECDF values to `x` and `y` values for plotting
+    a formal ECDF.
+
+    Parameters
+    ----------
+    x : array
+        Sorted `x` values of the dots.
+    y : array
+        `y` values of the dots.
+    buff : float, default 0.1
+        How long the tails at y = 0 and y = 1 should extend as a fraction
+        of the total range of the data.
+    min_x : float, default None
+        Minimum value of `x` to include on plot. Overrides `buff`.
+    max_x : float, default None
+        Maximum value of `x` to include on plot. Overrides `buff`.
 
+    Returns
+    -------
+    x : array
+        `x` values for plotting
+    y : array
+        `y` values for plotting
+    """
     # Set defaults for min and max tails
     if min_x is None:
         min_x = x[0] - (x[-1] - x[0])*buff
@@ -113,20 +166,605 @@ def _ecdf_formal(data, buff=0.1, min_x=None, max_x=None):
 
     return x_formal, y_formal
 
-    
-def bs_replicate(data, func=np.mean):
+
+class ECDFSketch(object):
+    """
+    Mergeable quantile sketch for computing ECDFs of data streams.
+
+    This is a KLL sketch. Items are stored in a stack of compactors,
+    where an item at level `h` stands for 2**h data points. When a
+    compactor overflows, it is sorted and every other item is promoted
+    to the next level. Memory stays O(k log(n/k)) however many data
+    points are added, and the rank error is roughly `eps`.
+
+    Parameters
+    ----------
+    eps : float, default 0.01
+        Target rank error, as a fraction of the number of data points.
+    seed : int or None, default None
+        Seed for the random offsets used in compaction.
+    """
+    def __init__(self, eps=0.01, seed=None):
+        self.eps = eps
+        self.k = max(8, int(np.ceil(2 / eps)))
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+        self._levels = [np.empty(0)]
+
+    def _capacity(self, h):
+        """Capacity of compactor at level `h`."""
+        depth = len(self._levels) - h - 1
+        return max(2, int(np.ceil(self.k * (2/3)**depth)))
+
+    def _compress(self):
+        """Compact levels until every compactor is within capacity."""
+        h = 0
+        while h < len(self._levels):
+            items = self._levels[h]
+            if len(items) > self._capacity(h):
+                if h + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                items = np.sort(items)
+
+                # Keep an odd item at this level, promote every other one
+                keep = len(items) % 2
+                promoted = items[keep + self._rng.integers(2)::2]
+                self._levels[h] = items[:keep]
+                self._levels[h+1] = np.concatenate((self._levels[h+1],
+                                                    promoted))
+            h += 1
+
+    def update(self, data):
+        """Add a chunk of data to the sketch."""
+        data = np.asarray(data, dtype=float).ravel()
+        data = data[~np.isnan(data)]
+        if len(data) == 0:
+            return self
+
+        self.n += len(data)
+        self.min = min(self.min, data.min())
+        self.max = max(self.max, data.max())
+        self._levels[0] = np.concatenate((self._levels[0], data))
+        self._compress()
+
+        return self
+
+    def merge(self, other):
+        """Merge another sketch into this one."""
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for h, items in enumerate(other._levels):
+            self._levels[h] = np.concatenate((self._levels[h], items))
+
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+        return self
+
+    def _weighted_items(self):
+        """Sorted items and their cumulative weights."""
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(level), 2**h)
+                                  for h, level in enumerate(self._levels)])
+        inds = np.argsort(items, kind='stable')
+
+        return items[inds], np.cumsum(weights[inds])
+
+    def quantile(self, q):
+        """Approximate quantiles of the data, `q` in [0, 1]."""
+        if self.n == 0:
+            raise RuntimeError('Sketch is empty.')
+        items, cum_weights = self._weighted_items()
+        ranks = np.asarray(q) * cum_weights[-1]
+        inds = np.searchsorted(cum_weights, ranks, side='left')
+        x = items[np.minimum(inds, len(items) - 1)]
+
+        # Extremes are tracked exactly
+        return np.clip(np.where(np.asarray(q) >= 1, self.max, x),
+                       self.min, self.max)
+
+    def cdf(self, x):
+        """Approximate ECDF evaluated at `x`."""
+        if self.n == 0:
+            raise RuntimeError('Sketch is empty.')
+        items, cum_weights = self._weighted_items()
+        inds = np.searchsorted(items, x, side='right')
+        cum_weights = np.concatenate(((0,), cum_weights))
+
+        return cum_weights[inds] / cum_weights[-1]
+
+    def ecdf(self, n_points=200, formal=False, buff=0.1, min_x=None,
+             max_x=None):
+        """
+        Generate `x` and `y` values for plotting the ECDF at a fixed
+        resolution of `n_points` values of `y`. Arguments are as
+        for `ecdf()`.
+        """
+        y = np.arange(1, n_points+1) / n_points
+        x = self.quantile(y)
+
+        if formal:
+            return _ecdf_steps(x, y, buff=buff, min_x=min_x, max_x=max_x)
+        return x, y
+
+
+def streaming_ecdf(chunks, n_points=200, eps=0.01, formal=False, buff=0.1,
+                   min_x=None, max_x=None, seed=None):
+    """
+    Generate `x` and `y` values for plotting an ECDF of data that
+    arrive in chunks.
+
+    Parameters
+    ----------
+    chunks : iterable of array_like
+        Chunks of data, e.g., columns of the DataFrames yielded by
+        `pd.read_csv(..., chunksize=...)`.
+    n_points : int, default 200
+        Number of points in the ECDF, regardless of the number of
+        data points.
+    eps : float, default 0.01
+        Target rank error of the underlying `ECDFSketch`.
+    formal : bool, default False
+        If True, generate `x` and `y` values for formal ECDF.
+        Otherwise, generate `x` and `y` values for "dot" style ECDF.
+    buff : float, default 0.1
+        How long the tails at y = 0 and y = 1 should extend as a
+        fraction of the total range of the data. Ignored if
+        `formal` is False.
+    min_x : float, default None
+        Minimum value of `x` to include on plot. Overrides `buff`.
+        Ignored if `formal` is False.
+    max_x : float, default None
+        Maximum value of `x` to include on plot. Overrides `buff`.
+        Ignored if `formal` is False.
+    seed : int or None, default None
+        Seed for the sketch's compaction.
+
+    Returns
+    -------
+    x : array
+        `x` values for plotting
+    y : array
+        `y` values for plotting
+    """
+    sketch = ECDFSketch(eps=eps, seed=seed)
+    for chunk in chunks:
+        sketch.update(chunk)
+
+    return sketch.ecdf(n_points=n_points, formal=formal, buff=buff,
+                       min_x=min_x, max_x=max_x)
+
+
+# Reducers that take an `axis` keyword, so that a whole chunk of
+# bootstrap samples can be reduced with a single NumPy call
+_axis_funcs = {np.mean, np.median, np.std, np.var, np.sum, np.min, np.max,
+               np.percentile, np.quantile}
+
+# Reducers that put the replicate axis last when given array-valued `q`
+_q_funcs = {np.percentile, np.quantile}
+
+# Largest number of replicates drawn from a single random stream. Chunks
+# are the unit of work handed to worker processes, so this also sets the
+# granularity of the parallel split.
+_bs_max_chunk = 1024
+
+# Data set shared by the chunks computed in a worker process
+_bs_worker_data = None
+
+
+def bs_replicate(data, func=np.mean, rng=None, **kwargs):
     """Compute a bootsrap replicate from data"""
-    bs_sample = np.random.choice(data, replace=True, size=len(data))
-    return func(bs_sample)
+    if rng is None:
+        bs_sample = np.random.choice(data, replace=True, size=len(data))
+    else:
+        bs_sample = rng.choice(data, replace=True, size=len(data))
+    return func(bs_sample, **kwargs)
+
+
+def _seed_sequence(seed):
+    """
+    Seed sequence from which the chunks of replicates spawn their
+    streams. If `seed` is None, its entropy is drawn from NumPy's global
+    random state, so that `np.random.seed()` still makes results
+    reproducible.
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if seed is None:
+        seed = np.random.randint(2**32, size=4)
+    return np.random.SeedSequence(seed)
+
+
+def _bs_chunks(n, size, itemsize, max_bytes):
+    """
+    Split `size` replicates into chunks whose (replicates x n) index
+    and sample matrices fit in `max_bytes`.
+
+    Returns
+    -------
+    output : list of ints
+        Number of replicates in each chunk.
+    """
+    per_rep = max(1, n * (np.dtype(np.intp).itemsize + itemsize))
+    chunk_size = int(max(1, min(size, _bs_max_chunk, max_bytes // per_rep)))
+    n_full, rem = divmod(size, chunk_size)
+
+    return [chunk_size] * n_full + ([rem] if rem else [])
 
 
-def draw_bs_reps(data, func=np.mean, size=10000):
-    """Draw bootstrap replicates from 1d data"""
-    return [bs_replicate(data, func=func) for _ in range(size)]
+def _bs_chunk(data, func, n_reps, seed, vectorized, kwargs):
+    """
+    Compute `n_reps` bootstrap replicates from a single random stream.
+    """
+    rng = np.random.default_rng(seed)
+    samples = data[rng.integers(0, len(data), size=(n_reps, len(data)))]
+
+    if vectorized:
+        reps = np.asarray(func(samples, axis=1, **kwargs))
+        if func in _q_funcs and reps.ndim > 1:
+            reps = np.moveaxis(reps, 0, -1)
+        return reps
+
+    return np.array([func(sample, **kwargs) for sample in samples])
+
+
+def _bs_worker_init(data):
+    """Store the data set in a worker process."""
+    global _bs_worker_data
+    _bs_worker_data = data
+
+
+def _bs_worker_chunk(func, n_reps, seed, vectorized, kwargs):
+    """Compute a chunk of replicates in a worker process."""
+    return _bs_chunk(_bs_worker_data, func, n_reps, seed, vectorized, kwargs)
+
+
+def draw_bs_reps(data, func=np.mean, size=10000, seed=None, vectorized=None,
+                 max_bytes=2**26, n_jobs=1, **kwargs):
+    """
+    Draw bootstrap replicates from 1d data.
+
+    Replicates are computed in chunks. For each chunk, a
+    (replicates x n) matrix of resampling indices is drawn at once,
+    and `func` is applied along its rows. Every chunk has its own
+    random stream, so for a given seed the result does not depend on
+    `n_jobs`.
+
+    Parameters
+    ----------
+    data : array_like
+        One-dimensional array of measurements.
+    func : function, default np.mean
+        Function computing the statistic of interest. If `vectorized`
+        is True, it must accept an `axis` keyword argument.
+    size : int, default 10000
+        Number of bootstrap replicates to draw.
+    seed : int, SeedSequence, or None, default None
+        Seed for the random number generator. Each chunk gets its own
+        stream spawned from `np.random.SeedSequence(seed)`. If None,
+        the seed is drawn from NumPy's global random state, so scripts
+        that call `np.random.seed()` stay reproducible. Replicates
+        differ from those of earlier versions, which resampled with
+        `np.random.choice()`.
+    vectorized : bool or None, default None
+        If True, call `func(samples, axis=1)` once per chunk. If
+        False, call `func` once per replicate. If None, vectorize when
+        `func` is one of NumPy's reducers (mean, median, std, var,
+        sum, min, max, percentile, quantile).
+    max_bytes : int, default 2**26
+        Approximate memory budget for the index and sample matrices of
+        a single chunk.
+    n_jobs : int, default 1
+        Number of worker processes. If -1, use all CPUs. Chunks are
+        distributed over a process pool and merged in order. `func`
+        and `kwargs` must be picklable when `n_jobs` is not 1.
+    **kwargs
+        Additional keyword arguments passed to `func`, e.g., `q` for
+        `np.percentile`.
+
+    Returns
+    -------
+    output : ndarray
+        Array of bootstrap replicates. The first axis indexes
+        replicates.
+    """
+    n_jobs = parallel.n_workers(n_jobs)
+
+    data = np.asarray(data)
+    if vectorized is None:
+        vectorized = func in _axis_funcs
+
+    seed = _seed_sequence(seed)
+
+    chunks = _bs_chunks(len(data), size, data.itemsize, max_bytes)
+    if not chunks:
+        return np.empty(0)
+    seeds = seed.spawn(len(chunks))
+
+    n_jobs = min(n_jobs, len(chunks))
+
+    if n_jobs == 1:
+        return np.concatenate([_bs_chunk(data, func, n_reps, ss, vectorized,
+                                         kwargs)
+                               for n_reps, ss in zip(chunks, seeds)])
+
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_bs_worker_init,
+            initargs=(data,)) as executor:
+        futures = [executor.submit(_bs_worker_chunk, func, n_reps, ss,
+                                   vectorized, kwargs)
+                   for n_reps, ss in zip(chunks, seeds)]
+        return np.concatenate([future.result() for future in futures])
+
+
+def diff_of_means(data_1, data_2, axis=None):
+    """Difference in means of two data sets"""
+    return np.mean(data_1, axis=axis) - np.mean(data_2, axis=axis)
+
+
+def _perm_chunk(data, n_1, func, n_reps, seed, vectorized, kwargs):
+    """
+    Compute `n_reps` permutation replicates from a single random stream.
+    """
+    rng = np.random.default_rng(seed)
+    perms = data[np.argsort(rng.random((n_reps, len(data))), axis=1)]
+
+    if vectorized:
+        return np.asarray(func(perms[:, :n_1], perms[:, n_1:], axis=1,
+                               **kwargs))
+
+    return np.array([func(perm[:n_1], perm[n_1:], **kwargs)
+                     for perm in perms])
+
+
+def draw_perm_reps(data_1, data_2, func=diff_of_means, size=10000, seed=None,
+                   vectorized=True, max_bytes=2**26, **kwargs):
+    """
+    Draw permutation replicates of a two-sample test statistic.
+
+    Replicates are computed in chunks. For each chunk, the
+    concatenated data are permuted by argsorting a (replicates x n)
+    matrix of random numbers, and `func` is applied to the first
+    len(data_1) and remaining columns of every row at once.
+
+    Parameters
+    ----------
+    data_1 : array_like
+        One-dimensional array of measurements.
+    data_2 : array_like
+        One-dimensional array of measurements.
+    func : function, default diff_of_means
+        Test statistic, called as `func(data_1, data_2, **kwargs)`. If
+        `vectorized` is True, it must also accept an `axis` keyword
+        argument.
+    size : int, default 10000
+        Number of permutation replicates to draw.
+    seed : int, SeedSequence, or None, default None
+        Seed for the random number generator. Each chunk gets its own
+        stream spawned from `np.random.SeedSequence(seed)`.
+    vectorized : bool, default True
+        If True, call `func` once per chunk with `axis=1`. Otherwise,
+        call it once per replicate.
+    max_bytes : int, default 2**26
+        Approximate memory budget for the random, index, and permuted
+        data matrices of a single chunk.
+    **kwargs
+        Additional keyword arguments passed to `func`.
+
+    Returns
+    -------
+    output : ndarray
+        Array of permutation replicates.
+    """
+    data_1, data_2 = np.asarray(data_1), np.asarray(data_2)
+    data = np.concatenate((data_1, data_2))
+    seed = _seed_sequence(seed)
+
+    # Random keys take as much room as the indices
+    chunks = _bs_chunks(len(data), size, data.itemsize + 8, max_bytes)
+    if not chunks:
+        return np.empty(0)
+    seeds = seed.spawn(len(chunks))
+
+    return np.concatenate([_perm_chunk(data, len(data_1), func, n_reps, ss,
+                                       vectorized, kwargs)
+                           for n_reps, ss in zip(chunks, seeds)])
+
+
+def draw_bs_diff_reps(data_1, data_2, func=np.mean, size=10000, seed=None,
+                      **kwargs):
+    """
+    Draw bootstrap replicates of the difference of a statistic
+    between two data sets.
+
+    Parameters
+    ----------
+    data_1 : array_like
+        One-dimensional array of measurements.
+    data_2 : array_like
+        One-dimensional array of measurements.
+    func : function, default np.mean
+        Statistic computed on each data set.
+    size : int, default 10000
+        Number of bootstrap replicates to draw.
+    seed : int, SeedSequence, or None, default None
+        Seed for the random number generator. The two data sets are
+        resampled from independent streams spawned from it.
+    **kwargs
+        Additional keyword arguments passed to `draw_bs_reps()`.
+
+    Returns
+    -------
+    output : ndarray
+        Array of replicates of func(data_1) - func(data_2).
+    """
+    seed = _seed_sequence(seed)
+    seed_1, seed_2 = seed.spawn(2)
+
+    return (draw_bs_reps(data_1, func=func, size=size, seed=seed_1, **kwargs)
+            - draw_bs_reps(data_2, func=func, size=size, seed=seed_2, **kwargs))
+
+
+def perm_test(data_1, data_2, func=diff_of_means, size=10000,
+              alternative='two-sided', seed=None, **kwargs):
+    """
+    Perform a two-sample permutation test.
+
+    Parameters
+    ----------
+    data_1 : array_like
+        One-dimensional array of measurements.
+    data_2 : array_like
+        One-dimensional array of measurements.
+    func : function, default diff_of_means
+        Test statistic. See `draw_perm_reps()`.
+    size : int, default 10000
+        Number of permutation replicates to draw.
+    alternative : str, default 'two-sided'
+        One of 'two-sided', 'greater', or 'less'. For 'greater', the
+        p-value is the probability of a replicate being at least as
+        large as the observed statistic.
+    seed : int, SeedSequence, or None, default None
+        Seed for the random number generator.
+    **kwargs
+        Additional keyword arguments passed to `draw_perm_reps()`.
+
+    Returns
+    -------
+    p_value : float
+        Fraction of replicates at least as extreme as the observed
+        statistic.
+    p_err : float
+        Monte Carlo standard error of `p_value`.
+    """
+    stat_kwargs = {key: val for key, val in kwargs.items()
+                   if key not in ('vectorized', 'max_bytes')}
+    obs = func(np.asarray(data_1), np.asarray(data_2), **stat_kwargs)
+    reps = draw_perm_reps(data_1, data_2, func=func, size=size, seed=seed,
+                          **kwargs)
+
+    if alternative == 'two-sided':
+        p_value = np.mean(np.abs(reps) >= np.abs(obs))
+    elif alternative == 'greater':
+        p_value = np.mean(reps >= obs)
+    elif alternative == 'less':
+        p_value = np.mean(reps <= obs)
+    else:
+        raise RuntimeError(str(alternative) + ' is not a valid alternative.')
+
+    return float(p_value), float(np.sqrt(p_value * (1 - p_value) / size))
+
+
+# ECDFs of many groups stored in shared buffers. The ECDF of group
+# `labels[i]` is `x[offsets[i]:offsets[i+1]]`, `y[offsets[i]:offsets[i+1]]`.
+GroupedECDF = collections.namedtuple('GroupedECDF',
+                                     ['labels', 'x', 'y', 'offsets'])
+
+
+def grouped_ecdf(data, value, hue, formal=False, buff=0.1, min_x=None,
+                 max_x=None, n_points=None):
+    """
+    Generate `x` and `y` values for plotting an ECDF of each group in
+    a tidy DataFrame.
+
+    All groups are computed together with a single lexsort on
+    (group, value), so the cost does not grow with the number of
+    groups beyond the sort itself.
+
+    Parameters
+    ----------
+    data : Pandas DataFrame
+        Tidy DataFrame with data sets to be plotted.
+    value : column name of DataFrame
+        Name of column that contains data to make ECDF with.
+    hue : column name of DataFrame
+        Name of column that identifies labels of data.
+    formal : bool, default False
+        If True, generate `x` and `y` values for formal ECDF.
+        Otherwise, generate `x` and `y` values for "dot" style ECDF.
+    buff : float, default 0.1
+        How long the tails at y = 0 and y = 1 should extend as a
+        fraction of the total range of each group's data. Ignored if
+        `formal` is False.
+    min_x : float, default None
+        Minimum value of `x` to include on plot. Overrides `buff`.
+        Ignored if `formal` is False.
+    max_x : float, default None
+        Maximum value of `x` to include on plot. Overrides `buff`.
+        Ignored if `formal` is False.
+    n_points : int, default None
+        If given, thin each ECDF to at most `n_points` evenly spaced
+        values of `y`.
+
+    Returns
+    -------
+    output : GroupedECDF
+        Named tuple with the sorted group `labels`, `x` and `y` buffers
+        holding the ECDFs of all groups, and `offsets` into them.
+    """
+    codes, labels = pd.factorize(data[hue], sort=True)
+    values = np.asarray(data[value], dtype=float)
+
+    # Drop missing group labels, like groupby does
+    keep = codes >= 0
+    codes, values = codes[keep], values[keep]
+
+    # Sort by group, then by value within group
+    inds = np.lexsort((values, codes))
+    codes, x = codes[inds], values[inds]
+
+    # Rank of each value in its group
+    counts = np.bincount(codes, minlength=len(labels))
+    starts = np.concatenate(((0,), np.cumsum(counts)[:-1]))
+    ranks = np.arange(len(x)) - starts[codes]
+    y = (ranks + 1) / counts[codes]
+
+    # Keep ranks where y crosses a multiple of 1 / n_points
+    if n_points is not None:
+        thin = (ranks + 1) * n_points // counts[codes] \
+                > ranks * n_points // counts[codes]
+        thin |= (counts <= n_points)[codes]
+        codes, x, y = codes[thin], x[thin], y[thin]
+        counts = np.bincount(codes, minlength=len(labels))
+
+    offsets = np.concatenate(((0,), np.cumsum(counts)))
+
+    if not formal:
+        return GroupedECDF(labels, x, y, offsets)
+
+    # Formal ECDF of a group with m dots is [min_x, x1, x1, ..., xm, xm,
+    # max_x] and [0, 0, y1, y1, ..., ym, ym], so it takes 2(m + 1) entries
+    first, last = x[offsets[:-1]], x[offsets[1:] - 1]
+    if min_x is None:
+        min_x = first - (last - first)*buff
+    if max_x is None:
+        max_x = last + (last - first)*buff
+
+    formal_offsets = 2 * (offsets + np.arange(len(offsets)))
+    dot_pos = formal_offsets[codes] + 2*(np.arange(len(x)) - offsets[codes])
+
+    x_formal = np.empty(formal_offsets[-1])
+    y_formal = np.empty(formal_offsets[-1])
+
+    x_formal[dot_pos + 1] = x
+    x_formal[dot_pos + 2] = x
+    x_formal[formal_offsets[:-1]] = min_x
+    x_formal[formal_offsets[1:] - 1] = max_x
+
+    y_formal[dot_pos + 2] = y
+    y_formal[dot_pos + 3] = y
+    y_formal[formal_offsets[:-1]] = 0
+    y_formal[formal_offsets[:-1] + 1] = 0
+
+    return GroupedECDF(labels, x_formal, y_formal, formal_offsets)
 
 
 def ecdf_plot(data, value, hue=None, formal=False, buff=0.1, min_x=None, max_x=None,
-              ax=None):
+              ax=None, n_points=None):
     """
     Generate `x` and `y` values for plotting an ECDF.
 
@@ -155,6 +793,9 @@ def ecdf_plot(data, value, hue=None, formal=False, buff=0.1, min_x=None, max_x=N
     ax : matplotlib Axes
         Axes object to draw the plot onto, otherwise makes a new
         figure/axes.
+    n_points : int, default None
+        If given, thin each ECDF to at most `n_points` evenly spaced
+        values of `y`.
 
     Returns
     -------
@@ -169,7 +810,8 @@ def ecdf_plot(data, value, hue=None, formal=False, buff=0.1, min_x=None, max_x=N
         ax.set_ylabel('ECDF')
 
     if hue is None:
-        x, y = ecdf(data[value], formal=formal, buff=buff, min_x=min_x, max_x=max_x)
+        x, y = ecdf(data[value], formal=formal, buff=buff, min_x=min_x, max_x=max_x,
+                    n_points=n_points)
 
         # Make plots
         if formal:
@@ -177,42 +819,248 @@ def ecdf_plot(data, value, hue=None, formal=False, buff=0.1, min_x=None, max_x=N
         else:
             _ = ax.plot(x, y, marker='.', linestyle='none')
     else:
-        gb = data.groupby(hue)
-        ecdfs = gb[value].apply(ecdf, formal=formal, buff=buff, min_x=min_x, max_x=max_x)
+        ecdfs = grouped_ecdf(data, value, hue, formal=formal, buff=buff,
+                             min_x=min_x, max_x=max_x, n_points=n_points)
 
         # Make plots
-        if formal:
-            for i, xy in ecdfs.iteritems():
-                _ = ax.plot(*xy)
-        else:
-            for i, xy in ecdfs.iteritems():
-                _ = ax.plot(*xy, marker='.', linestyle='none')
+        for start, stop in zip(ecdfs.offsets[:-1], ecdfs.offsets[1:]):
+            x, y = ecdfs.x[start:stop], ecdfs.y[start:stop]
+            if formal:
+                _ = ax.plot(x, y)
+            else:
+                _ = ax.plot(x, y, marker='.', linestyle='none')
 
         # Add legend
-        ax.legend(ecdfs.index, loc=0)
+        ax.legend(ecdfs.labels, loc=0)
 
     return ax
 
 
-def bokeh_imshow(im, color_mapper=None):
+def _block_mean(im, factor):
+    """
+    Downsample an image by averaging blocks of `factor` x `factor`
+    pixels. Edges are padded with their own values to a whole number
+    of blocks.
+    """
+    n, m = im.shape
+    pad = ((0, -n % factor), (0, -m % factor))
+    if pad[0][1] or pad[1][1]:
+        im = np.pad(im, pad, mode='edge')
+    n, m = im.shape
+
+    return im.reshape(n // factor, factor, m // factor, factor).mean(
+        axis=(1, 3))
+
+
+def _to_display(im, contrast, dtype):
+    """Scale an image to the range of an integer type over a window."""
+    low, high = contrast
+    max_val = np.iinfo(dtype).max
+    scaled = (np.asarray(im, dtype=float) - low) / max(high - low, 1e-12)
+
+    return np.round(np.clip(scaled, 0, 1) * max_val).astype(dtype)
+
+
+def image_pyramid(im, factor=2, min_size=256, contrast=None, dtype=np.uint8):
+    """
+    Compute the levels of an image pyramid for display.
+
+    Parameters
+    ----------
+    im : 2D ndarray
+        Image.
+    factor : int, default 2
+        Downsampling factor between successive levels.
+    min_size : int, default 256
+        Levels are added until both sides of the coarsest are at most
+        this many pixels.
+    contrast : tuple, default None
+        (low, high) intensities mapped to the lowest and highest values
+        of `dtype`. If None, the minimum and maximum of `im`.
+    dtype : numpy dtype, default np.uint8
+        Integer type of the levels, np.uint8 or np.uint16.
+
+    Returns
+    -------
+    output : list of ndarrays
+        Levels, from full resolution to coarsest. Pixel (i, j) of level
+        k covers pixels i * factor**k to (i + 1) * factor**k of `im`
+        along each axis.
+    """
+    im = np.asarray(im, dtype=float)
+    if contrast is None:
+        contrast = (im.min(), im.max())
+
+    levels = [im]
+    while max(levels[-1].shape) > min_size and min(levels[-1].shape) > 1:
+        levels.append(_block_mean(levels[-1], factor))
+
+    return [_to_display(level, contrast, dtype) for level in levels]
+
+
+def _pyramid_view(levels, factor, x_range, y_range, max_pixels):
+    """
+    Crop of the finest pyramid level showing a region of the full image
+    in at most `max_pixels` pixels.
+
+    Returns
+    -------
+    output : dict
+        Data for an image glyph: the crop, and its position and size in
+        full-resolution pixels.
+    """
+    for k, level in enumerate(levels):
+        scale = factor**k
+        n, m = level.shape
+        r0 = int(np.clip(np.floor(y_range[0] / scale), 0, n - 1))
+        r1 = int(np.clip(np.ceil(y_range[1] / scale), r0 + 1, n))
+        c0 = int(np.clip(np.floor(x_range[0] / scale), 0, m - 1))
+        c1 = int(np.clip(np.ceil(x_range[1] / scale), c0 + 1, m))
+        if (r1 - r0) * (c1 - c0) <= max_pixels or k == len(levels) - 1:
+            break
+
+    # Edge blocks of coarse levels are padded past the image, so the
+    # size comes from the full-resolution shape
+    n, m = levels[0].shape
+    return dict(image=[level[r0:r1, c0:c1]], x=[c0 * scale], y=[r0 * scale],
+                dw=[min(c1 * scale, m) - c0 * scale],
+                dh=[min(r1 * scale, n) - r0 * scale])
+
+
+# Browser version of `_pyramid_view()`, for output without a Bokeh server
+_pyramid_view_js = """
+const levels = pyramid.data.image;
+const clip = (v, low, high) => Math.min(Math.max(v, low), high);
+let k, scale, r0, r1, c0, c1;
+for (k = 0; k < levels.length; k++) {
+    scale = factor**k;
+    const [n, m] = levels[k].shape;
+    r0 = clip(Math.floor(y_range.start / scale), 0, n - 1);
+    r1 = clip(Math.ceil(y_range.end / scale), r0 + 1, n);
+    c0 = clip(Math.floor(x_range.start / scale), 0, m - 1);
+    c1 = clip(Math.ceil(x_range.end / scale), c0 + 1, m);
+    if ((r1 - r0) * (c1 - c0) <= max_pixels || k == levels.length - 1) {
+        break;
+    }
+}
+
+const level = levels[k];
+const m = level.shape[1];
+const shape = [r1 - r0, c1 - c0];
+const crop = new level.constructor(shape[0] * shape[1], shape);
+let j = 0;
+for (let i = r0; i < r1; i++) {
+    for (let l = i * m + c0; l < i * m + c1; l++) {
+        crop[j++] = level[l];
+    }
+}
+
+const [n_full, m_full] = levels[0].shape;
+source.data = {image: [crop], x: [c0 * scale], y: [r0 * scale],
+               dw: [Math.min(c1 * scale, m_full) - c0 * scale],
+               dh: [Math.min(r1 * scale, n_full) - r0 * scale]};
+"""
+
+
+def bokeh_imshow(im, color_mapper=None, height=400, pyramid=False,
+                 contrast=None, dtype=np.uint8, factor=2, max_pixels=None):
     """
     Display an image in a Bokeh figure.
+
+    Parameters
+    ----------
+    im : 2D ndarray
+        Image.
+    color_mapper : bokeh.models.LinearColorMapper, default None
+        Color mapper. If None, Viridis with 256 levels.
+    height : int, default 400
+        Height of the plot, in screen pixels.
+    pyramid : bool, default False
+        If True, precompute an image pyramid with `image_pyramid()`
+        and only draw the part of the level that fits the viewport.
+        Zooming and panning swap in the level and crop for the new
+        viewport. When the plot is served by a Bokeh server, levels are
+        sent as needed; otherwise, all levels are embedded in the
+        output.
+    contrast : tuple, default None
+        (low, high) window of intensities for the pyramid. Ignored if
+        `pyramid` is False.
+    dtype : numpy dtype, default np.uint8
+        Integer type of the pyramid levels. Ignored if `pyramid` is
+        False.
+    factor : int, default 2
+        Downsampling factor between pyramid levels. Ignored if
+        `pyramid` is False.
+    max_pixels : int, default None
+        Largest number of image pixels sent for one view. If None,
+        four times the number of screen pixels of the plot. Ignored if
+        `pyramid` is False.
+
+    Returns
+    -------
+    output : bokeh.plotting.figure
+        Figure with the image.
     """
     # Get shape
     n, m = im.shape
 
     # Set up figure with appropriate dimensions
-    plot_height = 400
-    plot_width = int(m/n * plot_height)
-    p = bokeh.plotting.figure(plot_height=plot_height, plot_width=plot_width, 
-                              x_range=[0, m], y_range=[0, n],
-                              tools='pan,box_zoom,wheel_zoom,reset,resize')
+    width = int(m/n * height)
+    p = bokeh.plotting.figure(height=height, width=width,
+                              x_range=bokeh.models.Range1d(0, m),
+                              y_range=bokeh.models.Range1d(0, n),
+                              tools='pan,box_zoom,wheel_zoom,reset')
+
+    if not pyramid:
+        # Set color mapper; we'll do Viridis with 256 levels by default
+        if color_mapper is None:
+            color_mapper = bokeh.models.LinearColorMapper(
+                bokeh.palettes.viridis(256))
 
-    # Set color mapper; we'll do Viridis with 256 levels by default
+        # Display the image
+        p.image(image=[im], x=0, y=0, dw=m, dh=n, color_mapper=color_mapper)
+
+        return p
+
+    if max_pixels is None:
+        max_pixels = 4 * width * height
+
+    # The coarsest level must fit in `max_pixels`
+    min_size = max(1, min(256, int(np.sqrt(max_pixels))))
+    levels = image_pyramid(im, factor=factor, min_size=min_size,
+                           contrast=contrast, dtype=dtype)
     if color_mapper is None:
-        color_mapper = bokeh.models.LinearColorMapper(bokeh.palettes.viridis(256))
+        color_mapper = bokeh.models.LinearColorMapper(
+            bokeh.palettes.viridis(256), low=0, high=np.iinfo(dtype).max)
+
+    def view():
+        return _pyramid_view(levels, factor,
+                             (p.x_range.start, p.x_range.end),
+                             (p.y_range.start, p.y_range.end), max_pixels)
+
+    source = bokeh.models.ColumnDataSource(view())
+    p.image(image='image', x='x', y='y', dw='dw', dh='dh', source=source,
+            color_mapper=color_mapper)
+
+    # Swap in the level for the new viewport on zoom and pan. In a Bokeh
+    # server session, the crop is taken in Python; otherwise all levels
+    # go into the document and the crop is taken in the browser.
+    if bokeh.io.curdoc().session_context is not None:
+        def update(attr, old, new):
+            source.data = view()
+
+        for plot_range in (p.x_range, p.y_range):
+            plot_range.on_change('start', update)
+            plot_range.on_change('end', update)
+    else:
+        pyramid_source = bokeh.models.ColumnDataSource(dict(image=levels))
+        update = bokeh.models.CustomJS(
+            args=dict(source=source, pyramid=pyramid_source,
+                      x_range=p.x_range, y_range=p.y_range, factor=factor,
+                      max_pixels=max_pixels),
+            code=_pyramid_view_js)
+        for plot_range in (p.x_range, p.y_range):
+            plot_range.js_on_change('start', update)
+            plot_range.js_on_change('end', update)
 
-    # Display the image
-    im_bokeh = p.image(image=[im], x=0, y=0, dw=m, dh=n, color_mapper=color_mapper)
-    
     return p
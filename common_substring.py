@@ -0,0 +1,232 @@
+"""
+Common substrings of long sequences with a suffix array.
+"""
+import numpy as np
+
+
+def _as_codes(seq):
+    """View a str or bytes sequence as a uint8 array."""
+    if isinstance(seq, str):
+        seq = seq.encode('ascii')
+    return np.frombuffer(seq, dtype=np.uint8)
+
+
+def suffix_array(codes):
+    """
+    Build the suffix array of a sequence by prefix doubling.
+
+    Each round sorts suffixes by the ranks of their first 2**h
+    characters. Only suffixes that still share their rank with others
+    are re-sorted, so after the first few rounds the work is
+    proportional to the repeated part of the sequence.
+
+    Parameters
+    ----------
+    codes : ndarray
+        Integer codes of the characters of the sequence.
+
+    Returns
+    -------
+    sa : ndarray
+        Start positions of the suffixes, in sorted order.
+    """
+    n = len(codes)
+    order = np.argsort(codes, kind='stable')
+    slots = np.arange(n)
+
+    # change[p] is True if the suffix in slot p starts a new group
+    sorted_codes = codes[order]
+    change = np.ones(n + 1, dtype=bool)
+    change[1:n] = sorted_codes[1:] != sorted_codes[:-1]
+
+    # A suffix's rank is the first slot of its group
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.maximum.accumulate(np.where(change[:n], slots, 0))
+
+    k = 1
+    while True:
+        # Slots of groups with more than one suffix
+        unresolved = np.flatnonzero(~(change[:n] & change[1:]))
+        if len(unresolved) == 0:
+            break
+
+        # Sort by (rank of first k characters, rank of next k characters),
+        # packed into one integer key; suffixes shorter than k get -1
+        suffixes = order[unresolved]
+        ahead = suffixes + k
+        second = np.full(len(suffixes), -1, dtype=np.int64)
+        second[ahead < n] = rank[ahead[ahead < n]]
+        keys = rank[suffixes] * (n + 1) + second + 1
+        sub = np.argsort(keys)
+        suffixes, keys = suffixes[sub], keys[sub]
+
+        # Groups occupy contiguous slots, so sorted suffixes fill them
+        order[unresolved] = suffixes
+        new_change = np.ones(len(keys), dtype=bool)
+        new_change[1:] = keys[1:] != keys[:-1]
+        change[unresolved] = new_change
+        rank[suffixes] = np.maximum.accumulate(np.where(new_change,
+                                                        unresolved, 0))
+
+        k *= 2
+
+    return order
+
+
+def lcp_array(codes, sa):
+    """
+    Length of the longest common prefix of each suffix in a suffix
+    array with the one before it, by Kasai's algorithm.
+
+    Suffixes are visited in order of their start position. The LCP of
+    the suffix starting at i+1 with its predecessor is at least one less
+    than that of the suffix starting at i, so matching resumes where the
+    previous suffix left off and takes O(n) steps in total.
+
+    Parameters
+    ----------
+    codes : ndarray
+        Integer codes of the characters of the sequence.
+    sa : ndarray
+        Suffix array of `codes`, from `suffix_array()`.
+
+    Returns
+    -------
+    output : ndarray
+        `output[i]` is the LCP of suffixes `sa[i-1]` and `sa[i]`;
+        `output[0]` is 0.
+    """
+    n = len(sa)
+    rank = np.empty(n, dtype=np.int64)
+    rank[sa] = np.arange(n)
+    lcp = np.zeros(n, dtype=np.int64)
+
+    # Memoryviews index to Python ints, much faster than numpy scalars
+    chars = memoryview(np.ascontiguousarray(codes))
+    suffixes = memoryview(np.ascontiguousarray(sa, dtype=np.int64))
+    ranks, out = memoryview(rank), memoryview(lcp)
+
+    h = 0
+    for i in range(n):
+        p = ranks[i]
+        if p == 0:
+            h = 0
+            continue
+        j = suffixes[p-1]
+        while i + h < n and j + h < n and chars[i+h] == chars[j+h]:
+            h += 1
+        out[p] = h
+        if h > 0:
+            h -= 1
+
+    return lcp
+
+
+def _cross_matches(seq1, seq2):
+    """
+    Matches between suffixes of seq1 and seq2 that are adjacent in the
+    suffix array of their concatenation.
+
+    Returns
+    -------
+    lengths : ndarray
+        Length of each match.
+    pos1 : ndarray
+        Start of each match in seq1.
+    pos2 : ndarray
+        Start of each match in seq2.
+    """
+    codes1, codes2 = _as_codes(seq1), _as_codes(seq2)
+    n1 = len(codes1)
+
+    # Separator code 256 matches nothing, so no match runs across it
+    codes = np.concatenate((codes1.astype(np.int64), (256,),
+                            codes2.astype(np.int64)))
+    sa = suffix_array(codes)
+    lcp = lcp_array(codes, sa)
+
+    # Adjacent suffixes coming from different sequences
+    in_1 = sa < n1
+    cross = np.flatnonzero(in_1[1:] != in_1[:-1]) + 1
+    pos1 = np.where(in_1[cross], sa[cross], sa[cross-1])
+    pos2 = np.where(in_1[cross], sa[cross-1], sa[cross]) - n1 - 1
+
+    return lcp[cross], pos1, pos2
+
+
+def longest_common_substring(seq1, seq2):
+    """
+    Find the longest common substring of two sequences.
+
+    Parameters
+    ----------
+    seq1 : str or bytes
+        First sequence.
+    seq2 : str or bytes
+        Second sequence.
+
+    Returns
+    -------
+    substring : str or bytes
+        Longest common substring, of the same type as `seq1`. If
+        there are ties, one of them.
+    pos1 : int
+        Start of the substring in `seq1`.
+    pos2 : int
+        Start of the substring in `seq2`.
+    """
+    lengths, pos1, pos2 = _cross_matches(seq1, seq2)
+    if len(lengths) == 0 or lengths.max() == 0:
+        return seq1[:0], 0, 0
+
+    i = np.argmax(lengths)
+    start1, start2 = int(pos1[i]), int(pos2[i])
+
+    return seq1[start1:start1+lengths[i]], start1, start2
+
+
+def common_substrings(seq1, seq2, k=10, min_length=1):
+    """
+    Find the longest distinct common substrings of two sequences.
+
+    Only matches that cannot be extended to the left or right are
+    reported, so shifted copies of the same conserved segment are not.
+
+    Parameters
+    ----------
+    seq1 : str or bytes
+        First sequence.
+    seq2 : str or bytes
+        Second sequence.
+    k : int, default 10
+        Maximum number of substrings to return.
+    min_length : int, default 1
+        Minimum length of the substrings.
+
+    Returns
+    -------
+    output : list of tuples
+        (substring, pos1, pos2) for each substring, longest first.
+    """
+    lengths, pos1, pos2 = _cross_matches(seq1, seq2)
+    codes1, codes2 = _as_codes(seq1), _as_codes(seq2)
+
+    # Keep matches that cannot be extended to the left
+    left_max = (pos1 == 0) | (pos2 == 0)
+    inner = ~left_max
+    left_max[inner] = codes1[pos1[inner] - 1] != codes2[pos2[inner] - 1]
+    keep = left_max & (lengths >= min_length)
+    lengths, pos1, pos2 = lengths[keep], pos1[keep], pos2[keep]
+
+    out = []
+    seen = set()
+    for i in np.argsort(-lengths, kind='stable'):
+        if len(out) == k:
+            break
+        start1, start2 = int(pos1[i]), int(pos2[i])
+        substring = seq1[start1:start1+lengths[i]]
+        if substring not in seen:
+            seen.add(substring)
+            out.append((substring, start1, start2))
+
+    return out
@@ -0,0 +1,154 @@
+"""
+Complements and reverse complements of DNA and RNA sequences.
+"""
+import mmap
+
+import numpy as np
+
+import fasta
+
+# IUPAC bases and their complements. Ambiguity codes complement to the
+# code for the complementary set of bases, e.g., R (A/G) to Y (C/T).
+_iupac = 'ACGRYKMSWBDHVN-'
+_iupac_comp = 'TGCYRMKSWVHDBN-'
+
+# Characters stripped from sequence lines of FASTA files
+_whitespace = b' \t\r\n'
+
+
+def _make_tables(material):
+    """
+    Build translation tables for complementing a nucleic acid.
+
+    Returns
+    -------
+    case_table : bytes
+        Complements bases and keeps their case.
+    upper_table : bytes
+        Complements bases and converts them to upper case.
+    valid : bytes
+        All characters that are valid bases.
+    """
+    t_or_u = 'T' if material == 'DNA' else 'U'
+    bases = _iupac + 'TU'
+    comps = _iupac_comp.replace('T', t_or_u) + 'AA'
+
+    case_table = bytes.maketrans((bases + bases.lower()).encode(),
+                                 (comps + comps.lower()).encode())
+    upper_table = bytes.maketrans((bases + bases.lower()).encode(),
+                                  (comps + comps).encode())
+
+    return case_table, upper_table, (bases + bases.lower()).encode()
+
+
+_tables = {material: _make_tables(material) for material in ('DNA', 'RNA')}
+
+
+def _complement_bytes(seq, material, preserve_case):
+    """Complement a sequence stored as bytes."""
+    if material not in _tables:
+        raise RuntimeError(str(material) + ' is not a valid material.')
+    case_table, upper_table, valid = _tables[material]
+
+    # Anything left after deleting valid bases is invalid
+    invalid = seq.translate(None, valid)
+    if invalid:
+        raise RuntimeError(chr(invalid[0]) + ' is not a valid base.')
+
+    return seq.translate(case_table if preserve_case else upper_table)
+
+
+def complement(seq, material='DNA', preserve_case=False):
+    """
+    Compute the complement of a DNA or RNA sequence.
+
+    Parameters
+    ----------
+    seq : str or bytes
+        Sequence. IUPAC ambiguity codes and gaps ('-') are allowed.
+    material : str, default 'DNA'
+        Either 'DNA' or 'RNA'. Determines whether A is complemented
+        to T or U. Both T and U are complemented to A.
+    preserve_case : bool, default False
+        If True, lower case bases give lower case complements.
+        Otherwise, the result is in upper case.
+
+    Returns
+    -------
+    output : str or bytes
+        Complement, of the same type as `seq`.
+    """
+    if isinstance(seq, str):
+        return _complement_bytes(seq.encode('ascii'), material,
+                                 preserve_case).decode('ascii')
+    return _complement_bytes(bytes(seq), material, preserve_case)
+
+
+def reverse_complement(seq, material='DNA', preserve_case=False):
+    """
+    Compute the reverse complement of a DNA or RNA sequence.
+
+    Arguments are as for `complement()`.
+    """
+    comp = complement(seq, material=material, preserve_case=preserve_case)
+
+    return comp[::-1]
+
+
+def _wrap(seq, line_width):
+    """Break a sequence whose length is a multiple of line_width into lines."""
+    lines = np.frombuffer(seq, dtype=np.uint8).reshape(-1, line_width)
+    newlines = np.full((len(lines), 1), ord('\n'), dtype=np.uint8)
+
+    return np.hstack((lines, newlines)).tobytes()
+
+
+def reverse_complement_fasta(in_filename, out_filename, material='DNA',
+                             preserve_case=False, line_width=60,
+                             chunk_size=2**22):
+    """
+    Write the reverse complement of every record of a FASTA file to
+    a new FASTA file.
+
+    The input file is memory-mapped and each record is read from its
+    end in chunks of `chunk_size` bytes, so neither the record nor its
+    reverse complement is ever held in memory in full.
+
+    Parameters
+    ----------
+    in_filename : str
+        Name of input FASTA file.
+    out_filename : str
+        Name of output FASTA file. Headers are copied unchanged.
+    material : str, default 'DNA'
+        Either 'DNA' or 'RNA'. See `complement()`.
+    preserve_case : bool, default False
+        If True, keep the case of the bases. See `complement()`.
+    line_width : int, default 60
+        Number of bases per line of the output file.
+    chunk_size : int, default 2**22
+        Number of bytes of the input file processed at a time.
+    """
+    with open(in_filename, 'rb') as f, open(out_filename, 'wb') as f_out:
+        # Empty files cannot be memory-mapped
+        if f.seek(0, 2) == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for header, start, stop in fasta.record_spans(mm):
+                f_out.write(b'>' + header.encode('ascii') + b'\n')
+
+                # Partial line left over from the previous chunk
+                carry = b''
+                while stop > start:
+                    chunk_start = max(start, stop - chunk_size)
+                    seq = mm[chunk_start:stop].translate(None, _whitespace)
+                    seq = carry + _complement_bytes(seq, material,
+                                                    preserve_case)[::-1]
+
+                    n_full = len(seq) // line_width * line_width
+                    f_out.write(_wrap(seq[:n_full], line_width))
+                    carry = seq[n_full:]
+                    stop = chunk_start
+
+                if carry:
+                    f_out.write(carry + b'\n')
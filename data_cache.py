@@ -0,0 +1,335 @@
+"""
+On-disk binary cache of parsed text data files.
+
+Parsed arrays are stored as .npy files and parsed DataFrames as a
+directory with one .npy file per column. Entries are keyed by the path,
+size, and modification time of the source file and by the options used
+to parse it, so an entry is rebuilt whenever the file changes.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Cache directory used when none is given
+default_cache_dir = os.path.join(os.path.expanduser('~'), '.cache',
+                                 'bootcamp_data')
+
+
+def _has_callable(value):
+    """Whether a value, or anything in it, is a function."""
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_callable(item) for item in value)
+    return callable(value)
+
+
+def _func_name(func):
+    """Importable name of a function, or None, e.g., for a lambda."""
+    module = getattr(func, '__module__', None)
+    qualname = getattr(func, '__qualname__', None)
+    if module is None or qualname is None or '<' in qualname:
+        return None
+    return module + '.' + qualname
+
+
+def _keys(fname, func_name, options):
+    """
+    Key of the cache entries of a file parsed with given options, and
+    key of the current version of the file. Returns None if the options
+    cannot be keyed reliably, e.g., they include functions.
+    """
+    if _has_callable(options):
+        return None
+
+    path = os.path.abspath(fname)
+    stat = os.stat(path)
+    entry = repr((path, func_name, sorted(options.items())))
+    version = repr((stat.st_size, stat.st_mtime_ns))
+
+    return (hashlib.sha1(entry.encode()).hexdigest()[:20],
+            hashlib.sha1(version.encode()).hexdigest()[:12])
+
+
+def _lookup(fname, func_name, options, cache_dir):
+    """
+    Path of the cache entry of a file, whether it exists, and a
+    function that stores a new entry there, or (None, False, None) if
+    the file cannot be cached.
+    """
+    keys = _keys(fname, func_name, options)
+    if keys is None:
+        return None, False, None
+
+    cache_dir = default_cache_dir if cache_dir is None else cache_dir
+    path = os.path.join(cache_dir, keys[0] + '-' + keys[1])
+
+    def store(write):
+        """Write an entry atomically and remove stale versions of it."""
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=cache_dir, prefix='.tmp-')
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        except OSError:
+            # Another process stored the entry first
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+        for name in os.listdir(cache_dir):
+            if name.startswith(keys[0] + '-') and name != os.path.basename(
+                    path):
+                shutil.rmtree(os.path.join(cache_dir, name),
+                              ignore_errors=True)
+
+    return path, os.path.isdir(path), store
+
+
+def _write_array(path, data):
+    np.save(os.path.join(path, 'data.npy'), data, allow_pickle=False)
+
+
+def _read_array(path, mmap):
+    return np.load(os.path.join(path, 'data.npy'),
+                   mmap_mode='c' if mmap else None)
+
+
+# Pandas arrays of numbers with a mask of missing values
+_masked_arrays = (pd.arrays.IntegerArray, pd.arrays.FloatingArray,
+                  pd.arrays.BooleanArray)
+
+
+def _column_kind(col):
+    """
+    How a column is stored: 'array', 'masked', 'category', 'str', or
+    'bool', or None if it cannot be stored faithfully.
+    """
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        categories = col.cat.categories
+        if isinstance(categories.dtype, np.dtype) \
+                and categories.dtype.kind in 'biuf':
+            return 'category'
+        return 'category' if _column_kind(categories.to_series()) == 'str' \
+            else None
+    if isinstance(col.dtype, np.dtype) and col.dtype.kind in 'biufcmM':
+        return 'array'
+    if isinstance(col.array, _masked_arrays):
+        return 'masked'
+
+    # Strings, or booleans with missing values, as from `pd.read_csv()`
+    present = col[col.notna()].tolist()
+    if all(isinstance(value, str) for value in present):
+        return 'str'
+    if col.dtype == object and all(isinstance(value, (bool, np.bool_))
+                                   for value in present):
+        return 'bool'
+    return None
+
+
+def can_store(df):
+    """Whether `write_frame()` can store a DataFrame faithfully."""
+    if not isinstance(df.index, pd.RangeIndex) \
+            or df.index.start != 0 or df.index.step != 1:
+        df = df.reset_index()
+    return all(_column_kind(df.iloc[:, i]) is not None
+               for i in range(df.shape[1]))
+
+
+def write_frame(path, df):
+    """
+    Store the columns of a DataFrame as .npy files with a manifest in
+    an existing directory. Missing values of columns without a NaN of
+    their own are kept in separate masks.
+    """
+    columns = []
+    index = None
+    if not isinstance(df.index, pd.RangeIndex) \
+            or df.index.start != 0 or df.index.step != 1:
+        index = list(df.index.names)
+        df = df.reset_index()
+
+    for i, name in enumerate(df.columns):
+        col = df.iloc[:, i]
+        kind, extra = _column_kind(col), None
+        mask = None
+        if kind is None:
+            raise RuntimeError('Column ' + repr(name) + ' of dtype '
+                               + str(col.dtype) + ' cannot be stored.')
+        if kind == 'category':
+            categories = col.cat.categories
+            extra = {'categories': categories.tolist(),
+                     'categories_dtype': str(categories.dtype),
+                     'ordered': bool(col.cat.ordered)}
+            values = col.cat.codes.values
+        elif kind == 'array':
+            values = col.values
+        elif kind == 'masked':
+            mask = col.isna().values
+            values = col.array.to_numpy(dtype=col.dtype.numpy_dtype,
+                                        na_value=0)
+        elif kind == 'bool':
+            mask = col.isna().values
+            values = np.array(col.where(~mask, False).tolist(), dtype=bool)
+        else:
+            mask = col.isna().values
+            values = np.array(col.where(~mask, '').tolist(), dtype=str)
+
+        if mask is not None:
+            np.save(os.path.join(path, 'mask_' + str(i) + '.npy'), mask)
+        np.save(os.path.join(path, 'col_' + str(i) + '.npy'),
+                np.asarray(values), allow_pickle=False)
+        columns.append({'name': name, 'kind': kind,
+                        'dtype': str(col.dtype), 'extra': extra})
+
+    with open(os.path.join(path, 'manifest.json'), 'w') as f:
+        json.dump({'columns': columns, 'index': index}, f)
+
+
+def _read_column(path, i, col, mmap):
+    """Rebuild column `i`, described by `col`, of a stored DataFrame."""
+    values = np.load(os.path.join(path, 'col_' + str(i) + '.npy'),
+                     mmap_mode='c' if mmap else None)
+    if col['kind'] == 'array':
+        return values if str(values.dtype) == col['dtype'] \
+            else values.astype(col['dtype'])
+    if col['kind'] == 'category':
+        extra = col['extra']
+        categories = pd.Index(extra['categories'],
+                              dtype=extra.get('categories_dtype'))
+        return pd.Categorical.from_codes(np.asarray(values),
+                                         categories=categories,
+                                         ordered=extra['ordered'])
+
+    mask = np.load(os.path.join(path, 'mask_' + str(i) + '.npy'))
+    if col['kind'] == 'masked':
+        values = pd.array(np.asarray(values), dtype=col['dtype'])
+        values[mask] = pd.NA
+        return values
+    values = np.asarray(values).astype(object)
+    values[mask] = np.nan
+    return values if col['kind'] == 'bool' \
+        else pd.Series(values).astype(col['dtype']).values
+
+
+def read_frame(path, mmap=True):
+    """
+    Rebuild a DataFrame stored by `write_frame()`. If `mmap` is True,
+    numeric columns are memory-mapped, copy-on-write.
+    """
+    with open(os.path.join(path, 'manifest.json')) as f:
+        manifest = json.load(f)
+
+    data = {i: _read_column(path, i, col, mmap)
+            for i, col in enumerate(manifest['columns'])}
+
+    df = pd.DataFrame(data, copy=False)
+    df.columns = [col['name'] for col in manifest['columns']]
+    if manifest['index'] is not None:
+        n_index = len(manifest['index'])
+        df = df.set_index(list(df.columns[:n_index]))
+        df.index.names = manifest['index']
+
+    return df
+
+
+def cached_loadtxt(fname, cache_dir=None, mmap=True, **kwargs):
+    """
+    Load a text file with `np.loadtxt()`, caching the parsed array.
+
+    Parameters
+    ----------
+    fname : str
+        Name of text file.
+    cache_dir : str, default None
+        Directory of the cache. If None, `default_cache_dir`.
+    mmap : bool, default True
+        If True, return the cached array memory-mapped. Changes to it
+        stay in memory and never reach the cache.
+    kwargs
+        Arguments to `np.loadtxt()`, e.g., `skiprows=3, delimiter=','`.
+        They are part of the cache key. Arguments that are functions,
+        such as `converters`, disable the cache.
+
+    Returns
+    -------
+    output : ndarray
+        Parsed data.
+    """
+    path, hit, store = _lookup(fname, 'loadtxt', kwargs, cache_dir)
+    if path is None:
+        return np.loadtxt(fname, **kwargs)
+    if not hit:
+        data = np.loadtxt(fname, **kwargs)
+        store(lambda tmp: _write_array(tmp, data))
+
+    return _read_array(path, mmap)
+
+
+def cached_read_csv(fname, cache_dir=None, mmap=True, postprocess=None,
+                    **kwargs):
+    """
+    Load a CSV file with `pd.read_csv()`, caching the parsed DataFrame
+    one column per binary file.
+
+    Parameters
+    ----------
+    fname : str
+        Name of CSV file.
+    cache_dir : str, default None
+        Directory of the cache. If None, `default_cache_dir`.
+    mmap : bool, default True
+        If True, memory-map the cached numeric columns, copy-on-write.
+    postprocess : function, default None
+        Function applied to the parsed DataFrame, e.g.,
+        `frame_memory.optimize_frame`. If it has an importable name,
+        the processed frame is cached under a key including that name,
+        so cache hits memory-map it without holding the raw frame.
+        Changes to the code of the function are not detected; clear
+        the cache after making them. Functions without a name, such as
+        lambdas, are applied to the cached raw frame on every call.
+    kwargs
+        Arguments to `pd.read_csv()`, e.g., `comment='#'`. They are part
+        of the cache key. Arguments that are functions, such as
+        `converters`, disable the cache, as do columns of objects other
+        than strings and booleans.
+
+    Returns
+    -------
+    output : DataFrame
+        Parsed data.
+    """
+    # Frames post-processed by named functions are cached as such, so
+    # that hits map the smaller frame; others are processed after
+    name = None if postprocess is None else _func_name(postprocess)
+    options = kwargs if name is None else dict(kwargs, postprocess=name)
+    after = postprocess if name is None else None
+
+    def parse():
+        df = pd.read_csv(fname, **kwargs)
+        return df if name is None else postprocess(df)
+
+    path, hit, store = _lookup(fname, 'read_csv', options, cache_dir)
+    if path is None:
+        df = parse()
+    elif hit:
+        df = read_frame(path, mmap)
+    else:
+        df = parse()
+        # Columns that cannot be stored faithfully are not cached
+        if can_store(df):
+            store(lambda tmp: write_frame(tmp, df))
+            df = read_frame(path, mmap)
+
+    return df if after is None else after(df)
+
+
+def clear_cache(cache_dir=None):
+    """Remove all entries of a cache."""
+    cache_dir = default_cache_dir if cache_dir is None else cache_dir
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
@@ -0,0 +1,115 @@
+"""
+Reading sequences from FASTA files.
+"""
+import mmap
+
+import numpy as np
+
+# Characters stripped from sequence lines
+_whitespace = b' \t\r\n'
+
+
+def _convert(seq, as_type):
+    """Convert a sequence stored as bytes to the requested type."""
+    if as_type == 'str':
+        return seq.decode('ascii')
+    elif as_type == 'bytes':
+        return seq
+    elif as_type == 'numpy':
+        return np.frombuffer(seq, dtype=np.uint8)
+    else:
+        raise RuntimeError(str(as_type) + ' is not a valid sequence type.')
+
+
+def record_spans(buf):
+    """
+    Locate the records of a FASTA file held in a buffer.
+
+    Parameters
+    ----------
+    buf : bytes or mmap
+        Contents of a FASTA file.
+
+    Yields
+    ------
+    header : str
+        Header line of the record, without the leading '>'.
+    start : int
+        Position in `buf` where the sequence lines of the record start.
+    stop : int
+        Position in `buf` where the sequence lines of the record end.
+    """
+    start = buf.find(b'>')
+    while start != -1:
+        header_end = buf.find(b'\n', start)
+        if header_end == -1:
+            header_end = len(buf)
+
+        # Records start with '>' at the beginning of a line
+        next_start = buf.find(b'\n>', header_end)
+        seq_end = len(buf) if next_start == -1 else next_start
+
+        header = buf[start+1:header_end].decode('ascii').rstrip()
+        yield header, header_end, seq_end
+
+        start = -1 if next_start == -1 else next_start + 1
+
+
+def read_fasta(filename, as_type='str'):
+    """
+    Lazily read the records of a FASTA file.
+
+    The file is memory-mapped, and the sequence of each record is
+    assembled from its lines with a single `bytes.translate` call that
+    strips the line breaks, so only one record is held in memory at a
+    time.
+
+    Parameters
+    ----------
+    filename : str
+        Name of FASTA file. It may contain any number of records.
+    as_type : str, default 'str'
+        Type of the returned sequences. 'str' gives a string, 'bytes'
+        a bytes object, and 'numpy' a read-only NumPy uint8 view of
+        the bytes.
+
+    Yields
+    ------
+    header : str
+        Header line of the record, without the leading '>'.
+    seq : str, bytes, or ndarray
+        Sequence of the record.
+    """
+    # Validate type before touching the file
+    _convert(b'', as_type)
+
+    with open(filename, 'rb') as f:
+        # Empty files cannot be memory-mapped
+        if f.seek(0, 2) == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for header, start, stop in record_spans(mm):
+                seq = mm[start:stop].translate(None, _whitespace)
+                yield header, _convert(seq, as_type)
+
+
+def read_fasta_seq(filename, as_type='str'):
+    """
+    Read the sequence of the first record of a FASTA file.
+
+    Parameters
+    ----------
+    filename : str
+        Name of FASTA file.
+    as_type : str, default 'str'
+        Type of the returned sequence. See `read_fasta()`.
+
+    Returns
+    -------
+    output : str, bytes, or ndarray
+        Sequence of the first record.
+    """
+    for _, seq in read_fasta(filename, as_type=as_type):
+        return seq
+
+    raise RuntimeError(filename + ' contains no FASTA records.')
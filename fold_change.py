@@ -0,0 +1,347 @@
+"""
+Fitting of the MWC fold-change model of induction to many repressor
+mutants at once.
+"""
+import collections
+
+import numpy as np
+
+# Parameters shared by all mutants, in the order of the fit vector,
+# with their default values
+shared_params = ('Kda', 'Kdi', 'Kswitch')
+_shared_defaults = np.array([0.017, 0.002, 5.8])
+
+# Magnitude of a log parameter beyond which a fit has run off along a
+# direction the data do not determine
+_max_log_param = 30.0
+
+# Result of a fit. Each field has the batch shape; RK has an extra
+# trailing axis indexing mutants.
+FoldChangeFit = collections.namedtuple(
+    'FoldChangeFit', ['Kda', 'Kdi', 'Kswitch', 'RK', 'cost', 'converged'])
+
+
+def _active_fraction(c, Kda, Kdi, Kswitch):
+    """
+    Fraction of repressors in the active state, with the squared
+    binding terms it is built from.
+    """
+    a = (1 + c / Kda)**2
+    b = (1 + c / Kdi)**2
+    return a / (a + Kswitch * b), a, b
+
+
+def fold_change(c, RK, Kda=0.017, Kdi=0.002, Kswitch=5.8):
+    """
+    Fold change in expression at inducer concentration c.
+
+    Parameters
+    ----------
+    c : array_like
+        Inducer (IPTG) concentration, in mM.
+    RK : array_like
+        Repressor copy number over its operator dissociation constant.
+    Kda : array_like, default 0.017
+        Dissociation constant of the inducer from the active repressor.
+    Kdi : array_like, default 0.002
+        Dissociation constant of the inducer from the inactive
+        repressor.
+    Kswitch : array_like, default 5.8
+        Equilibrium constant between inactive and active repressors.
+
+    Returns
+    -------
+    output : ndarray
+        Fold change, broadcast over all arguments.
+    """
+    p_act, _, _ = _active_fraction(c, Kda, Kdi, Kswitch)
+    return 1 / (1 + RK * p_act)
+
+
+def bohr_parameter(c, RK, Kda=0.017, Kdi=0.002, Kswitch=5.8):
+    """Bohr parameter, which collapses fold change onto one curve"""
+    p_act, _, _ = _active_fraction(c, Kda, Kdi, Kswitch)
+    return -np.log(RK) - np.log(p_act)
+
+
+def fold_change_bohr(bohr_parameter):
+    """Fold change in terms of the Bohr parameter"""
+    return 1 / (1 + np.exp(-bohr_parameter))
+
+
+def fold_change_jacobian(c, RK, Kda=0.017, Kdi=0.002, Kswitch=5.8):
+    """
+    Derivatives of the fold change with respect to the logarithms of
+    its parameters.
+
+    Returns
+    -------
+    output : ndarray
+        Array with a trailing axis of length 4, the derivatives with
+        respect to log Kda, log Kdi, log Kswitch, and log RK.
+    """
+    p_act, a, b = _active_fraction(c, Kda, Kdi, Kswitch)
+    fc = 1 / (1 + RK * p_act)
+    denom = (a + Kswitch * b)**2
+
+    # d p_act / d log K for each of the shared parameters
+    dp_dkda = Kswitch * b / denom * (-2 * (1 + c / Kda) * c / Kda)
+    dp_dkdi = -a * Kswitch / denom * (-2 * (1 + c / Kdi) * c / Kdi)
+    dp_dkswitch = -a * Kswitch * b / denom
+
+    scale = -fc**2 * RK
+    return np.stack(np.broadcast_arrays(scale * dp_dkda, scale * dp_dkdi,
+                                        scale * dp_dkswitch,
+                                        scale * p_act), axis=-1)
+
+
+def _initial_guess(fc, bins, n_mutants):
+    """
+    Initial log parameters, with each RK estimated from the lowest fold
+    change of its mutant, where the inducer is scarce. `bins` numbers
+    the (problem, mutant) pair of each observation, as in
+    `fit_fold_change()`.
+    """
+    batch_shape = fc.shape[:-1]
+    theta = np.empty(batch_shape + (3 + n_mutants,))
+    theta[..., :3] = np.log(_shared_defaults)
+
+    leak = np.full(int(np.prod(batch_shape)) * n_mutants, np.inf)
+    np.minimum.at(leak, bins, fc.ravel())
+    leak = np.clip(leak.reshape(batch_shape + (n_mutants,)), 1e-4, 0.99)
+
+    K = _shared_defaults[2]
+    theta[..., 3:] = np.log((1 / leak - 1) * (1 + K))
+
+    return theta
+
+
+def _residuals(theta, c, fc, mutant_ids):
+    """
+    Residuals of a batch of log parameter vectors, with the nonzero
+    parts of their Jacobian: the derivatives with respect to the shared
+    parameters, and with respect to the RK of each observation's mutant.
+    """
+    params = np.exp(theta)
+    RK = np.take(params[..., 3:], mutant_ids, axis=-1)
+    shared = [params[..., i:i+1] for i in range(3)]
+
+    resid = fold_change(c, RK, *shared) - fc
+    jac_obs = fold_change_jacobian(c, RK, *shared)
+
+    return resid, jac_obs[..., :3], jac_obs[..., 3]
+
+
+def _lm_step(resid, jac_shared, jac_rk, sums, free, lam):
+    """
+    Levenberg-Marquardt steps of a batch of problems.
+
+    Each observation depends on the shared parameters and the RK of its
+    own mutant only, so the RK block of the normal equations is
+    diagonal. It is eliminated, leaving a 3x3 system for the shared
+    parameters (its Schur complement), and the whole step costs
+    O(n_obs) per problem.
+    """
+    # Blocks of the normal equations, J^T J = [[A, B], [B^T, D]]
+    jac_shared_t = np.swapaxes(jac_shared, -1, -2)
+    A = jac_shared_t @ jac_shared
+    B = np.stack([sums(jac_shared[..., j] * jac_rk) for j in range(3)],
+                 axis=-2)
+    D = sums(jac_rk**2)
+    grad_shared = (jac_shared_t @ resid[..., None])[..., 0]
+    grad_rk = sums(jac_rk * resid)
+
+    # Damping; fixed parameters get a unit diagonal and zero gradient
+    eye = np.eye(3)
+    A = A + lam[..., None, None] * (eye * A + 1e-12 * eye) + np.diag(~free)
+    D = D * (1 + lam[..., None]) + 1e-12 * lam[..., None]
+    D = np.where(D > 0, D, 1)
+
+    # Solve for the shared step, then back-substitute for the RK steps
+    schur = A - np.einsum('...jk,...lk->...jl', B / D[..., None, :], B)
+    rhs = -grad_shared + np.einsum('...jk,...k->...j', B, grad_rk / D)
+    step_shared = np.linalg.solve(schur, rhs[..., None])[..., 0]
+    step_rk = -(grad_rk + np.einsum('...jk,...j->...k', B, step_shared)) / D
+
+    return np.concatenate((step_shared, step_rk), axis=-1)
+
+
+def fit_fold_change(c, fc, mutant_ids, n_mutants=None, fixed=None,
+                    theta0=None, max_iter=200, tol=1e-10, xtol=1e-4):
+    """
+    Fit shared Kda, Kdi, and Kswitch, and an RK for each mutant, to
+    fold change data by least squares.
+
+    Many independent data sets, e.g., bootstrap replicates, are fit
+    together: their leading axes form a batch, and all problems are
+    advanced by Levenberg-Marquardt steps at once. The Jacobian is
+    computed analytically, and the normal equations are reduced to a
+    3x3 system per problem, so each iteration costs time and memory
+    linear in the number of observations, however many mutants there
+    are. Parameters are fit on a log scale, so they stay positive.
+
+    Parameters
+    ----------
+    c : array_like
+        Inducer concentrations, shape (n_obs,) or (..., n_obs).
+    fc : array_like
+        Measured fold changes, shape (..., n_obs).
+    mutant_ids : array_like
+        Integer index of the mutant of each observation, shape
+        (n_obs,). It is shared by all problems of a batch.
+    n_mutants : int, default None
+        Number of mutants. If None, `max(mutant_ids) + 1`.
+    fixed : dict, default None
+        Values of shared parameters to hold fixed, e.g.,
+        {'Kswitch': 5.8}. Without data near saturating inducer, only
+        the ratio of RK to Kswitch is determined, and Kswitch should
+        be fixed.
+    theta0 : ndarray, default None
+        Initial log parameters, (log Kda, log Kdi, log Kswitch,
+        log RK_0, log RK_1, ...), for each problem. If None, guessed
+        from the data.
+    max_iter : int, default 200
+        Maximum number of Levenberg-Marquardt iterations.
+    tol : float, default 1e-10
+        Relative decrease of the cost below which a problem has
+        converged.
+    xtol : float, default 1e-4
+        Largest step in the log parameters with which a problem may
+        converge.
+
+    Returns
+    -------
+    output : FoldChangeFit
+        Named tuple of the parameters, the cost (half the sum of squared
+        residuals), and whether each problem converged. Parameters of
+        problems that did not converge in `max_iter` iterations, or
+        that ran off to extreme values, are NaN.
+    """
+    fc = np.asarray(fc, dtype=float)
+    c = np.broadcast_to(np.asarray(c, dtype=float), fc.shape)
+    mutant_ids = np.asarray(mutant_ids, dtype=np.int64)
+    if mutant_ids.shape != fc.shape[-1:]:
+        raise RuntimeError('Need one mutant index per observation.')
+    if n_mutants is None:
+        n_mutants = mutant_ids.max() + 1
+
+    # Bins of the (problem, mutant) pair of each observation, for sums
+    # and minima over the observations of each mutant of each problem
+    batch_shape = fc.shape[:-1]
+    n_batch = int(np.prod(batch_shape))
+    bins = (np.arange(n_batch)[:, None] * n_mutants + mutant_ids).ravel()
+
+    if theta0 is None:
+        theta = _initial_guess(fc, bins, n_mutants)
+    else:
+        theta = np.array(np.broadcast_to(theta0, fc.shape[:-1]
+                                         + (3 + n_mutants,)), dtype=float)
+
+    # Fixed parameters get zero steps
+    free = np.ones(3, dtype=bool)
+    for name, value in (fixed or {}).items():
+        if name not in shared_params:
+            raise RuntimeError(str(name) + ' is not a shared parameter.')
+        k = shared_params.index(name)
+        theta[..., k] = np.log(value)
+        free[k] = False
+
+    def sums(x):
+        return np.bincount(bins, weights=x.ravel(),
+                           minlength=n_batch * n_mutants).reshape(
+                               batch_shape + (n_mutants,))
+
+    lam = np.full(batch_shape, 1e-3)
+    converged = np.zeros(batch_shape, dtype=bool)
+    resid, jac_shared, jac_rk = _residuals(theta, c, fc, mutant_ids)
+    jac_shared[..., ~free] = 0
+    cost = 0.5 * np.sum(resid**2, axis=-1)
+
+    for _ in range(max_iter):
+        step = _lm_step(resid, jac_shared, jac_rk, sums, free, lam)
+        step[converged] = 0
+
+        # Steps out of range are rejected like steps raising the cost
+        theta_new = theta + step
+        out = np.abs(theta_new).max(axis=-1) > _max_log_param
+        theta_new[out] = theta[out]
+        resid_new, jac_shared_new, jac_rk_new = _residuals(
+            theta_new, c, fc, mutant_ids)
+        jac_shared_new[..., ~free] = 0
+        cost_new = 0.5 * np.sum(resid_new**2, axis=-1)
+
+        # Accept steps that lower the cost; shrink the damping for those
+        accept = (cost_new < cost) & ~converged & ~out
+        decrease = np.where(accept, cost - cost_new, 0)
+        # A fit has converged when steps barely lower the cost and are
+        # small; parameters drifting along a flat valley keep taking
+        # large steps, and do not converge
+        step_size = np.abs(step).max(axis=-1)
+        converged |= accept & (decrease <= tol * cost) & (step_size <= xtol)
+        converged |= step_size < 1e-12
+
+        theta = np.where(accept[..., None], theta_new, theta)
+        resid = np.where(accept[..., None], resid_new, resid)
+        jac_shared = np.where(accept[..., None, None], jac_shared_new,
+                              jac_shared)
+        jac_rk = np.where(accept[..., None], jac_rk_new, jac_rk)
+        cost = np.where(accept, cost_new, cost)
+        lam = np.where(accept, lam / 10, np.minimum(lam * 10, 1e10))
+
+        if np.all(converged):
+            break
+
+    # Parameters of unfinished fits, or of fits that ran off to the edge
+    # of the range, are not estimates
+    converged &= np.abs(theta).max(axis=-1) < _max_log_param - 1
+    params = np.where(converged[..., None], np.exp(theta), np.nan)
+    return FoldChangeFit(Kda=params[..., 0], Kdi=params[..., 1],
+                         Kswitch=params[..., 2], RK=params[..., 3:],
+                         cost=cost, converged=converged)
+
+
+def bootstrap_fits(c, fc, mutant_ids, size=1000, seed=None, n_mutants=None,
+                   **kwargs):
+    """
+    Fit bootstrap replicates of fold change data in one batch.
+
+    Observations are resampled with replacement within each mutant,
+    so every replicate keeps the number of observations per mutant.
+
+    Parameters
+    ----------
+    c : array_like
+        Inducer concentrations, shape (n_obs,).
+    fc : array_like
+        Measured fold changes, shape (n_obs,).
+    mutant_ids : array_like
+        Integer index of the mutant of each observation.
+    size : int, default 1000
+        Number of bootstrap replicates.
+    seed : int, default None
+        Seed for the random number generator.
+    n_mutants : int, default None
+        Number of mutants. If None, `max(mutant_ids) + 1`.
+    kwargs
+        Further arguments to `fit_fold_change()`.
+
+    Returns
+    -------
+    output : FoldChangeFit
+        Fits of the replicates; each field has a leading axis of
+        length `size`.
+    """
+    c, fc = np.asarray(c, dtype=float), np.asarray(fc, dtype=float)
+    mutant_ids = np.asarray(mutant_ids, dtype=np.int64)
+
+    # Sort by mutant, then draw indices within each mutant's block
+    order = np.argsort(mutant_ids, kind='stable')
+    c, fc, mutant_ids = c[order], fc[order], mutant_ids[order]
+    starts = np.searchsorted(mutant_ids, mutant_ids)
+    counts = np.bincount(mutant_ids)[mutant_ids]
+
+    rg = np.random.default_rng(seed)
+    inds = starts + (rg.random((size, len(fc))) * counts).astype(np.int64)
+
+    return fit_fold_change(c[inds], fc[inds], mutant_ids,
+                           n_mutants=n_mutants, **kwargs)
@@ -0,0 +1,215 @@
+"""
+Reducing the memory used by tidy DataFrames.
+
+Columns are converted to the most compact dtypes that hold their values
+exactly: repetitive strings to categoricals, dates to datetime64, and
+numbers to the narrowest integer or float type.
+"""
+import numpy as np
+import pandas as pd
+
+# Date formats tried on string columns. Formats are given explicitly so
+# that parsing is fast and never ambiguous.
+date_formats = ('%Y-%m-%d', '%Y_%m_%d', '%Y/%m/%d', '%Y-%m-%d %H:%M:%S')
+
+_int_types = (np.int8, np.int16, np.int32, np.int64)
+_uint_types = (np.uint8, np.uint16, np.uint32, np.uint64)
+
+# Largest magnitude up to which all integers are exact in float64
+_max_exact_int = 2**53
+
+
+def _smallest_int(values):
+    """
+    Narrowest integer type holding all of `values`, unsigned if they
+    are unsigned and signed otherwise.
+    """
+    types = _uint_types if values.dtype.kind == 'u' else _int_types
+    if len(values) == 0:
+        return types[0]
+    low, high = values.min(), values.max()
+    for dtype in types:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return values.dtype
+
+
+def _parse_dates(col, formats):
+    """A string column as datetime64, or None if it does not hold dates."""
+    present = col.notna()
+    if not present.any():
+        return None
+    for fmt in formats:
+        dates = pd.to_datetime(col, format=fmt, errors='coerce')
+        if dates[present].notna().all():
+            return dates
+    return None
+
+
+def optimize_column(col, max_unique=0.5, formats=date_formats,
+                    allow_float32=False):
+    """
+    Convert a column to the most compact dtype that holds its values.
+
+    Parameters
+    ----------
+    col : Series
+        Column to convert.
+    max_unique : float, default 0.5
+        Strings become categorical if the number of distinct values is
+        at most this fraction of the number of values present.
+    formats : tuple of str, default `date_formats`
+        Formats with which to try parsing strings as dates. All present
+        values must parse with the same format.
+    allow_float32 : bool, default False
+        If True, convert all double precision floats to float32, at a
+        relative error of about 1e-7. Otherwise, only floats that
+        float32 holds exactly are converted.
+
+    Returns
+    -------
+    output : Series
+        Converted column, or `col` if no conversion saves memory.
+    """
+    dtype = col.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or dtype.kind in 'bmMc':
+        return col
+
+    # Nullable integers keep their mask; other extension types that are
+    # not strings are left as they are
+    if isinstance(col.array, pd.arrays.IntegerArray):
+        numpy_dtype = dtype.numpy_dtype
+        new = np.dtype(_smallest_int(col.dropna().to_numpy(
+            dtype=numpy_dtype)))
+        if new.itemsize >= numpy_dtype.itemsize:
+            return col
+        return col.astype(('UInt' if new.kind == 'u' else 'Int')
+                          + str(8 * new.itemsize))
+    if not isinstance(dtype, np.dtype) \
+            and not pd.api.types.is_string_dtype(dtype):
+        return col
+
+    if dtype.kind in 'iu':
+        new = np.dtype(_smallest_int(col.values))
+        return col if new.itemsize >= dtype.itemsize else col.astype(new)
+
+    if dtype.kind == 'f':
+        values = col.values
+        finite = np.isfinite(values)
+        # Whole numbers with no missing values are integers, if float64
+        # holds every integer up to their size exactly
+        if finite.all() and np.all(np.abs(values) <= _max_exact_int) \
+                and np.array_equal(values, np.round(values)):
+            new = np.dtype(_smallest_int(values.astype(np.int64)))
+            if new.itemsize < dtype.itemsize:
+                return col.astype(new)
+        if dtype.itemsize > 4:
+            if allow_float32 and np.all(np.abs(values[finite]) <=
+                                        np.finfo(np.float32).max):
+                return col.astype(np.float32)
+            values32 = values.astype(np.float32)
+            if np.array_equal(values32.astype(dtype), values, equal_nan=True):
+                return col.astype(np.float32)
+        return col
+
+    if not pd.api.types.is_string_dtype(dtype):
+        return col
+
+    dates = _parse_dates(col, formats)
+    if dates is not None:
+        return dates
+
+    n_present = col.notna().sum()
+    if n_present > 0 and col.nunique() <= max_unique * n_present:
+        return col.astype('category')
+    return col
+
+
+def optimize_frame(df, max_unique=0.5, formats=date_formats,
+                   allow_float32=False):
+    """
+    Convert each column of a DataFrame to the most compact dtype that
+    holds its values.
+
+    Integers are narrowed to the smallest type of the same signedness
+    that fits them, nullable ones to the matching nullable type, floats
+    that are all whole numbers of at most 2**53 become integers and
+    others become float32 where that loses nothing, strings that are
+    all dates become datetime64, and strings with few distinct values
+    become categorical. Columns are left as they are if no conversion
+    saves memory.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Data to convert.
+    max_unique : float, default 0.5
+        Strings become categorical if the number of distinct values is
+        at most this fraction of the number of values present.
+    formats : tuple of str, default `date_formats`
+        Formats with which to try parsing strings as dates.
+    allow_float32 : bool, default False
+        If True, convert all double precision floats to float32, at a
+        small loss of precision.
+
+    Returns
+    -------
+    output : DataFrame
+        Converted copy of `df`.
+
+    Examples
+    --------
+    >>> df = pd.read_csv('data/frog_tongue_adhesion.csv', comment='#')
+    >>> df_small = optimize_frame(df)
+    >>> memory_report(df, df_small)
+    """
+    # Columns are taken by position, so duplicate names are kept
+    out = pd.DataFrame({i: optimize_column(df.iloc[:, i],
+                                           max_unique=max_unique,
+                                           formats=formats,
+                                           allow_float32=allow_float32)
+                        for i in range(df.shape[1])}, index=df.index)
+    out.columns = df.columns
+    return out
+
+
+def memory_report(df, optimized=None):
+    """
+    Memory used by each column of a DataFrame.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Data to profile.
+    optimized : DataFrame, default None
+        Converted version of `df`, e.g., from `optimize_frame()`, to
+        compare against.
+
+    Returns
+    -------
+    output : DataFrame
+        Dtype and bytes of each column, including the memory held by
+        strings, with a final row for the index and one for the total.
+        If `optimized` is given, also its dtypes and bytes, and the
+        ratio of bytes after to bytes before.
+    """
+    def profile(frame):
+        nbytes = frame.memory_usage(deep=True)
+        report = pd.DataFrame(
+            {'dtype': [str(frame.index.dtype)]
+                      + [str(dtype) for dtype in frame.dtypes],
+             'bytes': nbytes.values},
+            index=['Index'] + list(frame.columns))
+        total = pd.DataFrame({'dtype': [''], 'bytes': [nbytes.sum()]},
+                             index=['total'])
+        return pd.concat((report.iloc[1:], report.iloc[:1], total))
+
+    report = profile(df)
+    if optimized is not None:
+        after = profile(optimized)
+        report['dtype after'] = after['dtype'].values
+        report['bytes after'] = after['bytes'].values
+        report['ratio'] = report['bytes after'] / report['bytes']
+
+    return report
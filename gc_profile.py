@@ -0,0 +1,183 @@
+"""
+GC content of DNA sequences over sliding windows.
+"""
+import numpy as np
+
+# 1 for G and C, either case, 0 for everything else
+_gc_table = np.zeros(256, dtype=np.uint8)
+_gc_table[[ord(base) for base in 'GCgc']] = 1
+
+# Byte tables for changing case: row 0 to lower case, row 1 to upper case
+_case_table = np.tile(np.arange(256, dtype=np.uint8), (2, 1))
+_case_table[0, ord('A'):ord('Z')+1] += 32
+_case_table[1, ord('a'):ord('z')+1] -= 32
+
+
+def _as_bytes(seq):
+    """View a str, bytes, or uint8 array sequence as a uint8 array."""
+    if isinstance(seq, str):
+        seq = seq.encode('ascii')
+    return np.frombuffer(seq, dtype=np.uint8)
+
+
+def gc_mask(seq):
+    """uint8 array that is 1 where a sequence has a G or C"""
+    return _gc_table[_as_bytes(seq)]
+
+
+def gc_prefix(seq):
+    """
+    Cumulative number of G's and C's in a sequence.
+
+    Returns
+    -------
+    output : ndarray
+        Array of length len(seq) + 1 whose entry i is the number of
+        G's and C's in seq[:i].
+    """
+    return np.concatenate(((0,), np.cumsum(gc_mask(seq), dtype=np.int64)))
+
+
+def _window_starts(n, block_size, step):
+    """Start positions of all windows that fit in a sequence of length n."""
+    if block_size < 1 or step < 1:
+        raise RuntimeError('Window size and step must be positive.')
+    return np.arange(0, n - block_size + 1, step)
+
+
+def gc_blocks(seq, block_size, step=None, prefix=None):
+    """
+    GC content of windows of a sequence.
+
+    Parameters
+    ----------
+    seq : str, bytes, or ndarray
+        DNA sequence.
+    block_size : int
+        Length of each window.
+    step : int, default None
+        Distance between the starts of consecutive windows. Defaults
+        to `block_size`, giving non-overlapping blocks. Windows
+        overlap if `step` is less than `block_size`.
+    prefix : ndarray, default None
+        Result of `gc_prefix(seq)`, if already computed.
+
+    Returns
+    -------
+    output : ndarray
+        Fraction of G's and C's in each window that fits completely in
+        the sequence.
+    """
+    if step is None:
+        step = block_size
+    if prefix is None:
+        prefix = gc_prefix(seq)
+
+    starts = _window_starts(len(prefix) - 1, block_size, step)
+
+    return (prefix[starts + block_size] - prefix[starts]) / block_size
+
+
+def gc_tracks(seq, block_sizes, steps=None):
+    """
+    GC content over several window sizes from a single pass over a
+    sequence.
+
+    Parameters
+    ----------
+    seq : str, bytes, or ndarray
+        DNA sequence.
+    block_sizes : list of ints
+        Length of the windows of each track.
+    steps : list of ints, default None
+        Step of each track. Defaults to the window sizes.
+
+    Returns
+    -------
+    output : list of ndarrays
+        GC content of the windows of each track, as in `gc_blocks()`.
+    """
+    if steps is None:
+        steps = block_sizes
+    prefix = gc_prefix(seq)
+
+    return [gc_blocks(None, block_size, step=step, prefix=prefix)
+            for block_size, step in zip(block_sizes, steps)]
+
+
+def gc_map(seq, block_size, gc_thresh):
+    """
+    Give a sequence in upper case in non-overlapping blocks with GC
+    content above `gc_thresh` and in lower case elsewhere.
+
+    A trailing partial block is kept, in lower case.
+    """
+    seq_bytes = _as_bytes(seq)
+    high_gc = gc_blocks(seq_bytes, block_size) > gc_thresh
+    n_full = len(high_gc) * block_size
+
+    # One lookup per base, with the table row of each block broadcast
+    # over its bases
+    out = np.empty_like(seq_bytes)
+    out[:n_full] = _case_table[high_gc.astype(np.intp)[:, None],
+                               seq_bytes[:n_full].reshape(-1, block_size)
+                               ].ravel()
+    out[n_full:] = _case_table[0, seq_bytes[n_full:]]
+    out = out.tobytes()
+
+    return out.decode('ascii') if isinstance(seq, str) else out
+
+
+def gc_tracks_stream(chunks, block_sizes, steps=None):
+    """
+    GC content over several window sizes of a sequence that arrives
+    in chunks.
+
+    Bases after the start of the next window of any track are carried
+    over to the next chunk, so windows spanning chunk boundaries are
+    computed as if the whole sequence were in memory.
+
+    Parameters
+    ----------
+    chunks : iterable of str, bytes, or ndarrays
+        Consecutive pieces of the DNA sequence.
+    block_sizes : list of ints
+        Length of the windows of each track.
+    steps : list of ints, default None
+        Step of each track. Defaults to the window sizes.
+
+    Yields
+    ------
+    output : list of ndarrays
+        For each chunk, GC content of the windows of each track that
+        were completed by that chunk.
+    """
+    if steps is None:
+        steps = block_sizes
+
+    # Validate window sizes and steps up front
+    for block_size, step in zip(block_sizes, steps):
+        _window_starts(0, block_size, step)
+
+    # Position of the first carried-over base and of each track's next window
+    base = 0
+    next_starts = [0] * len(block_sizes)
+    carry = np.empty(0, dtype=np.uint8)
+
+    for chunk in chunks:
+        buf = np.concatenate((carry, gc_mask(chunk)))
+        prefix = np.concatenate(((0,), np.cumsum(buf, dtype=np.int64)))
+        end = base + len(buf)
+
+        out = []
+        for i, (block_size, step) in enumerate(zip(block_sizes, steps)):
+            starts = next_starts[i] - base + _window_starts(
+                        end - next_starts[i], block_size, step)
+            out.append((prefix[starts + block_size] - prefix[starts])
+                       / block_size)
+            next_starts[i] += step * len(starts)
+        yield out
+
+        new_base = min(min(next_starts), end)
+        carry = buf[new_base - base:]
+        base = new_base
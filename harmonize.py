@@ -0,0 +1,353 @@
+"""
+Loading data sets split over files with inconsistent column names into
+one tidy DataFrame.
+
+A schema is given declaratively: a map from each canonical column name
+to its aliases in the files, a map from each file to metadata columns
+to add to its rows (e.g., the year), and the dtypes of the columns.
+"""
+import concurrent.futures
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+import parallel
+
+
+def match_columns(columns, aliases, fname=''):
+    """
+    Match the columns of a file to canonical names.
+
+    Parameters
+    ----------
+    columns : list of str
+        Column names in the file.
+    aliases : dict
+        Map from each canonical name to a list of its aliases.
+    fname : str, default ''
+        Name of the file, for error messages.
+
+    Returns
+    -------
+    output : dict
+        Map from the name of each needed column in the file to its
+        canonical name.
+    """
+    # Aliases match regardless of case and surrounding whitespace
+    lookup = {column.strip().lower(): column for column in columns}
+    matched = {}
+    for name, names in aliases.items():
+        found = [lookup[alias.strip().lower()]
+                 for alias in [name] + list(names)
+                 if alias.strip().lower() in lookup]
+        if len(found) == 0:
+            raise RuntimeError(fname + ' has no column for ' + repr(name)
+                               + '.')
+        matched[found[0]] = name
+
+    return matched
+
+
+def read_harmonized(fname, aliases, metadata=None, dtypes=None,
+                    **read_kwargs):
+    """
+    Read one file, keeping only the columns in a schema, under their
+    canonical names.
+
+    Parameters
+    ----------
+    fname : str
+        Name of CSV file.
+    aliases : dict
+        Map from each canonical column name to a list of its aliases.
+    metadata : dict, default None
+        Columns of constant values to add, e.g., {'year': 1973}.
+    dtypes : dict, default None
+        Dtypes of canonical columns. Non-categorical dtypes are applied
+        while parsing.
+    read_kwargs
+        Further arguments to `pd.read_csv()`; `comment` defaults
+        to '#'.
+
+    Returns
+    -------
+    output : DataFrame
+        Data of the file, with columns in the order of `aliases`, then
+        `metadata`.
+    """
+    dtypes = {} if dtypes is None else dtypes
+    read_kwargs = dict({'comment': '#'}, **read_kwargs)
+
+    # Read the header only to find the columns we need
+    header = pd.read_csv(fname, nrows=0, **read_kwargs).columns
+    matched = match_columns(header, aliases, fname=fname)
+    parse_dtypes = {column: dtypes[name] for column, name in matched.items()
+                    if name in dtypes and dtypes[name] != 'category'}
+
+    df = pd.read_csv(fname, usecols=list(matched), dtype=parse_dtypes,
+                     **read_kwargs)
+    df = df.rename(columns=matched)[list(aliases)]
+
+    for name, value in (metadata or {}).items():
+        dtype = dtypes.get(name)
+        df[name] = np.full(len(df), value,
+                           dtype=None if dtype == 'category' else dtype)
+
+    return df
+
+
+def _concat(dfs, dtypes):
+    """
+    Concatenate harmonized DataFrames, giving categorical columns the
+    union of the categories of all frames.
+    """
+    dfs = list(dfs)
+    if len(dfs) == 0:
+        return pd.DataFrame()
+
+    for name, dtype in dtypes.items():
+        if dtype == 'category' and name in dfs[0].columns:
+            categories = pd.Index(sorted(set().union(*[
+                set(df[name].dropna().unique()) for df in dfs])))
+            for df in dfs:
+                df[name] = pd.Categorical(df[name], categories=categories)
+
+    return pd.concat(dfs, ignore_index=True)
+
+
+def load_harmonized(files, aliases, dtypes=None, n_threads=4,
+                    postprocess=None, **read_kwargs):
+    """
+    Read many files concurrently into one DataFrame with a common
+    schema.
+
+    Parameters
+    ----------
+    files : dict or list
+        Map from each file name to its metadata columns, e.g.,
+        {'data/grant_1973.csv': {'year': 1973}}, or a list of file
+        names.
+    aliases : dict
+        Map from each canonical column name to a list of its aliases.
+    dtypes : dict, default None
+        Dtypes of the canonical and metadata columns, e.g., 'category'
+        or np.float32.
+    n_threads : int, default 4
+        Number of files read at once. If -1, one per CPU.
+    postprocess : function, default None
+        Function applied to the combined DataFrame before it is
+        returned, e.g., `frame_memory.optimize_frame`.
+    read_kwargs
+        Further arguments to `pd.read_csv()`.
+
+    Returns
+    -------
+    output : DataFrame
+        Rows of all files, in the order of `files`.
+
+    Examples
+    --------
+    >>> aliases = {'beak depth (mm)': ['beak depth', 'bdepth']}
+    >>> files = {'data/grant_1973.csv': {'year': 1973},
+    ...          'data/grant_1991.csv': {'year': 1991}}
+    >>> df = load_harmonized(files, aliases, {'year': np.int16})
+    """
+    n_threads = parallel.n_workers(n_threads, what='threads')
+    if not isinstance(files, dict):
+        files = {fname: None for fname in files}
+    dtypes = {} if dtypes is None else dtypes
+
+    def read(fname):
+        return read_harmonized(fname, aliases, metadata=files[fname],
+                               dtypes=dtypes, **read_kwargs)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=n_threads) \
+            as executor:
+        dfs = list(executor.map(read, files))
+    df = _concat(dfs, dtypes)
+
+    return df if postprocess is None else postprocess(df)
+
+
+def _metadata_value(fname, value):
+    """A metadata value as a plain Python scalar, which JSON keeps."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is not None and not isinstance(value, (bool, int, float, str)):
+        raise RuntimeError(repr(value) + ' is not a valid metadata value '
+                           + 'of ' + fname + '.')
+    return value
+
+
+def _source_info(fname, metadata):
+    """Identity of a source file, to tell whether it changed."""
+    stat = os.stat(fname)
+    if metadata is not None:
+        metadata = {str(name): _metadata_value(fname, value)
+                    for name, value in metadata.items()}
+    return {'path': os.path.abspath(fname), 'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns, 'metadata': metadata}
+
+
+def _same_source(a, b):
+    """Whether two source infos agree, as they would after JSON."""
+    return json.dumps(a, sort_keys=True) == json.dumps(b, sort_keys=True)
+
+
+def _write_json(fname, data):
+    """Write a JSON file atomically."""
+    with open(fname + '.tmp', 'w') as f:
+        json.dump(data, f)
+    os.replace(fname + '.tmp', fname)
+
+
+def _write_part(root, manifest, df, sources):
+    """Store a DataFrame as a new part of a combined table."""
+    part = {'name': 'part_' + str(manifest['next_part']),
+            'sources': sources, 'n_rows': len(df)}
+    manifest['next_part'] += 1
+
+    part_dir = os.path.join(root, part['name'])
+    shutil.rmtree(part_dir, ignore_errors=True)
+    os.makedirs(part_dir)
+    data_cache.write_frame(part_dir, df)
+    manifest['parts'].append(part)
+
+
+def _merge_parts(root, manifest, dtypes):
+    """
+    Merge the newest two parts of a combined table for as long as the
+    older one is no larger than the newer one, like carries in binary
+    addition. This keeps the number of parts logarithmic in the number
+    of rows, while each row is rewritten only a logarithmic number of
+    times. Returns the names of the merged parts, to be removed once
+    the manifest no longer lists them.
+    """
+    parts = manifest['parts']
+    stale = []
+    while len(parts) > 1 and parts[-2]['n_rows'] <= parts[-1]['n_rows']:
+        older, newer = parts[-2], parts.pop()
+        parts.pop()
+        df = _concat([data_cache.read_frame(os.path.join(root, part['name']),
+                                            mmap=False)
+                      for part in (older, newer)], dtypes)
+        _write_part(root, manifest, df, older['sources'] + newer['sources'])
+        stale += [older['name'], newer['name']]
+
+    return stale
+
+
+def _read_parts(path, manifest, dtypes):
+    """Read and concatenate the parts of a combined table."""
+    return _concat([data_cache.read_frame(os.path.join(path, part['name']))
+                    for part in manifest['parts']], dtypes)
+
+
+def update_harmonized(path, files, aliases, dtypes=None, n_threads=4,
+                      postprocess=None, **read_kwargs):
+    """
+    Keep a combined table of many files up to date on disk.
+
+    The table is stored as parts, each in the format of
+    `data_cache.write_frame()`. Only files not yet in the table are
+    read, and they are written as a new part. Parts are merged as they
+    accumulate, two at a time, whenever the older of the newest two is
+    no larger than the newer, so after many updates, e.g., a weekly
+    ingest, the table has a number of parts logarithmic in its rows,
+    and writing costs amortized time logarithmic in the rows for each
+    new row. Reading the table back, which every call does, costs time
+    and memory in proportion to the whole table. If any file already
+    in the table changed or was removed from `files`, or the schema
+    changed, the table is rebuilt from scratch.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the combined table.
+    files : dict or list
+        Map from each file name to its metadata columns, or a list of
+        file names. Metadata values must be scalars.
+    aliases : dict
+        Map from each canonical column name to a list of its aliases.
+    dtypes : dict, default None
+        Dtypes of the canonical and metadata columns.
+    n_threads : int, default 4
+        Number of files read at once. If -1, one per CPU.
+    postprocess : function, default None
+        Function applied to the combined DataFrame before it is
+        returned, e.g., `frame_memory.optimize_frame`.
+    read_kwargs
+        Further arguments to `pd.read_csv()`.
+
+    Returns
+    -------
+    output : DataFrame
+        Combined table, with the rows of each file in the order in
+        which the files were added.
+    """
+    n_threads = parallel.n_workers(n_threads, what='threads')
+    if not isinstance(files, dict):
+        files = {fname: None for fname in files}
+    dtypes = {} if dtypes is None else dtypes
+    schema = repr((sorted(aliases.items()),
+                   sorted((name, str(pd.api.types.pandas_dtype(dtype)))
+                          for name, dtype in dtypes.items()),
+                   sorted(read_kwargs.items())))
+    sources = {os.path.abspath(fname): _source_info(fname, metadata)
+               for fname, metadata in files.items()}
+
+    # Parts already in the table, if all their sources are unchanged
+    manifest_file = os.path.join(path, 'sources.json')
+    manifest = None
+    if os.path.isfile(manifest_file):
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+        if manifest['schema'] != schema \
+                or not all(info['path'] in sources
+                           and _same_source(sources[info['path']], info)
+                           for part in manifest['parts']
+                           for info in part['sources']):
+            manifest = None
+
+    done_paths = set() if manifest is None else \
+        {info['path'] for part in manifest['parts']
+         for info in part['sources']}
+    new_files = {fname: metadata for fname, metadata in files.items()
+                 if os.path.abspath(fname) not in done_paths}
+
+    if len(new_files) > 0:
+        df_new = load_harmonized(new_files, aliases, dtypes=dtypes,
+                                 n_threads=n_threads, **read_kwargs)
+
+        # Rebuilds go beside the old table, then are swapped in
+        root = path if manifest is not None \
+            else path.rstrip(os.sep) + '.tmp'
+        if manifest is None:
+            shutil.rmtree(root, ignore_errors=True)
+            os.makedirs(root)
+            manifest = {'schema': schema, 'parts': [], 'next_part': 0}
+
+        _write_part(root, manifest, df_new,
+                    [sources[os.path.abspath(fname)] for fname in new_files])
+        stale = _merge_parts(root, manifest, dtypes)
+        _write_json(os.path.join(root, 'sources.json'), manifest)
+        for name in stale:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+        if root != path:
+            old = path.rstrip(os.sep) + '.old'
+            if os.path.isdir(path):
+                os.replace(path, old)
+            os.replace(root, path)
+            shutil.rmtree(old, ignore_errors=True)
+
+    if manifest is None:
+        df = pd.DataFrame()
+    else:
+        df = _read_parts(path, manifest, dtypes)
+
+    return df if postprocess is None else postprocess(df)
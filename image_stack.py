@@ -0,0 +1,181 @@
+"""
+Lazy loading of time-lapse image stacks stored as one TIFF per frame.
+"""
+import collections
+import concurrent.futures
+import glob
+import threading
+
+import numpy as np
+import tifffile
+
+
+def _frame_info(filename):
+    """
+    Shape, dtype, and location of the pixels of the first page of a
+    TIFF file, read from its header without decoding any pixels.
+
+    Returns
+    -------
+    shape : tuple
+        Shape of the frame.
+    dtype : numpy dtype
+        Data type of the pixels, with the byte order of the file.
+    offset : int or None
+        Position of the pixels in the file if they are stored
+        uncompressed in one contiguous block, so that they can be
+        memory-mapped; None otherwise.
+    """
+    with tifffile.TiffFile(filename) as tif:
+        page = tif.pages[0]
+        dtype = np.dtype(page.dtype).newbyteorder(tif.byteorder)
+        if page.compression == 1 and page.is_contiguous:
+            offset = page.dataoffsets[0]
+        else:
+            offset = None
+
+        return page.shape, dtype, offset
+
+
+class TiffStack(object):
+    """
+    Stack of TIFF frames, read lazily as it is indexed.
+
+    Uncompressed frames are memory-mapped; other frames are decoded
+    on demand in a thread pool. The most recently used frames are kept
+    in a bounded cache.
+
+    Parameters
+    ----------
+    pattern : str or list of str
+        Glob pattern of the frames, e.g.,
+        'data/HG105_images/noLac_phase_*.tif', or a list of file names.
+        Frames are ordered by file name.
+    cache_size : int, default 32
+        Maximum number of frames kept in the cache.
+    n_threads : int, default 4
+        Number of threads decoding frames.
+
+    Examples
+    --------
+    >>> stack = TiffStack('data/bacterial_growth/bacillus_*.tif')
+    >>> stack.shape
+    (55, 880, 590)
+    >>> stack[10:50, 100:300, :].shape
+    (40, 200, 590)
+    """
+    def __init__(self, pattern, cache_size=32, n_threads=4):
+        if isinstance(pattern, str):
+            self.filenames = sorted(glob.glob(pattern))
+        else:
+            self.filenames = list(pattern)
+        if len(self.filenames) == 0:
+            raise RuntimeError(str(pattern) + ' matches no files.')
+
+        # Frames are assumed to share the metadata of the first one
+        frame_shape, dtype, _ = _frame_info(self.filenames[0])
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = dtype.newbyteorder('=')
+
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=n_threads)
+
+    @property
+    def shape(self):
+        return (len(self.filenames),) + self.frame_shape
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def __repr__(self):
+        return ('TiffStack(' + str(len(self)) + ' frames of '
+                + str(self.frame_shape) + ', ' + str(self.dtype) + ')')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Shut down the thread pool and empty the cache."""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._cache.clear()
+
+    def _load(self, i):
+        """Memory-map or decode frame i."""
+        filename = self.filenames[i]
+        shape, dtype, offset = _frame_info(filename)
+        if tuple(shape) != self.frame_shape:
+            raise RuntimeError(filename + ' has shape ' + str(tuple(shape))
+                               + ', not ' + str(self.frame_shape) + '.')
+
+        if offset is not None:
+            return np.memmap(filename, dtype=dtype, mode='r', offset=offset,
+                             shape=self.frame_shape)
+        return tifffile.imread(filename, key=0)
+
+    def frame(self, i):
+        """
+        Frame i of the stack, from the cache if possible. Memory-mapped
+        frames are read-only and keep the byte order of the file.
+        """
+        i = range(len(self))[i]
+        with self._lock:
+            if i in self._cache:
+                self._cache.move_to_end(i)
+                return self._cache[i]
+
+        data = self._load(i)
+        with self._lock:
+            self._cache[i] = data
+            self._cache.move_to_end(i)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return data
+
+    def prefetch(self, inds):
+        """Start loading frames in the background."""
+        for i in inds:
+            self._executor.submit(self.frame, i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.frame(i)
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        frame_key, pixel_key = key[0], key[1:]
+
+        # A single frame is returned as is, a view where possible
+        if isinstance(frame_key, (int, np.integer)):
+            return self.frame(frame_key)[pixel_key]
+
+        inds = np.arange(len(self))[frame_key]
+        if inds.ndim != 1:
+            raise RuntimeError('Frames must be indexed by an integer, a '
+                               'slice, or a 1D array.')
+
+        # Decode frames in the thread pool, filling one output array
+        out = None
+        for j, data in enumerate(self._executor.map(
+                lambda i: self.frame(i)[pixel_key], inds)):
+            if out is None:
+                out = np.empty((len(inds),) + np.shape(data),
+                               dtype=self.dtype)
+            out[j] = data
+        if out is None:
+            shape = np.broadcast_to(0, self.frame_shape)[pixel_key].shape
+            out = np.empty((0,) + shape, dtype=self.dtype)
+
+        return out
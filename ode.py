@@ -0,0 +1,206 @@
+"""
+Integration of batches of ordinary differential equations.
+
+The state is an array of shape (n_vars, ...), where the trailing axes
+index members of a batch, e.g., parameter sets of a sweep. Right-hand
+sides have the signature `rhs(y, t, *args)`, as for
+`scipy.integrate.odeint()`, and must act on whole arrays.
+"""
+import numpy as np
+
+# Dormand-Prince 5(4) coefficients
+_dp_c = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+_dp_a = [[],
+         [1/5],
+         [3/40, 9/40],
+         [44/45, -56/15, 32/9],
+         [19372/6561, -25360/2187, 64448/6561, -212/729],
+         [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+         [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84]]
+_dp_b = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0])
+_dp_b_low = np.array([5179/57600, 0, 7571/16695, 393/640, -92097/339200,
+                      187/2100, 1/40])
+
+
+def lotka_volterra(y, t, alpha, beta, gamma, delta):
+    """
+    Right-hand side of the Lotka-Volterra equations for rabbits r and
+    foxes f, dr/dt = alpha r - beta f r and df/dt = delta f r - gamma f.
+    Parameters may be arrays that broadcast against r and f.
+    """
+    r, f = y
+    return np.stack((alpha * r - beta * f * r, delta * f * r - gamma * f))
+
+
+def _broadcast_state(y0, args):
+    """Broadcast an initial state against the batch shape of the args."""
+    y0 = np.asarray(y0, dtype=float)
+    batch_shape = np.broadcast_shapes(y0.shape[1:],
+                                      *[np.shape(arg) for arg in args])
+    if y0.ndim == 1:
+        y0 = y0.reshape((-1,) + (1,) * len(batch_shape))
+    return np.array(np.broadcast_to(y0, y0.shape[:1] + batch_shape))
+
+
+def rk4(rhs, y0, t, args=(), every=1):
+    """
+    Integrate a batch of ODEs with the fixed-step fourth order
+    Runge-Kutta method.
+
+    Parameters
+    ----------
+    rhs : function
+        Right-hand side, `rhs(y, t, *args)`, returning dy/dt with the
+        shape of `y`.
+    y0 : array_like
+        Initial state, shape (n_vars, ...). It is broadcast against the
+        parameters in `args`, so a single initial condition may be
+        used for a whole sweep.
+    t : array_like
+        Time points at which to step. Steps need not be even.
+    args : tuple, default ()
+        Extra arguments to `rhs`, e.g., arrays of parameters.
+    every : int, default 1
+        Store the state only at every `every`-th time point.
+
+    Returns
+    -------
+    t_out : ndarray
+        Time points of the stored states, `t[::every]`.
+    y : ndarray
+        States at `t_out`, shape (len(t_out), n_vars, ...).
+    """
+    t = np.asarray(t, dtype=float)
+    y = _broadcast_state(y0, args)
+    t_out = t[::every]
+    out = np.empty((len(t_out),) + y.shape)
+    if len(t) == 0:
+        return t_out, out
+
+    out[0] = y
+    for i in range(1, len(t)):
+        h = t[i] - t[i-1]
+        k1 = rhs(y, t[i-1], *args)
+        k2 = rhs(y + h/2 * k1, t[i-1] + h/2, *args)
+        k3 = rhs(y + h/2 * k2, t[i-1] + h/2, *args)
+        k4 = rhs(y + h * k3, t[i], *args)
+        y = y + h/6 * (k1 + 2*k2 + 2*k3 + k4)
+        if i % every == 0:
+            out[i // every] = y
+
+    return t_out, out
+
+
+def rk45(rhs, y0, t_eval, args=(), rtol=1e-6, atol=1e-9, h0=None,
+         max_steps=100000):
+    """
+    Integrate a batch of ODEs with the adaptive Dormand-Prince 5(4)
+    Runge-Kutta method.
+
+    Each member of the batch has its own step size, so a few members
+    needing small steps do not slow the others down. Steps are
+    shortened to land on the output times, so no interpolation is
+    needed.
+
+    Parameters
+    ----------
+    rhs : function
+        Right-hand side, `rhs(y, t, *args)`, returning dy/dt with the
+        shape of `y`. It is called with the batch flattened: `y` has
+        shape (n_vars, n), `t` has shape (n,), and array arguments are
+        flattened to shape (n,).
+    y0 : array_like
+        Initial state at `t_eval[0]`, shape (n_vars, ...). It is
+        broadcast against the parameters in `args`.
+    t_eval : array_like
+        Increasing time points at which to store the state. Their
+        number sets the memory used.
+    args : tuple, default ()
+        Extra arguments to `rhs`, e.g., arrays of parameters.
+    rtol : float, default 1e-6
+        Relative tolerance.
+    atol : float, default 1e-9
+        Absolute tolerance.
+    h0 : float, default None
+        Initial step size. If None, 1/100 of the first output interval.
+    max_steps : int, default 100000
+        Maximum number of steps, accepted or not.
+
+    Returns
+    -------
+    t_eval : ndarray
+        Time points of the stored states.
+    y : ndarray
+        States at `t_eval`, shape (len(t_eval), n_vars, ...).
+    """
+    t_eval = np.asarray(t_eval, dtype=float)
+    if np.any(np.diff(t_eval) <= 0):
+        raise RuntimeError('Output times must be increasing.')
+
+    # Work on a flat batch, with array parameters flattened to match
+    y = _broadcast_state(y0, args)
+    shape = y.shape
+    y = y.reshape(shape[0], -1)
+    args = tuple(np.broadcast_to(arg, shape[1:]).ravel()
+                 if np.ndim(arg) > 0 else arg for arg in args)
+
+    out = np.empty((len(t_eval),) + y.shape)
+    if len(t_eval) > 0:
+        out[0] = y
+    if len(t_eval) < 2:
+        return t_eval, out.reshape((len(t_eval),) + shape)
+
+    # Time, step size, and index of the next output of each member
+    n = y.shape[1]
+    t = np.full(n, t_eval[0])
+    if h0 is None:
+        h0 = (t_eval[1] - t_eval[0]) / 100
+    h = np.full(n, float(h0))
+    target = np.ones(n, dtype=np.int64)
+
+    k = np.empty((7,) + y.shape)
+    k[0] = rhs(y, t, *args)
+    for _ in range(max_steps):
+        active = target < len(t_eval)
+        if not np.any(active):
+            break
+
+        # Finished members take steps of zero
+        t_next = t_eval[np.minimum(target, len(t_eval) - 1)]
+        step = np.where(active, np.minimum(h, t_next - t), 0)
+        lands = active & (step == t_next - t)
+
+        for s in range(1, 7):
+            dy = sum(a * k[j] for j, a in enumerate(_dp_a[s]) if a != 0)
+            k[s] = rhs(y + step * dy, t + _dp_c[s] * step, *args)
+        y_new = y + step * np.tensordot(_dp_b, k, axes=1)
+        err = step * np.tensordot(_dp_b - _dp_b_low, k, axes=1)
+
+        # Root mean square of the error relative to the tolerance
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        err_norm = np.sqrt(np.mean((err / scale)**2, axis=0))
+        bad = active & ~np.isfinite(err_norm)
+        if np.any(bad):
+            raise RuntimeError('Non-finite state at t = '
+                               + str(t[bad][0]) + '.')
+        accept = active & (err_norm <= 1)
+
+        with np.errstate(divide='ignore'):
+            factor = np.clip(0.9 * err_norm**(-1/5), 0.2, 10)
+        h = np.where(active, np.where(accept, np.maximum(h, step), h)
+                     * factor, h)
+
+        y = np.where(accept, y_new, y)
+        t = np.where(accept, np.where(lands, t_next, t + step), t)
+        k[0] = np.where(accept, k[6], k[0])
+
+        # Store states of members that reached an output time
+        stored = accept & lands
+        out[target[stored], :, stored] = y[:, stored].T
+        target[stored] += 1
+
+    if np.any(target < len(t_eval)):
+        raise RuntimeError('Integration did not finish in '
+                           + str(max_steps) + ' steps.')
+
+    return t_eval, out.reshape((len(t_eval),) + shape)
@@ -0,0 +1,163 @@
+"""
+Finding open reading frames in DNA sequences.
+"""
+import numpy as np
+
+# Two-bit codes of bases, in the order of bioinfo_dicts.codons (TCAG).
+# Anything that is not a base gets code 4.
+_base_codes = np.full(256, 4, dtype=np.uint8)
+for _code, _base in enumerate('TCAG'):
+    _base_codes[ord(_base)] = _code
+    _base_codes[ord(_base.lower())] = _code
+del _code, _base
+
+# Codon indices, 16*first + 4*second + third
+_start_codon = 35                 # ATG
+_stop_codons = np.array([10, 11, 14])   # TAA, TAG, TGA
+
+# Fields of the ORF records returned by find_orfs()
+orf_dtype = np.dtype([('frame', np.int8),
+                      ('strand', np.int8),
+                      ('start', np.int64),
+                      ('stop', np.int64),
+                      ('length', np.int64)])
+
+
+def encode(seq):
+    """
+    Convert a DNA sequence to an array of two-bit base codes,
+    T = 0, C = 1, A = 2, G = 3. Other characters are coded as 4.
+    """
+    if isinstance(seq, str):
+        seq = seq.encode('ascii')
+    return _base_codes[np.frombuffer(seq, dtype=np.uint8)]
+
+
+def codon_indices(codes, frame):
+    """
+    Compute the index of every codon of a frame from base codes.
+
+    Parameters
+    ----------
+    codes : ndarray
+        Base codes, as returned by `encode()`.
+    frame : int
+        Offset of the first codon, 0, 1, or 2.
+
+    Returns
+    -------
+    output : ndarray
+        Index 0-63 of each codon, in the order of
+        `bioinfo_dicts.codons`. Codons with a non-ACGT base are -1.
+    """
+    n_codons = (len(codes) - frame) // 3
+    stop = frame + 3*n_codons
+    first = codes[frame:stop:3].astype(np.int16)
+    second = codes[frame+1:stop:3]
+    third = codes[frame+2:stop:3]
+
+    inds = 16*first + 4*second + third
+    inds[(first > 3) | (second > 3) | (third > 3)] = -1
+
+    return inds
+
+
+def _frame_orfs(codons):
+    """
+    Pair each stop codon with the earliest start codon after the
+    previous stop codon.
+
+    Returns
+    -------
+    starts : ndarray
+        Codon index of the start of each ORF.
+    stops : ndarray
+        Codon index of the stop codon of each ORF.
+    """
+    starts = np.flatnonzero(codons == _start_codon)
+    stops = np.flatnonzero(np.isin(codons, _stop_codons))
+
+    prev_stops = np.concatenate(((-1,), stops))[:-1]
+    first_start = np.searchsorted(starts, prev_stops, side='right')
+
+    # Stops with no start since the previous stop do not close an ORF
+    has_start = first_start < len(starts)
+    has_start[has_start] = starts[first_start[has_start]] < stops[has_start]
+
+    return starts[first_start[has_start]], stops[has_start]
+
+
+def find_orfs(seq, min_length=0, strands='both'):
+    """
+    Find open reading frames in all frames of a DNA sequence.
+
+    An ORF runs from an ATG to the first in-frame stop codon. Only the
+    longest ORF ending at each stop codon is reported, i.e., the one
+    starting at the earliest ATG.
+
+    Parameters
+    ----------
+    seq : str, bytes, or ndarray
+        DNA sequence. An ndarray must hold the bytes of the sequence
+        as uint8.
+    min_length : int, default 0
+        Minimal length of the reported ORFs, in bases, including the
+        stop codon.
+    strands : str, default 'both'
+        Which strands to search, '+', '-', or 'both'.
+
+    Returns
+    -------
+    output : ndarray
+        Structured array with fields `frame`, `strand` (1 or -1),
+        `start`, `stop`, and `length`. `start` and `stop` are positions
+        on the given sequence, so the ORF is `seq[start:stop]` (reverse
+        complemented for strand -1). ORFs are sorted by strand, then
+        frame, then start.
+    """
+    if strands not in ('+', '-', 'both'):
+        raise RuntimeError(str(strands) + ' is not a valid strand.')
+
+    codes = encode(seq)
+    n = len(codes)
+
+    strand_codes = []
+    if strands in ('+', 'both'):
+        strand_codes.append((1, codes))
+    if strands in ('-', 'both'):
+        # Complement swaps T <-> A and C <-> G, which is flipping bit 1
+        strand_codes.append((-1, codes[::-1] ^ 2))
+
+    orfs = []
+    for strand, strand_seq in strand_codes:
+        for frame in range(3):
+            starts, stops = _frame_orfs(codon_indices(strand_seq, frame))
+            frame_orfs = np.empty(len(starts), dtype=orf_dtype)
+            frame_orfs['frame'] = frame
+            frame_orfs['strand'] = strand
+            frame_orfs['length'] = 3 * (stops - starts + 1)
+
+            begin = frame + 3*starts
+            end = frame + 3*stops + 3
+            if strand == 1:
+                frame_orfs['start'], frame_orfs['stop'] = begin, end
+            else:
+                frame_orfs['start'], frame_orfs['stop'] = n - end, n - begin
+                frame_orfs = frame_orfs[::-1]
+
+            orfs.append(frame_orfs[frame_orfs['length'] >= min_length])
+
+    return np.concatenate(orfs)
+
+
+def longest_orf(seq):
+    """Longest ORF on the forward strand of a DNA sequence"""
+    orfs = find_orfs(seq, strands='+')
+    if len(orfs) == 0:
+        return ''
+
+    # Ties go to the ORF that starts first
+    orfs = orfs[np.argsort(orfs['start'], kind='stable')]
+    orf = orfs[np.argmax(orfs['length'])]
+
+    return seq[orf['start']:orf['stop']].upper()
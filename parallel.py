@@ -0,0 +1,32 @@
+"""
+Helpers shared by functions that spread work over pools of workers.
+"""
+import os
+
+import numpy as np
+
+
+def n_workers(n_jobs, what='jobs'):
+    """
+    Number of workers to use for a requested number of jobs.
+
+    Parameters
+    ----------
+    n_jobs : int
+        Requested number of workers, at least 1, or -1 for all CPUs.
+    what : str, default 'jobs'
+        What the workers are, for error messages, e.g., 'threads'.
+
+    Returns
+    -------
+    output : int
+        Number of workers.
+    """
+    if isinstance(n_jobs, (bool, np.bool_)) \
+            or not isinstance(n_jobs, (int, np.integer)) \
+            or (n_jobs < 1 and n_jobs != -1):
+        raise RuntimeError(str(n_jobs) + ' is not a valid number of '
+                           + what + '.')
+    if n_jobs == -1:
+        return os.cpu_count()
+    return int(n_jobs)
@@ -0,0 +1,381 @@
+"""
+Reading atomic coordinates from PDB files into columnar arrays.
+"""
+import concurrent.futures
+
+import numpy as np
+import scipy.spatial
+
+import parallel
+
+# Fixed-width columns of ATOM/HETATM records, as (start, stop) offsets
+_columns = {'serial': (6, 11),
+            'atom_name': (12, 16),
+            'alt_loc': (16, 17),
+            'res_name': (17, 20),
+            'chain': (21, 22),
+            'res_num': (22, 26),
+            'ins_code': (26, 27),
+            'coords': (30, 54),
+            'occupancy': (54, 60),
+            'b_factor': (60, 66),
+            'element': (76, 78)}
+
+# Width of a record, past which nothing is read
+_record_width = 80
+
+
+def _line_bounds(data):
+    """Offsets of the starts and ends of the lines of a byte array."""
+    newlines = np.flatnonzero(data == ord('\n'))
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [len(data)]))
+
+    # Drop carriage returns of DOS line endings
+    has_cr = ends > starts
+    has_cr[has_cr] = data[ends[has_cr] - 1] == ord('\r')
+    return starts, ends - has_cr
+
+
+def _gather(data, starts, ends, width):
+    """
+    Table of the first `width` bytes of each line, with short lines
+    padded with spaces. `data` must end with `width` bytes of padding.
+    """
+    offsets = np.arange(width, dtype=starts.dtype)
+    table = data[starts[:, None] + offsets]
+    table[offsets >= (ends - starts)[:, None]] = ord(' ')
+    return table
+
+
+def _field(table, name):
+    """Fixed-width field of all records as an array of byte strings."""
+    start, stop = _columns[name]
+    return np.ascontiguousarray(table[:, start:stop]).view(
+        'S' + str(stop - start))[:, 0]
+
+
+def _numeric(field, dtype):
+    """Parse a field of byte strings, with blank entries as zero."""
+    blank = np.char.strip(field) == b''
+    return np.where(blank, b'0', field).astype(dtype)
+
+
+def _text(field):
+    """Strip a field of byte strings and convert it to str."""
+    return np.char.strip(field).astype(str)
+
+
+class Structure(object):
+    """
+    Atoms of a structure, stored column by column.
+
+    Attributes
+    ----------
+    coords : ndarray
+        (N, 3) float32 array of atomic coordinates.
+    chain : ndarray
+        Chain identifier of each atom.
+    res_num : ndarray
+        Residue number of each atom.
+    res_name : ndarray
+        Residue name of each atom, e.g., 'LYS'.
+    atom_name : ndarray
+        Atom name of each atom, e.g., 'CA'.
+    element : ndarray
+        Element of each atom.
+    hetero : ndarray
+        True for atoms from HETATM records.
+    serial, occupancy, b_factor : ndarray
+        Remaining numeric columns of the records.
+    """
+    fields = ('coords', 'chain', 'res_num', 'res_name', 'atom_name',
+              'element', 'hetero', 'serial', 'occupancy', 'b_factor')
+
+    def __init__(self, **columns):
+        for name in self.fields:
+            setattr(self, name, columns[name])
+
+    def __len__(self):
+        return len(self.coords)
+
+    def __repr__(self):
+        return ('Structure(' + str(len(self)) + ' atoms, chains '
+                + ''.join(np.unique(self.chain)) + ')')
+
+    def take(self, inds):
+        """
+        Atoms at given indices. If the indices form a contiguous range,
+        the columns of the result are views of the columns of this
+        structure; otherwise they are copies.
+        """
+        inds = np.asarray(inds)
+        if inds.dtype == bool:
+            inds = np.flatnonzero(inds)
+        if len(inds) > 0 and inds[-1] - inds[0] + 1 == len(inds) \
+                and np.all(np.diff(inds) == 1):
+            inds = slice(inds[0], inds[-1] + 1)
+
+        return Structure(**{name: getattr(self, name)[inds]
+                            for name in self.fields})
+
+    def select(self, chain=None, res_range=None, atom_name=None,
+               hetero=None):
+        """
+        Select atoms.
+
+        Parameters
+        ----------
+        chain : str or list of str, default None
+            Chain(s) to keep.
+        res_range : tuple of ints, default None
+            (first, last) residue numbers to keep, inclusive.
+        atom_name : str or list of str, default None
+            Atom name(s) to keep, e.g., 'CA'.
+        hetero : bool, default None
+            If True, keep only HETATM atoms; if False, only ATOM atoms.
+
+        Returns
+        -------
+        output : Structure
+            Selected atoms. Selections of a contiguous run of atoms,
+            e.g., one chain or a residue range in it, are views.
+        """
+        keep = np.ones(len(self), dtype=bool)
+        if chain is not None:
+            keep &= np.isin(self.chain, np.atleast_1d(chain))
+        if res_range is not None:
+            keep &= (self.res_num >= res_range[0]) \
+                    & (self.res_num <= res_range[1])
+        if atom_name is not None:
+            keep &= np.isin(self.atom_name, np.atleast_1d(atom_name))
+        if hetero is not None:
+            keep &= self.hetero == hetero
+
+        return self.take(keep)
+
+    def residue_ids(self):
+        """
+        Index of the residue of each atom, with residues numbered in
+        order of appearance.
+        """
+        new_res = np.ones(len(self), dtype=bool)
+        new_res[1:] = ((self.res_num[1:] != self.res_num[:-1])
+                       | (self.chain[1:] != self.chain[:-1]))
+        return np.cumsum(new_res) - 1
+
+    def centroid(self):
+        """Mean of the coordinates of the atoms."""
+        return self.coords.mean(axis=0, dtype=np.float64)
+
+
+def parse_pdb(buf):
+    """
+    Parse the ATOM and HETATM records of the first model of a PDB file.
+
+    All records are parsed together, without a loop over lines: the
+    line breaks of the whole buffer are found at once, the records are
+    gathered into the rows of a fixed-width byte table, and each field
+    is a column of that table.
+
+    Parameters
+    ----------
+    buf : bytes
+        Contents of a PDB file.
+
+    Returns
+    -------
+    output : Structure
+        Atoms of the structure.
+    """
+    end_model = buf.find(b'\nENDMDL')
+    if end_model != -1:
+        buf = buf[:end_model]
+
+    data = np.frombuffer(buf, dtype=np.uint8)
+    starts, ends = _line_bounds(data)
+    data = np.concatenate((data, np.full(_record_width, ord(' '),
+                                         dtype=np.uint8)))
+
+    # Records start with 'ATOM  ' or 'HETATM'
+    starts, ends = [x[np.isin(data[starts], (ord('A'), ord('H')))]
+                    for x in (starts, ends)]
+    prefix = _gather(data, starts, ends, 6)
+    atom = np.frombuffer(b'ATOM  ', dtype=np.uint8)
+    hetatm = np.frombuffer(b'HETATM', dtype=np.uint8)
+    keep = (ends - starts >= 6) & (np.all(prefix == atom, axis=1)
+                                   | np.all(prefix == hetatm, axis=1))
+    table = _gather(data, starts[keep], ends[keep], _record_width)
+
+    # Keep only the first alternate location of each atom, identified
+    # by its atom name, chain, residue number, and insertion code
+    alt = np.flatnonzero(_field(table, 'alt_loc') != b' ')
+    if len(alt) > 0:
+        cols = np.concatenate([np.arange(*_columns[name]) for name in
+                               ('atom_name', 'chain', 'res_num',
+                                'ins_code')])
+        atom_keys = np.ascontiguousarray(table[alt][:, cols]).view(
+            'S' + str(len(cols)))[:, 0]
+        _, first = np.unique(atom_keys, return_index=True)
+        keep = np.ones(len(table), dtype=bool)
+        keep[alt] = False
+        keep[alt[first]] = True
+        table = table[keep]
+
+    coords = np.ascontiguousarray(table[:, 30:54]).view('S8')
+    element = _text(_field(table, 'element'))
+    atom_name = _text(_field(table, 'atom_name'))
+    no_element = element == ''
+    element[no_element] = np.char.lstrip(atom_name[no_element],
+                                         '0123456789').astype('U1')
+
+    return Structure(coords=_numeric(coords, np.float32),
+                     chain=_field(table, 'chain').astype(str),
+                     res_num=_numeric(_field(table, 'res_num'), np.int32),
+                     res_name=_text(_field(table, 'res_name')),
+                     atom_name=atom_name,
+                     element=element,
+                     hetero=table[:, 0] == ord('H'),
+                     serial=_numeric(_field(table, 'serial'), np.int32),
+                     occupancy=_numeric(_field(table, 'occupancy'),
+                                        np.float32),
+                     b_factor=_numeric(_field(table, 'b_factor'),
+                                       np.float32))
+
+
+def read_pdb(filename):
+    """
+    Read the atoms of the first model of a PDB file.
+
+    Parameters
+    ----------
+    filename : str
+        Name of PDB file.
+
+    Returns
+    -------
+    output : Structure
+        Atoms of the structure.
+    """
+    with open(filename, 'rb') as f:
+        return parse_pdb(f.read())
+
+
+def read_pdbs(filenames, n_jobs=1):
+    """
+    Read many PDB files.
+
+    Parameters
+    ----------
+    filenames : list of str
+        Names of PDB files.
+    n_jobs : int, default 1
+        Number of worker processes. If -1, use all CPUs.
+
+    Returns
+    -------
+    output : list of Structures
+        Atoms of each structure, in order.
+    """
+    n_jobs = parallel.n_workers(n_jobs)
+    if n_jobs == 1 or len(filenames) < 2:
+        return [read_pdb(filename) for filename in filenames]
+
+    chunksize = max(1, len(filenames) // (4 * n_jobs))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=n_jobs) \
+            as executor:
+        return list(executor.map(read_pdb, filenames, chunksize=chunksize))
+
+
+def _coords(atoms):
+    """Coordinates of a Structure or an array of coordinates."""
+    if isinstance(atoms, Structure):
+        return atoms.coords
+    return np.asarray(atoms)
+
+
+def distances(atoms_1, atoms_2=None):
+    """
+    Matrix of distances between atoms.
+
+    Parameters
+    ----------
+    atoms_1 : Structure or ndarray
+        Atoms, or an (N, 3) array of their coordinates.
+    atoms_2 : Structure or ndarray, default None
+        Second set of atoms. If None, distances among `atoms_1`.
+
+    Returns
+    -------
+    output : ndarray
+        (N, M) array of distances.
+    """
+    coords_1 = _coords(atoms_1)
+    coords_2 = coords_1 if atoms_2 is None else _coords(atoms_2)
+
+    return scipy.spatial.distance.cdist(coords_1, coords_2)
+
+
+def contacts(atoms_1, atoms_2=None, cutoff=4.0):
+    """
+    Pairs of atoms closer than a cutoff, found with KD-trees.
+
+    Parameters
+    ----------
+    atoms_1 : Structure or ndarray
+        Atoms, or an (N, 3) array of their coordinates.
+    atoms_2 : Structure or ndarray, default None
+        Second set of atoms. If None, contacts among `atoms_1`, with
+        each pair reported once.
+    cutoff : float, default 4.0
+        Distance cutoff, in the units of the coordinates.
+
+    Returns
+    -------
+    output : ndarray
+        (P, 2) array of indices of the atoms in contact, sorted.
+    """
+    tree_1 = scipy.spatial.cKDTree(_coords(atoms_1))
+    if atoms_2 is None:
+        pairs = tree_1.query_pairs(cutoff, output_type='ndarray')
+    else:
+        tree_2 = scipy.spatial.cKDTree(_coords(atoms_2))
+        pairs = tree_1.sparse_distance_matrix(
+            tree_2, cutoff, output_type='ndarray')
+        pairs = np.stack((pairs['i'], pairs['j']), axis=1)
+
+    pairs = pairs.astype(np.int64).reshape(-1, 2)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+def contact_map(struc, cutoff=8.0, atom_name='CA'):
+    """
+    Residue contact map of a structure.
+
+    Parameters
+    ----------
+    struc : Structure
+        Atoms of the structure.
+    cutoff : float, default 8.0
+        Distance cutoff, in Å.
+    atom_name : str or None, default 'CA'
+        Atom representing each residue. If None, two residues are in
+        contact if any of their atoms are.
+
+    Returns
+    -------
+    output : ndarray
+        Symmetric boolean matrix with one row per residue, True for
+        residues in contact. The diagonal is True.
+    """
+    if atom_name is not None:
+        struc = struc.select(atom_name=atom_name)
+    res_ids = struc.residue_ids()
+    n_res = res_ids[-1] + 1 if len(res_ids) > 0 else 0
+
+    pairs = res_ids[contacts(struc, cutoff=cutoff)]
+    cmap = np.eye(n_res, dtype=bool)
+    cmap[pairs[:, 0], pairs[:, 1]] = True
+    cmap[pairs[:, 1], pairs[:, 0]] = True
+
+    return cmap
@@ -0,0 +1,193 @@
+"""
+Prediction of RNA secondary structures by dynamic programming.
+"""
+import concurrent.futures
+
+import numpy as np
+
+import parallel
+import rna_structure
+
+# Index of each kind of base pair, by the codes of its bases
+# (A = 0, C = 1, G = 2, U = 3), and 6 for bases that cannot pair
+_pair_types = ['AU', 'CG', 'GC', 'UA', 'GU', 'UG']
+_pair_type = np.full((5, 5), 6, dtype=np.int64)
+for _k, _p in enumerate(_pair_types):
+    _pair_type['ACGU'.index(_p[0]), 'ACGU'.index(_p[1])] = _k
+del _k, _p
+
+# Watson-Crick stacking free energies (kcal/mol, Turner 2004), keyed by
+# outer pair and inner pair, e.g., ('CG', 'AU') is 5'-CA-3'/3'-GU-5'.
+# Each stack is also the stack of its reversed pairs in reverse order.
+_wc_stacks = {('AU', 'AU'): -0.93, ('AU', 'UA'): -1.10,
+              ('UA', 'AU'): -1.33, ('CG', 'UA'): -2.08,
+              ('CG', 'AU'): -2.11, ('GC', 'UA'): -2.24,
+              ('GC', 'AU'): -2.35, ('CG', 'GC'): -2.36,
+              ('GC', 'GC'): -3.26, ('GC', 'CG'): -3.42}
+
+# Stacks involving a G-U pair get a single, weaker energy
+gu_stack_energy = -0.5
+
+# Penalty for closing any loop (hairpin, interior, or multi-branch)
+loop_energy = 3.4
+
+# Stacking energy indexed by outer and inner pair types
+stack_energies = np.full((7, 7), np.inf)
+stack_energies[:6, :6] = gu_stack_energy
+for (_outer, _inner), _energy in _wc_stacks.items():
+    stack_energies[_pair_types.index(_outer), _pair_types.index(_inner)] \
+            = _energy
+    stack_energies[_pair_types.index(_inner[::-1]),
+                   _pair_types.index(_outer[::-1])] = _energy
+del _outer, _inner, _energy
+
+
+def _fill(seq, mode, wobble, min_loop):
+    """
+    Fill the dynamic programming matrices one diagonal at a time.
+
+    W[i, j] is the lowest energy of bases i..j, and V[i, j] the lowest
+    energy of bases i..j given that i and j pair. In 'pairs' mode, each
+    pair has energy -1, so minimizing the energy maximizes the number
+    of pairs.
+    """
+    codes = rna_structure.encode(seq)
+    n = len(codes)
+    can_pair = rna_structure.pair_matrix(seq, wobble=wobble,
+                                         min_loop=min_loop)
+    types = _pair_type[codes[:, None], codes[None, :]]
+
+    V = np.full((n, n), np.inf)
+    W = np.zeros((n, n))
+    W_flat = W.ravel()
+
+    for d in range(1, n):
+        i = np.arange(n - d)
+        j = i + d
+
+        # Bases i and j pair, enclosing i+1..j-1
+        if mode == 'pairs':
+            v = -1 + W[i+1, j-1]
+        else:
+            stacked = V[i+1, j-1] + stack_energies[types[i, j],
+                                                   types[i+1, j-1]]
+            v = np.minimum(stacked, loop_energy + W[i+1, j-1])
+        v[~can_pair[i, j]] = np.inf
+        V[i, j] = v
+
+        # Split into i..k and k+1..j, for all k at once
+        k = i[:, None] + np.arange(d)[None, :]
+        split = W_flat[i[:, None]*n + k] + W_flat[(k + 1)*n + j[:, None]]
+        W[i, j] = np.minimum(v, split.min(axis=1))
+
+    return V, W, types
+
+
+def _traceback(V, W, types, mode):
+    """Recover the pairs of a lowest-energy structure."""
+    n = len(W)
+    pairs = []
+    stack = [('W', 0, n - 1)] if n > 0 else []
+    while stack:
+        matrix, i, j = stack.pop()
+        if i >= j:
+            continue
+
+        if matrix == 'W':
+            if np.isclose(W[i, j], V[i, j]):
+                stack.append(('V', i, j))
+            else:
+                for k in range(i, j):
+                    if np.isclose(W[i, j], W[i, k] + W[k+1, j]):
+                        stack.extend([('W', i, k), ('W', k+1, j)])
+                        break
+        else:
+            pairs.append((i, j))
+            stacked = V[i+1, j-1] + stack_energies[types[i, j],
+                                                   types[i+1, j-1]]
+            if mode == 'stacking' and np.isclose(V[i, j], stacked):
+                stack.append(('V', i+1, j-1))
+            else:
+                stack.append(('W', i+1, j-1))
+
+    return pairs
+
+
+def fold(seq, mode='pairs', wobble=True, min_loop=3):
+    """
+    Predict the secondary structure of an RNA sequence.
+
+    The dynamic programming matrices are filled one anti-diagonal at a
+    time, with each diagonal computed by vectorized operations.
+
+    Parameters
+    ----------
+    seq : str
+        RNA (or DNA) sequence.
+    mode : str, default 'pairs'
+        If 'pairs', maximize the number of base pairs (Nussinov). If
+        'stacking', minimize a simple free energy with stacking energies
+        of adjacent pairs and a constant penalty for closing a loop.
+    wobble : bool, default True
+        If True, allow G-U pairs.
+    min_loop : int, default 3
+        Minimal number of unpaired bases in a hairpin loop.
+
+    Returns
+    -------
+    struc : str
+        Structure in dot-paren notation.
+    energy : float
+        Energy of the structure. In 'pairs' mode, this is minus the
+        number of pairs.
+    """
+    if mode not in ('pairs', 'stacking'):
+        raise RuntimeError(str(mode) + ' is not a valid folding mode.')
+
+    V, W, types = _fill(seq, mode, wobble, min_loop)
+    struc = np.full(len(seq), '.', dtype='<U1')
+    for i, j in _traceback(V, W, types, mode):
+        struc[i], struc[j] = '(', ')'
+
+    energy = float(W[0, -1]) if len(seq) > 0 else 0.0
+
+    return ''.join(struc), energy
+
+
+def _fold_args(args):
+    """Fold a sequence with a tuple of arguments, for process pools."""
+    return fold(*args)
+
+
+def fold_batch(seqs, mode='pairs', wobble=True, min_loop=3, n_jobs=1):
+    """
+    Predict the secondary structures of many RNA sequences.
+
+    Parameters
+    ----------
+    seqs : list of str
+        RNA (or DNA) sequences.
+    mode : str, default 'pairs'
+        Folding mode. See `fold()`.
+    wobble : bool, default True
+        If True, allow G-U pairs.
+    min_loop : int, default 3
+        Minimal number of unpaired bases in a hairpin loop.
+    n_jobs : int, default 1
+        Number of worker processes. If -1, use all CPUs.
+
+    Returns
+    -------
+    output : list of tuples
+        (structure, energy) for each sequence, in order.
+    """
+    args = [(seq, mode, wobble, min_loop) for seq in seqs]
+
+    n_jobs = parallel.n_workers(n_jobs)
+    if n_jobs == 1 or len(args) < 2:
+        return [_fold_args(arg) for arg in args]
+
+    chunksize = max(1, len(args) // (4 * n_jobs))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=n_jobs) \
+            as executor:
+        return list(executor.map(_fold_args, args, chunksize=chunksize))
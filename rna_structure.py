@@ -0,0 +1,202 @@
+"""
+Base pairing and validation of RNA secondary structures in dot-paren
+notation.
+"""
+import numpy as np
+
+# Codes of bases; T is treated like U, anything else is 4
+_base_codes = np.full(256, 4, dtype=np.int8)
+for _code, _bases in enumerate(['Aa', 'Cc', 'Gg', 'UuTt']):
+    for _base in _bases:
+        _base_codes[ord(_base)] = _code
+del _code, _bases, _base
+
+# Allowed pairs, indexed by the codes of the two bases
+_watson_crick = np.zeros((5, 5), dtype=bool)
+for _i, _j in [(0, 3), (3, 0), (1, 2), (2, 1)]:
+    _watson_crick[_i, _j] = True
+_wobble = _watson_crick.copy()
+_wobble[2, 3] = _wobble[3, 2] = True
+del _i, _j
+
+
+def _as_bytes(seq):
+    """View a str or bytes sequence as a uint8 array."""
+    if isinstance(seq, str):
+        seq = seq.encode('ascii')
+    return np.frombuffer(seq, dtype=np.uint8)
+
+
+def encode(seq):
+    """
+    Convert a sequence to an array of base codes, A = 0, C = 1, G = 2,
+    U or T = 3. Other characters are coded as 4.
+    """
+    return _base_codes[_as_bytes(seq)]
+
+
+def pair_matrix(seq, wobble=True, min_loop=3):
+    """
+    Boolean matrix that is True at (i, j) if bases i and j of a
+    sequence may pair, i.e., they are complementary and at least
+    `min_loop` bases apart.
+    """
+    codes = encode(seq)
+    allowed = _wobble if wobble else _watson_crick
+    inds = np.arange(len(codes))
+
+    can_pair = allowed[codes[:, None], codes[None, :]]
+    can_pair &= inds[None, :] - inds[:, None] - 1 >= min_loop
+
+    return can_pair
+
+
+def _pair(struc, struc_ids, n_strucs):
+    """
+    Pair parentheses of many concatenated structures.
+
+    The partner of an opening parenthesis is the next closing one at
+    the same depth of nesting, so sorting both by (structure, depth,
+    position) lines up the partners.
+
+    Returns
+    -------
+    opens : ndarray
+        Positions of opening parentheses.
+    closes : ndarray
+        Positions of the matching closing parentheses.
+    valid : ndarray
+        Boolean array, True for structures with balanced parentheses
+        and only '(', ')', and '.' characters.
+    """
+    is_open = struc == ord('(')
+    is_close = struc == ord(')')
+
+    # Depth after each character, restarting at each structure
+    steps = is_open.astype(np.int64) - is_close
+    depth = np.cumsum(steps)
+    starts = np.searchsorted(struc_ids, np.arange(n_strucs))
+    ends = np.searchsorted(struc_ids, np.arange(n_strucs), side='right')
+    nonempty = ends > starts
+    base = np.zeros(n_strucs, dtype=np.int64)
+    base[nonempty] = depth[starts[nonempty]] - steps[starts[nonempty]]
+    depth -= base[struc_ids]
+
+    # Balanced: never below zero and back to zero at the end
+    valid = np.ones(n_strucs, dtype=bool)
+    if len(struc) > 0:
+        min_depth = np.full(n_strucs, 0, dtype=np.int64)
+        min_depth[nonempty] = np.minimum.reduceat(depth, starts[nonempty])
+        final = np.zeros(n_strucs, dtype=np.int64)
+        final[nonempty] = depth[ends[nonempty] - 1]
+        bad_char = ~(is_open | is_close | (struc == ord('.')))
+        valid = ((min_depth >= 0) & (final == 0)
+                 & (np.bincount(struc_ids[bad_char], minlength=n_strucs) == 0))
+
+    # A closing parenthesis sits at the depth of its opening one minus 1
+    ok = valid[struc_ids]
+    opens = np.flatnonzero(is_open & ok)
+    closes = np.flatnonzero(is_close & ok)
+    opens = opens[np.lexsort((opens, depth[opens], struc_ids[opens]))]
+    closes = closes[np.lexsort((closes, depth[closes] + 1,
+                                struc_ids[closes]))]
+
+    return opens, closes, valid
+
+
+def pair_table(struc):
+    """
+    Compute the pair table of a structure in dot-paren notation.
+
+    Parameters
+    ----------
+    struc : str
+        Structure, e.g., '((..))'.
+
+    Returns
+    -------
+    output : ndarray
+        Array with the index of the partner of each base, or -1 for
+        unpaired bases.
+    """
+    struc_bytes = _as_bytes(struc)
+    opens, closes, valid = _pair(struc_bytes,
+                                 np.zeros(len(struc_bytes), dtype=np.int64),
+                                 1)
+    if not valid[0]:
+        raise RuntimeError(struc + ' is not a valid structure.')
+
+    table = np.full(len(struc_bytes), -1, dtype=np.int64)
+    table[opens] = closes
+    table[closes] = opens
+
+    return table
+
+
+def base_pairs(struc):
+    """List of (i, j) base pairs, i < j, of a dot-paren structure"""
+    table = pair_table(struc)
+    opens = np.flatnonzero(table > np.arange(len(table)))
+
+    return [(int(i), int(table[i])) for i in opens]
+
+
+def validate_structures(seqs, strucs, wobble=True, min_loop=3):
+    """
+    Check many sequence/structure pairs at once.
+
+    A structure is valid for its sequence if it has the same length,
+    its parentheses are balanced, every pair is Watson-Crick (or G-U
+    wobble, if allowed), and every hairpin loop has at least
+    `min_loop` unpaired bases.
+
+    Parameters
+    ----------
+    seqs : list of str
+        RNA (or DNA) sequences.
+    strucs : list of str
+        Structures in dot-paren notation.
+    wobble : bool, default True
+        If True, allow G-U pairs.
+    min_loop : int, default 3
+        Minimal number of bases between the two bases of a pair.
+
+    Returns
+    -------
+    output : ndarray
+        Boolean array, True for each valid pair of sequence and
+        structure.
+    """
+    n_strucs = len(strucs)
+    seq_lengths = np.array([len(seq) for seq in seqs], dtype=np.int64)
+    struc_lengths = np.array([len(struc) for struc in strucs], dtype=np.int64)
+    if len(seq_lengths) != n_strucs:
+        raise RuntimeError('Need one structure per sequence.')
+
+    struc_bytes = _as_bytes(''.join(strucs))
+    struc_ids = np.repeat(np.arange(n_strucs), struc_lengths)
+    opens, closes, valid = _pair(struc_bytes, struc_ids, n_strucs)
+    valid &= seq_lengths == struc_lengths
+
+    # Only pairs whose sequence has the right length can be checked
+    keep = valid[struc_ids[opens]]
+    opens, closes = opens[keep], closes[keep]
+    codes = encode(''.join(seqs))
+
+    # Shift positions from the concatenated structures to the sequences
+    seq_starts = np.cumsum(seq_lengths) - seq_lengths
+    struc_starts = np.cumsum(struc_lengths) - struc_lengths
+    shift = (seq_starts - struc_starts)[struc_ids[opens]]
+
+    allowed = _wobble if wobble else _watson_crick
+    good_pair = allowed[codes[opens + shift], codes[closes + shift]]
+    good_pair &= closes - opens - 1 >= min_loop
+    bad = np.bincount(struc_ids[opens[~good_pair]], minlength=n_strucs)
+
+    return valid & (bad == 0)
+
+
+def rna_ss_validator(seq, struc, wobble=True, min_loop=3):
+    """Check whether a structure is valid for a sequence"""
+    return bool(validate_structures([seq], [struc], wobble=wobble,
+                                    min_loop=min_loop)[0])
@@ -0,0 +1,267 @@
+"""
+Segmentation of cells in image stacks and measurement of the cells.
+"""
+import concurrent.futures
+
+import numpy as np
+import pandas as pd
+import scipy.ndimage
+
+import image_stack
+import parallel
+
+# Frames given to each worker process by iter_segment_stack(), set by
+# _seg_worker_init()
+_seg_worker_frames = None
+
+
+def subtract_background(im, sigma=20.0):
+    """
+    Subtract a smooth background from an image.
+
+    Parameters
+    ----------
+    im : ndarray
+        Image.
+    sigma : float, default 20.0
+        Standard deviation, in pixels, of the Gaussian blur that gives
+        the background. It should be several times the size of a cell.
+
+    Returns
+    -------
+    output : ndarray
+        Float image with the background subtracted.
+    """
+    im = np.asarray(im, dtype=float)
+    return im - scipy.ndimage.gaussian_filter(im, sigma)
+
+
+def otsu_threshold(im, n_bins=256):
+    """
+    Threshold that maximizes the between-class variance of the pixel
+    intensities of an image (Otsu's method).
+
+    Parameters
+    ----------
+    im : ndarray
+        Image.
+    n_bins : int, default 256
+        Number of bins of the intensity histogram.
+
+    Returns
+    -------
+    output : float
+        Threshold, on a bin edge. Pixels above it belong to the upper
+        class.
+    """
+    counts, edges = np.histogram(im, bins=n_bins)
+    centers = (edges[:-1] + edges[1:]) / 2
+
+    # Weight and mean of the lower class for each split
+    weight_low = np.cumsum(counts)[:-1]
+    weight_high = counts.sum() - weight_low
+    sum_low = np.cumsum(counts * centers)[:-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_low = sum_low / weight_low
+        mean_high = (np.dot(counts, centers) - sum_low) / weight_high
+        variance = weight_low * weight_high * (mean_low - mean_high)**2
+
+    # A flat image has no split; nothing lies above its maximum
+    if np.all(np.isnan(variance)):
+        return edges[-1]
+
+    # Splits in a run of empty bins tie, so split in the middle of it
+    best = np.flatnonzero(variance == np.nanmax(variance))
+    return (edges[best[0] + 1] + edges[best[-1] + 1]) / 2
+
+
+def segment(im, thresh='otsu', sigma=20.0, dark_objects=False,
+            connectivity=1):
+    """
+    Label the objects in an image.
+
+    Parameters
+    ----------
+    im : ndarray
+        Image.
+    thresh : 'otsu' or float, default 'otsu'
+        Threshold applied to the image after background subtraction.
+        If 'otsu', use Otsu's method.
+    sigma : float or None, default 20.0
+        Size, in pixels, of the background blur. If None, the background
+        is not subtracted.
+    dark_objects : bool, default False
+        If True, objects are darker than the background, as in phase
+        contrast images; otherwise they are brighter, as in
+        fluorescence images.
+    connectivity : int, default 1
+        1 to connect pixels that share an edge, 2 to also connect
+        pixels that share a corner.
+
+    Returns
+    -------
+    labels : ndarray
+        Integer image, with 0 for background and 1, 2, ... for objects.
+    n_objects : int
+        Number of objects.
+    """
+    im = np.asarray(im, dtype=float)
+    if sigma is not None:
+        im = subtract_background(im, sigma)
+    if dark_objects:
+        im = -im
+        if thresh != 'otsu':
+            thresh = -thresh
+    if thresh == 'otsu':
+        thresh = otsu_threshold(im)
+
+    structure = scipy.ndimage.generate_binary_structure(2, connectivity)
+    return scipy.ndimage.label(im > thresh, structure=structure)
+
+
+def measure(labels, im, n_objects=None):
+    """
+    Measure the objects of a labeled image.
+
+    Parameters
+    ----------
+    labels : ndarray
+        Labeled image, as returned by `segment()`.
+    im : ndarray
+        Image whose intensity is measured.
+    n_objects : int, default None
+        Number of objects. If None, the largest label.
+
+    Returns
+    -------
+    area : ndarray
+        Area of each object, in pixels.
+    mean_intensity : ndarray
+        Mean intensity of `im` over each object.
+    """
+    labels = labels.ravel()
+    if n_objects is None:
+        n_objects = labels.max() if len(labels) > 0 else 0
+
+    area = np.bincount(labels, minlength=n_objects + 1)[1:]
+    total = np.bincount(labels, weights=np.asarray(im, dtype=float).ravel(),
+                        minlength=n_objects + 1)[1:]
+
+    return area, total / np.maximum(area, 1)
+
+
+def _segment_frame(im, frame, thresh, sigma, dark_objects, connectivity,
+                   min_area):
+    """Segment and measure one frame, returning a tidy DataFrame."""
+    labels, n_objects = segment(im, thresh=thresh, sigma=sigma,
+                                dark_objects=dark_objects,
+                                connectivity=connectivity)
+    area, mean_intensity = measure(labels, im, n_objects)
+    keep = area >= min_area
+
+    return _objects_frame(frame, np.flatnonzero(keep) + 1, area[keep],
+                          mean_intensity[keep])
+
+
+def _objects_frame(frame, objects, area, mean_intensity):
+    """Tidy DataFrame of the measurements of the objects of a frame."""
+    return pd.DataFrame({'frame': np.full(len(objects), frame,
+                                          dtype=np.int64),
+                         'object': objects,
+                         'area': area,
+                         'mean_intensity': mean_intensity})
+
+
+def _seg_worker_init(frames):
+    """Store the frames in a worker process."""
+    global _seg_worker_frames
+    if isinstance(frames, list):
+        frames = image_stack.TiffStack(frames, n_threads=1)
+    _seg_worker_frames = frames
+
+
+def _seg_worker_frame(args):
+    """Segment frame i of the worker's frames."""
+    i, kwargs = args
+    return _segment_frame(_seg_worker_frames[i], i, **kwargs)
+
+
+def iter_segment_stack(stack, thresh='otsu', sigma=20.0, dark_objects=False,
+                       connectivity=1, min_area=1, n_jobs=1):
+    """
+    Segment and measure each frame of a stack, yielding results frame
+    by frame as they are ready, in order.
+
+    Parameters
+    ----------
+    stack : ndarray or image_stack.TiffStack
+        Stack of frames; the first axis indexes frames.
+    thresh, sigma, dark_objects, connectivity
+        Segmentation parameters. See `segment()`.
+    min_area : int, default 1
+        Smallest area, in pixels, of objects to report.
+    n_jobs : int, default 1
+        Number of worker processes. If -1, use all CPUs.
+
+    Yields
+    ------
+    output : DataFrame
+        Tidy data frame of the objects of one frame, with columns
+        'frame', 'object', 'area', and 'mean_intensity'.
+    """
+    kwargs = dict(thresh=thresh, sigma=sigma, dark_objects=dark_objects,
+                  connectivity=connectivity, min_area=min_area)
+
+    n_jobs = parallel.n_workers(n_jobs)
+    if n_jobs == 1:
+        for i in range(len(stack)):
+            yield _segment_frame(stack[i], i, **kwargs)
+        return
+
+    # Workers reopen TIFF stacks from their files rather than receiving
+    # pixels; arrays are sent once per worker
+    if isinstance(stack, image_stack.TiffStack):
+        frames = stack.filenames
+    else:
+        frames = np.asarray(stack)
+
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_seg_worker_init,
+            initargs=(frames,)) as executor:
+        for df in executor.map(_seg_worker_frame,
+                               [(i, kwargs) for i in range(len(stack))]):
+            yield df
+
+
+def segment_stack(stack, thresh='otsu', sigma=20.0, dark_objects=False,
+                  connectivity=1, min_area=1, n_jobs=1):
+    """
+    Segment and measure each frame of a stack.
+
+    Parameters
+    ----------
+    stack : ndarray or image_stack.TiffStack
+        Stack of frames; the first axis indexes frames.
+    thresh, sigma, dark_objects, connectivity
+        Segmentation parameters. See `segment()`.
+    min_area : int, default 1
+        Smallest area, in pixels, of objects to report.
+    n_jobs : int, default 1
+        Number of worker processes. If -1, use all CPUs.
+
+    Returns
+    -------
+    output : DataFrame
+        Tidy data frame with one row per object, with columns 'frame',
+        'object', 'area' (pixels), and 'mean_intensity'.
+    """
+    dfs = list(iter_segment_stack(stack, thresh=thresh, sigma=sigma,
+                                  dark_objects=dark_objects,
+                                  connectivity=connectivity,
+                                  min_area=min_area, n_jobs=n_jobs))
+    if len(dfs) == 0:
+        return _objects_frame(0, np.array([], dtype=np.int64),
+                              np.array([], dtype=np.int64),
+                              np.array([], dtype=float))
+
+    return pd.concat(dfs, ignore_index=True)
@@ -1,15 +1,188 @@
+import numpy as np
+import pandas as pd
+
 import bioinfo_dicts
 
+# Amino acids in the order of the columns of residue count matrices
+amino_acids = ''.join(bioinfo_dicts.aa.keys())
+
+# Byte codes of valid residues, either case, for translate/delete checks
+_valid_bytes = (amino_acids + amino_acids.lower()).encode('ascii')
+
+# Column of each residue in residue count matrices, 255 if invalid
+_residue_index = np.full(256, 255, dtype=np.uint8)
+for _i, _aa in enumerate(amino_acids):
+    _residue_index[ord(_aa)] = _i
+    _residue_index[ord(_aa.lower())] = _i
+del _i, _aa
+
+# pKa's of ionizable groups
+pka_n_term = 9.69
+pka_c_term = 2.34
+pka_pos = {'K': 10.5, 'R': 12.4, 'H': 6.0}
+pka_neg = {'D': 3.86, 'E': 4.25, 'C': 8.33, 'Y': 10.07}
+
+# Kyte-Doolittle hydropathy index
+hydropathy = {'A': 1.8, 'R': -4.5, 'N': -3.5, 'D': -3.5, 'C': 2.5,
+              'Q': -3.5, 'E': -3.5, 'G': -0.4, 'H': -3.2, 'I': 4.5,
+              'L': 3.8, 'K': -3.9, 'M': 1.9, 'F': 2.8, 'P': -1.6,
+              'S': -0.8, 'T': -0.7, 'W': -0.9, 'Y': -1.3, 'V': 4.2}
+
+# Average masses of residues in a chain (Da)
+residue_mass = {'A': 71.0788, 'R': 156.1875, 'N': 114.1038, 'D': 115.0886,
+                'C': 103.1388, 'Q': 128.1307, 'E': 129.1155, 'G': 57.0519,
+                'H': 137.1411, 'I': 113.1594, 'L': 113.1594, 'K': 128.1741,
+                'M': 131.1926, 'F': 147.1766, 'P': 97.1167, 'S': 87.0782,
+                'T': 101.1051, 'W': 186.2132, 'Y': 163.1760, 'V': 99.1326}
+water_mass = 18.01528
+
+
+def _check_seq(seq):
+    """Raise an error if a sequence has an invalid residue"""
+    try:
+        invalid = seq.encode('ascii').translate(None, _valid_bytes).decode()
+    except UnicodeEncodeError as e:
+        invalid = e.object[e.start]
+    if invalid:
+        raise RuntimeError(invalid[0].upper() + ' is not a valid amino acid.')
+
+
 def n_neg(seq):
     """Number of negative residues a protein sequence"""
 
-    # Convert sequence to upper case
-    seq = seq.upper()
-
     # Check for a valid sequence
-    for aa in seq:
-        if aa not in bioinfo_dicts.aa.keys():
-            raise RuntimeError(aa + ' is not a valid amino acid.')
+    _check_seq(seq)
 
     # Count E's and D's, since these are the negative residues
+    seq = seq.upper()
     return seq.count('E') + seq.count('D')
+
+
+def residue_counts(seqs):
+    """
+    Count the residues of many protein sequences in one pass.
+
+    Parameters
+    ----------
+    seqs : list of str
+        Protein sequences, in upper or lower case.
+
+    Returns
+    -------
+    output : ndarray
+        Array of shape (len(seqs), 20). Entry (i, j) is the number of
+        times amino acid `amino_acids[j]` appears in `seqs[i]`.
+    """
+    lengths = np.fromiter(map(len, seqs), dtype=np.int64, count=len(seqs))
+
+    # Look up all residues of all sequences at once
+    try:
+        residues = ''.join(seqs).encode('ascii')
+    except UnicodeEncodeError as e:
+        raise RuntimeError(e.object[e.start].upper()
+                           + ' is not a valid amino acid.')
+    inds = _residue_index[np.frombuffer(residues, dtype=np.uint8)]
+
+    invalid = np.flatnonzero(inds == 255)
+    if len(invalid) > 0:
+        raise RuntimeError(chr(residues[invalid[0]]).upper()
+                           + ' is not a valid amino acid.')
+
+    seq_inds = np.repeat(np.arange(len(seqs)), lengths)
+    counts = np.bincount(seq_inds * len(amino_acids) + inds,
+                         minlength=len(seqs) * len(amino_acids))
+
+    return counts.reshape(len(seqs), len(amino_acids))
+
+
+def _weights(values):
+    """Array of per-residue values in the order of `amino_acids`"""
+    return np.array([values.get(aa, 0) for aa in amino_acids], dtype=float)
+
+
+def net_charge(counts, pH=7.0):
+    """
+    Net charge of proteins from their residue counts.
+
+    Parameters
+    ----------
+    counts : ndarray
+        Residue count matrix, as returned by `residue_counts()`.
+    pH : float or ndarray, default 7.0
+        pH at which to compute the charge. An array must broadcast
+        against the number of proteins.
+
+    Returns
+    -------
+    output : ndarray
+        Net charge of each protein, including its termini.
+    """
+    pH = np.asarray(pH, dtype=float)[..., None]
+    pka_pos_arr, pka_neg_arr = _weights(pka_pos), _weights(pka_neg)
+
+    # Fraction of each kind of residue that is charged
+    pos_frac = np.where(pka_pos_arr > 0, 1 / (1 + 10**(pH - pka_pos_arr)), 0)
+    neg_frac = np.where(pka_neg_arr > 0, 1 / (1 + 10**(pka_neg_arr - pH)), 0)
+    charge = (counts * (pos_frac - neg_frac)).sum(axis=-1)
+
+    # Termini, if there is a chain
+    pH = pH[..., 0]
+    has_termini = counts.sum(axis=1) > 0
+    charge += has_termini * (1 / (1 + 10**(pH - pka_n_term))
+                             - 1 / (1 + 10**(pka_c_term - pH)))
+
+    return charge
+
+
+def isoelectric_point(counts, tol=1e-4):
+    """
+    Isoelectric point of proteins from their residue counts, found by
+    bisection on all proteins at once.
+    """
+    low = np.zeros(len(counts))
+    high = np.full(len(counts), 14.0)
+    while len(counts) > 0 and np.max(high - low) > tol:
+        mid = (low + high) / 2
+        positive = net_charge(counts, pH=mid) > 0
+        low = np.where(positive, mid, low)
+        high = np.where(positive, high, mid)
+
+    return (low + high) / 2
+
+
+def protein_features(seqs, pH=7.0):
+    """
+    Compute features of many protein sequences.
+
+    All features are computed from a single residue count matrix,
+    so each sequence is read only once.
+
+    Parameters
+    ----------
+    seqs : list of str
+        Protein sequences, in upper or lower case.
+    pH : float, default 7.0
+        pH at which to compute the net charge.
+
+    Returns
+    -------
+    output : DataFrame
+        One row per sequence, with columns 'length', 'n_neg' (D and E),
+        'n_pos' (K and R), 'charge', 'pI', 'hydrophobicity' (mean
+        Kyte-Doolittle hydropathy), and 'mw' (average mass in Da).
+    """
+    counts = residue_counts(seqs)
+    lengths = counts.sum(axis=1)
+    cols = {aa: i for i, aa in enumerate(amino_acids)}
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hydrophobicity = counts @ _weights(hydropathy) / lengths
+
+    return pd.DataFrame(
+        {'length': lengths,
+         'n_neg': counts[:, cols['D']] + counts[:, cols['E']],
+         'n_pos': counts[:, cols['K']] + counts[:, cols['R']],
+         'charge': net_charge(counts, pH=pH),
+         'pI': np.where(lengths > 0, isoelectric_point(counts), np.nan),
+         'hydrophobicity': hydrophobicity,
+         'mw': counts @ _weights(residue_mass) + water_mass * (lengths > 0)})
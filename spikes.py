@@ -0,0 +1,321 @@
+"""
+Detection of spikes in long voltage recordings, one chunk at a time.
+"""
+import numpy as np
+import pandas as pd
+
+# Ratio of the standard deviation to the median absolute deviation of
+# Gaussian noise
+_mad_to_std = 1.4826
+
+
+def read_chunks(filename, chunk_size=2**16, skiprows=2, delimiter=','):
+    """
+    Read a two-column (t, V) text file in chunks.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file, e.g., 'data/retina_spikes.csv'.
+    chunk_size : int, default 2**16
+        Number of samples per chunk.
+    skiprows : int, default 2
+        Number of lines of comments and headers at the top of the file.
+    delimiter : str, default ','
+        Column delimiter.
+
+    Yields
+    ------
+    t : ndarray
+        Times of the samples of the chunk.
+    V : ndarray
+        Voltages of the samples of the chunk.
+    """
+    reader = pd.read_csv(filename, skiprows=skiprows, header=None,
+                         names=['t', 'V'], sep=delimiter, dtype=float,
+                         chunksize=chunk_size)
+    for chunk in reader:
+        yield chunk['t'].values, chunk['V'].values
+
+
+class RunningMAD(object):
+    """
+    Median and median absolute deviation of a stream of values, from a
+    histogram with fixed-width bins that grows as needed, up to a
+    maximum number of bins. Values beyond its range are counted in the
+    edge bins, so far-off artifacts cost no memory. Estimates are exact
+    up to the bin width as long as fewer than half of the values, or of
+    their deviations, fall beyond the range.
+
+    Parameters
+    ----------
+    resolution : float, default 0.01
+        Width of the bins.
+    max_bins : int, default 2**16
+        Maximum number of bins.
+    """
+    def __init__(self, resolution=0.01, max_bins=2**16):
+        self.resolution = resolution
+        self.max_bins = max_bins
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.offset = 0
+        self.n = 0
+
+    def update(self, x):
+        """Add values to the histogram, ignoring NaNs."""
+        x = np.asarray(x, dtype=float)
+        x = x[~np.isnan(x)]
+        if len(x) == 0:
+            return
+
+        # Bins of values far off the range are clipped before casting
+        if self.n > 0:
+            low, high = self.offset, self.offset + len(self.counts)
+        else:
+            low = int(np.floor(np.median(x) / self.resolution))
+            high = low + 1
+        bins = np.clip(np.floor(x / self.resolution),
+                       high - self.max_bins, low + self.max_bins - 1)
+        bins = bins.astype(np.int64)
+
+        # Widen the histogram toward the new values, up to `max_bins`,
+        # sharing the room between the two sides if both need it
+        need_low = max(low - bins.min(), 0)
+        need_high = max(bins.max() + 1 - high, 0)
+        room = self.max_bins - (high - low)
+        extend_low = min(need_low, max(room // 2, room - need_high))
+        new_low = low - extend_low
+        new_high = high + min(need_high, room - extend_low)
+        if self.n == 0 or new_low < self.offset \
+                or new_high > self.offset + len(self.counts):
+            counts = np.zeros(new_high - new_low, dtype=np.int64)
+            start = self.offset - new_low
+            counts[start:start+len(self.counts)] = self.counts
+            self.counts, self.offset = counts, new_low
+
+        bins = np.clip(bins, self.offset,
+                       self.offset + len(self.counts) - 1) - self.offset
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+        self.n += len(x)
+
+    def _centers(self):
+        return (np.arange(len(self.counts)) + self.offset + 0.5) \
+            * self.resolution
+
+    def median(self):
+        """Median of the values so far."""
+        if self.n == 0:
+            return np.nan
+        i = np.searchsorted(np.cumsum(self.counts), self.n / 2)
+        return self._centers()[i]
+
+    def mad(self):
+        """Median absolute deviation of the values so far."""
+        if self.n == 0:
+            return np.nan
+        dev = np.abs(self._centers() - self.median())
+        order = np.argsort(dev, kind='stable')
+        i = np.searchsorted(np.cumsum(self.counts[order]), self.n / 2)
+        return dev[order][i]
+
+    def std(self):
+        """Robust estimate of the standard deviation of the noise."""
+        return _mad_to_std * self.mad()
+
+
+class SpikeDetector(object):
+    """
+    Detect spikes in a voltage recording fed in chunks.
+
+    A spike is a crossing of a threshold `n_sigmas` robust standard
+    deviations (from the median absolute deviation) away from the
+    median voltage. Crossings within the refractory period of the
+    previous spike are ignored. The noise level is estimated from all
+    samples up to the end of the current chunk.
+
+    Parameters
+    ----------
+    n_sigmas : float, default 5.0
+        Threshold, in robust standard deviations.
+    refractory : float, default 1.0
+        Refractory period, in units of time.
+    pre : int, default 10
+        Number of samples of each snippet before the crossing.
+    post : int, default 30
+        Number of samples of each snippet from the crossing on.
+    sign : int, default -1
+        -1 to detect downward spikes, 1 for upward ones.
+    resolution : float, default 0.01
+        Resolution of the noise estimate, in units of voltage.
+    max_bins : int, default 2**16
+        Maximum number of bins of the histogram of the noise estimate.
+    max_spikes : int, default 1024
+        Initial capacity of the output arrays, which double in size
+        when full.
+    thresh : float, default None
+        Fixed voltage threshold. If given, the noise is not used.
+
+    Examples
+    --------
+    >>> detector = SpikeDetector()
+    >>> for t, V in read_chunks('data/retina_spikes.csv'):
+    ...     detector.update(t, V)
+    >>> spike_times, snippets = detector.finish()
+    """
+    def __init__(self, n_sigmas=5.0, refractory=1.0, pre=10, post=30,
+                 sign=-1, resolution=0.01, max_bins=2**16, max_spikes=1024,
+                 thresh=None):
+        if sign not in (-1, 1):
+            raise RuntimeError(str(sign) + ' is not a valid spike sign.')
+
+        self.n_sigmas = n_sigmas
+        self.refractory = refractory
+        self.pre, self.post = pre, post
+        self.sign = sign
+        self.thresh = thresh
+        self.noise = RunningMAD(resolution=resolution, max_bins=max_bins)
+
+        self.spike_times = np.empty(max_spikes)
+        self.snippets = np.empty((max_spikes, pre + post))
+        self.n_spikes = 0
+
+        # Samples kept from previous chunks, padded with NaN before the
+        # start, and how many of them were checked for crossings
+        self._tail_t = np.full(pre + 1, np.nan)
+        self._tail_V = np.full(pre + 1, np.nan)
+        self._n_checked = pre + 1
+        self._last_spike = -np.inf
+        self._finished = False
+
+    def threshold(self):
+        """Current voltage threshold."""
+        if self.thresh is not None:
+            return self.thresh
+        return (self.noise.median()
+                + self.sign * self.n_sigmas * self.noise.std())
+
+    def _store(self, times, snippets):
+        """Append spikes to the output arrays, growing them if needed."""
+        needed = self.n_spikes + len(times)
+        if needed > len(self.spike_times):
+            capacity = max(needed, 2 * len(self.spike_times))
+            spike_times = np.empty(capacity)
+            spike_times[:self.n_spikes] = self.spike_times[:self.n_spikes]
+            new_snippets = np.empty((capacity, self.pre + self.post))
+            new_snippets[:self.n_spikes] = self.snippets[:self.n_spikes]
+            self.spike_times, self.snippets = spike_times, new_snippets
+
+        self.spike_times[self.n_spikes:needed] = times
+        self.snippets[self.n_spikes:needed] = snippets
+        self.n_spikes = needed
+
+    def _refractory(self, times):
+        """Boolean array of crossings outside the refractory period."""
+        keep = np.diff(np.concatenate(((self._last_spike,), times))) \
+            >= self.refractory
+        if np.all(keep):
+            return keep
+
+        # Dropping a crossing can free the next one, so resolve runs of
+        # close crossings in order
+        last = self._last_spike
+        for i, time in enumerate(times):
+            keep[i] = time - last >= self.refractory
+            if keep[i]:
+                last = time
+        return keep
+
+    def _detect(self, t, V, stop):
+        """Check positions up to `stop` of the buffer for crossings."""
+        thresh = self.threshold()
+        beyond = self.sign * (V - thresh) > 0
+
+        # Upward edges of `beyond` at unchecked positions
+        inds = np.flatnonzero(beyond[1:stop] & ~beyond[:stop-1]) + 1
+        inds = inds[inds >= self._n_checked]
+        inds = inds[self._refractory(t[inds])]
+
+        if len(inds) > 0:
+            window = np.arange(-self.pre, self.post)
+            self._store(t[inds], V[inds[:, None] + window])
+            self._last_spike = t[inds[-1]]
+
+    def update(self, t, V):
+        """
+        Process a chunk of the recording.
+
+        Parameters
+        ----------
+        t : ndarray
+            Times of the samples, increasing.
+        V : ndarray
+            Voltages of the samples.
+        """
+        if self._finished:
+            raise RuntimeError('Cannot update a finished detector.')
+
+        t, V = np.asarray(t, dtype=float), np.asarray(V, dtype=float)
+        self.noise.update(V)
+        buf_t = np.concatenate((self._tail_t, t))
+        buf_V = np.concatenate((self._tail_V, V))
+
+        # Crossings need `post` samples after them for their snippets
+        stop = len(buf_V) - self.post
+        if stop > self._n_checked:
+            self._detect(buf_t, buf_V, stop)
+        stop = max(stop, self._n_checked)
+
+        # Keep the samples needed for the unchecked positions
+        keep = self.pre + 1 + len(buf_V) - stop
+        self._tail_t, self._tail_V = buf_t[-keep:], buf_V[-keep:]
+        self._n_checked = keep - (len(buf_V) - stop)
+
+    def finish(self):
+        """
+        Process the end of the recording.
+
+        Returns
+        -------
+        spike_times : ndarray
+            Times of the threshold crossings of the spikes.
+        snippets : ndarray
+            Array of shape (n_spikes, pre + post) of the voltage around
+            each crossing, padded with NaN at the ends of the recording.
+        """
+        if not self._finished:
+            self.update(np.full(self.post, np.nan), np.full(self.post, np.nan))
+            self._finished = True
+
+        return (self.spike_times[:self.n_spikes],
+                self.snippets[:self.n_spikes])
+
+
+def detect_spikes(filename, chunk_size=2**16, skiprows=2, **kwargs):
+    """
+    Detect spikes in a (t, V) recording file, reading it in chunks.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file, e.g., 'data/retina_spikes.csv'.
+    chunk_size : int, default 2**16
+        Number of samples read at a time.
+    skiprows : int, default 2
+        Number of lines of comments and headers at the top of the file.
+    kwargs
+        Further arguments to `SpikeDetector`.
+
+    Returns
+    -------
+    spike_times : ndarray
+        Times of the threshold crossings of the spikes.
+    snippets : ndarray
+        Array of shape (n_spikes, pre + post) of the voltage around
+        each crossing.
+    """
+    detector = SpikeDetector(**kwargs)
+    for t, V in read_chunks(filename, chunk_size=chunk_size,
+                            skiprows=skiprows):
+        detector.update(t, V)
+
+    return detector.finish()
@@ -0,0 +1,48 @@
+import numpy as np
+import aa_conversion
+import pytest
+
+
+def test_one_to_three():
+    assert aa_conversion.one_to_three('ACw') == 'Ala-Cys-Trp'
+    assert aa_conversion.one_to_three('') == ''
+    assert aa_conversion.one_to_three(['AC', '', 'Y'], sep='') \
+            == ['AlaCys', '', 'Tyr']
+
+
+def test_three_to_one():
+    assert aa_conversion.three_to_one('Ala-CYS-trp') == 'ACW'
+    assert aa_conversion.three_to_one(['AlaCys', '', 'Tyr'], sep='') \
+            == ['AC', '', 'Y']
+
+
+def test_round_trip_array():
+    seqs = np.array(['MKVLAAGIVG', 'DE', 'WYFH'])
+    out = aa_conversion.three_to_one(aa_conversion.one_to_three(seqs))
+    assert isinstance(out, np.ndarray)
+    assert list(out) == list(seqs)
+
+
+def test_invalid_amino_acid():
+    with pytest.raises(RuntimeError) as excinfo:
+        aa_conversion.one_to_three(['AC', 'AxC'])
+    excinfo.match('X is not a valid amino acid')
+    with pytest.raises(RuntimeError) as excinfo:
+        aa_conversion.three_to_one('Ala-Xyz')
+    excinfo.match('Xyz is not a valid amino acid')
+    with pytest.raises(RuntimeError) as excinfo:
+        aa_conversion.three_to_one('\u00dfla-Cys')
+    excinfo.match('\\?la is not a valid amino acid')
+    with pytest.raises(RuntimeError) as excinfo:
+        aa_conversion.three_to_one('Ala+Cys')
+    excinfo.match('Ala\\+Cys is not a valid three-letter sequence')
+
+
+def test_invalid_separator():
+    for func in [aa_conversion.one_to_three, aa_conversion.three_to_one]:
+        with pytest.raises(RuntimeError) as excinfo:
+            func('AC', sep='--')
+        excinfo.match("'--' is not a valid separator")
+        with pytest.raises(RuntimeError) as excinfo:
+            func('AC', sep=None)
+        excinfo.match('None is not a valid separator')
@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+import pytest
+import bokeh.embed
+import bokeh.resources
+import bootcamp_utils as bu
+
+
+def test_draw_bs_reps_returns_array():
+    reps = bu.draw_bs_reps(np.arange(10), size=100, seed=3)
+    assert isinstance(reps, np.ndarray)
+    assert reps.shape == (100,)
+
+
+def test_draw_bs_reps_global_seed():
+    np.random.seed(42)
+    reps_1 = bu.draw_bs_reps(np.arange(10), size=100)
+    np.random.seed(42)
+    reps_2 = bu.draw_bs_reps(np.arange(10), size=100)
+    assert np.array_equal(reps_1, reps_2)
+
+
+def test_draw_bs_reps_vectorized_matches_loop():
+    data = np.random.default_rng(0).normal(size=50)
+    for func in (np.mean, np.median, np.std):
+        vec = bu.draw_bs_reps(data, func=func, size=200, seed=42)
+        loop = bu.draw_bs_reps(data, func=func, size=200, seed=42,
+                               vectorized=False)
+        assert np.allclose(vec, loop)
+
+
+def test_draw_bs_reps_percentile():
+    data = np.arange(20.0)
+    reps = bu.draw_bs_reps(data, func=np.percentile, size=30, seed=1,
+                           q=[25, 75])
+    assert reps.shape == (30, 2)
+    assert np.all(reps[:, 0] <= reps[:, 1])
+
+
+def test_draw_bs_reps_seed_reproducible():
+    data = np.arange(100.0)
+    a = bu.draw_bs_reps(data, size=1000, seed=7, max_bytes=10000)
+    b = bu.draw_bs_reps(data, size=1000, seed=7, max_bytes=10000)
+    assert np.array_equal(a, b)
+
+
+def test_draw_bs_reps_constant_data():
+    assert np.all(bu.draw_bs_reps(np.ones(5), size=10, seed=0) == 1)
+
+
+def test_draw_bs_reps_independent_of_n_jobs():
+    data = np.random.default_rng(1).exponential(size=40)
+    serial = bu.draw_bs_reps(data, func=np.median, size=3000, seed=5)
+    parallel = bu.draw_bs_reps(data, func=np.median, size=3000, seed=5,
+                               n_jobs=2)
+    assert np.array_equal(serial, parallel)
+
+    for n_jobs in [0, -2, 1.5]:
+        with pytest.raises(RuntimeError) as excinfo:
+            bu.draw_bs_reps(data, size=10, n_jobs=n_jobs)
+        excinfo.match(str(n_jobs) + ' is not a valid number of jobs.')
+
+
+def test_ecdf_n_points():
+    x, y = bu.ecdf(np.arange(1000), n_points=10)
+    assert np.array_equal(y, np.arange(1, 11) / 10)
+    assert x[-1] == 999
+
+
+def test_ecdf_sketch_rank_error():
+    data = np.random.default_rng(2).normal(size=200000)
+    sketch = bu.ECDFSketch(eps=0.01, seed=0)
+    for chunk in np.array_split(data, 20):
+        sketch.update(chunk)
+    x = np.linspace(-2, 2, 21)
+    exact = np.searchsorted(np.sort(data), x, side='right') / len(data)
+    assert np.abs(sketch.cdf(x) - exact).max() < 0.01
+    assert sketch.quantile(1) == data.max()
+
+
+def test_ecdf_sketch_merge():
+    a = bu.ECDFSketch(seed=0).update(np.arange(5000))
+    b = bu.ECDFSketch(seed=1).update(np.arange(5000, 10000))
+    a.merge(b)
+    assert a.n == 10000
+    assert a.min == 0 and a.max == 9999
+    assert abs(a.quantile(0.5) - 5000) < 100
+
+
+def test_streaming_ecdf_formal():
+    chunks = (np.arange(i, i + 100) for i in range(0, 1000, 100))
+    x, y = bu.streaming_ecdf(chunks, n_points=50, formal=True)
+    assert len(x) == len(y) == 2 * 51
+    assert y[0] == 0 and y[-1] == 1
+
+
+def test_grouped_ecdf_matches_ecdf():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({'value': rng.normal(size=300),
+                       'group': rng.choice(['a', 'b', 'c'], size=300)})
+    for formal in (False, True):
+        for n_points in (None, 20):
+            ecdfs = bu.grouped_ecdf(df, 'value', 'group', formal=formal,
+                                    n_points=n_points)
+            assert list(ecdfs.labels) == ['a', 'b', 'c']
+            for i, label in enumerate(ecdfs.labels):
+                x, y = bu.ecdf(df.loc[df['group'] == label, 'value'],
+                               formal=formal, n_points=n_points)
+                sl = slice(ecdfs.offsets[i], ecdfs.offsets[i+1])
+                assert np.allclose(ecdfs.x[sl], x)
+                assert np.allclose(ecdfs.y[sl], y)
+
+
+def test_draw_perm_reps_vectorized_matches_loop():
+    a, b = np.arange(10.0), np.arange(5.0, 20.0)
+    vec = bu.draw_perm_reps(a, b, size=500, seed=4)
+    loop = bu.draw_perm_reps(a, b, size=500, seed=4, vectorized=False)
+    assert np.allclose(vec, loop)
+
+
+def test_perm_test_detects_difference():
+    rng = np.random.default_rng(5)
+    p, p_err = bu.perm_test(rng.normal(0, 1, 50), rng.normal(2, 1, 50),
+                            size=2000, seed=0)
+    assert p == 0 and p_err == 0
+    p, _ = bu.perm_test(np.ones(10), np.ones(10), size=100, seed=0)
+    assert p == 1
+
+
+def test_perm_test_invalid_alternative():
+    with pytest.raises(RuntimeError) as excinfo:
+        bu.perm_test([1, 2], [3, 4], alternative='bigger')
+    excinfo.match('bigger is not a valid alternative')
+
+
+def test_draw_bs_diff_reps():
+    reps = bu.draw_bs_diff_reps(np.full(10, 3.0), np.ones(10), size=50, seed=0)
+    assert np.all(reps == 2)
+
+
+def test_image_pyramid():
+    im = np.arange(40 * 24, dtype=float).reshape(40, 24)
+    levels = bu.image_pyramid(im, min_size=8, dtype=np.uint16)
+    assert [level.shape for level in levels] == [(40, 24), (20, 12),
+                                                  (10, 6), (5, 3)]
+    assert all(level.dtype == np.uint16 for level in levels)
+    assert levels[0][0, 0] == 0 and levels[0][-1, -1] == 65535
+
+    # Block means, with odd edges padded by their own values
+    assert np.allclose(bu._block_mean(im, 2)[0, 0], im[:2, :2].mean())
+    assert np.allclose(bu._block_mean(im[:5, :3], 2)[2, 1], im[4, 2])
+
+    # Contrast window clips
+    levels = bu.image_pyramid(im, min_size=64, contrast=(100, 200))
+    assert len(levels) == 1
+    assert levels[0].min() == 0 and levels[0].max() == 255
+
+
+def test_pyramid_view():
+    im = np.random.default_rng(3252).uniform(size=(512, 1024))
+    levels = bu.image_pyramid(im, min_size=64)
+
+    # Whole image in few pixels comes from a coarse level
+    view = bu._pyramid_view(levels, 2, (0, 1024), (0, 512), 256 * 128)
+    assert view['image'][0].shape == (128, 256)
+    assert view['dw'] == [1024] and view['dh'] == [512]
+
+    # Zooming in reaches full resolution
+    view = bu._pyramid_view(levels, 2, (100.5, 300), (50, 150), 256 * 128)
+    assert view['x'] == [100] and view['y'] == [50]
+    assert np.array_equal(view['image'][0], levels[0][50:150, 100:300])
+
+    # Padded edge blocks do not stretch the image
+    levels = bu.image_pyramid(im[:510, :1020], min_size=64)
+    view = bu._pyramid_view(levels, 2, (0, 1020), (0, 510), 256 * 128)
+    assert view['image'][0].shape == (128, 255)
+    assert view['dw'] == [1020] and view['dh'] == [510]
+
+
+def test_bokeh_imshow():
+    im = np.random.default_rng(3252).uniform(size=(1000, 1500))
+    p = bu.bokeh_imshow(im)
+    assert p.height == 400 and p.width == 600
+
+    p = bu.bokeh_imshow(im, pyramid=True, max_pixels=10000)
+    image = p.renderers[0].data_source.data['image'][0]
+    assert image.dtype == np.uint8 and image.size <= 10000
+
+    # Without a server, levels are swapped in the browser
+    callbacks = p.x_range.js_property_callbacks['change:start']
+    pyramid = callbacks[0].args['pyramid'].data['image']
+    assert pyramid[0].shape == (1000, 1500) and pyramid[-1].size <= 10000
+    bokeh.embed.file_html(p, bokeh.resources.CDN)
@@ -0,0 +1,65 @@
+import numpy as np
+import common_substring as cs
+
+
+def _brute_force_lcs_length(seq1, seq2):
+    best = 0
+    for i in range(len(seq1)):
+        for j in range(len(seq2)):
+            k = 0
+            while (i + k < len(seq1) and j + k < len(seq2)
+                   and seq1[i+k] == seq2[j+k]):
+                k += 1
+            best = max(best, k)
+    return best
+
+
+def test_suffix_array():
+    seq = 'banana'
+    sa = cs.suffix_array(cs._as_codes(seq))
+    assert list(sa) == sorted(range(len(seq)), key=lambda i: seq[i:])
+
+
+def test_lcp_array():
+    rng = np.random.default_rng(1)
+    for seq in ['banana', 'aaaaaaa', ''.join(rng.choice(list('AC'), 50))]:
+        codes = cs._as_codes(seq)
+        sa = cs.suffix_array(codes)
+        lcp = cs.lcp_array(codes, sa)
+        assert lcp[0] == 0
+        for i in range(1, len(sa)):
+            a, b = seq[sa[i-1]:], seq[sa[i]:]
+            k = 0
+            while k < min(len(a), len(b)) and a[k] == b[k]:
+                k += 1
+            assert lcp[i] == k
+
+
+def test_longest_common_substring():
+    substring, pos1, pos2 = cs.longest_common_substring('thequickbrownfox',
+                                                        'quickly')
+    assert (substring, pos1, pos2) == ('quick', 3, 0)
+    assert cs.longest_common_substring('abc', 'xyz') == ('', 0, 0)
+    assert cs.longest_common_substring('', 'xyz') == ('', 0, 0)
+
+
+def test_longest_common_substring_random():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        seq1 = ''.join(rng.choice(list('AC'), size=40))
+        seq2 = ''.join(rng.choice(list('AC'), size=30))
+        substring, pos1, pos2 = cs.longest_common_substring(seq1, seq2)
+        assert len(substring) == _brute_force_lcs_length(seq1, seq2)
+        assert seq1[pos1:pos1+len(substring)] == substring
+        assert seq2[pos2:pos2+len(substring)] == substring
+
+
+def test_common_substrings():
+    seq1 = 'xxGATTACAxxCCCGGGxxTTT'
+    seq2 = 'yyTTTyCCCGGGyyGATTACAy'
+    out = cs.common_substrings(seq1, seq2, k=3, min_length=3)
+    assert [substring for substring, _, _ in out] \
+            == ['GATTACA', 'CCCGGG', 'TTT']
+    for substring, pos1, pos2 in out:
+        assert seq1[pos1:pos1+len(substring)] == substring
+        assert seq2[pos2:pos2+len(substring)] == substring
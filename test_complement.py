@@ -0,0 +1,38 @@
+import complement
+import fasta
+import pytest
+
+
+def test_reverse_complement():
+    assert complement.reverse_complement('AGCTCGTGC') == 'GCACGAGCT'
+    assert complement.reverse_complement('AGCU', material='RNA') == 'AGCU'
+    assert complement.reverse_complement(b'aaCG') == b'CGTT'
+
+
+def test_reverse_complement_preserve_case():
+    assert complement.reverse_complement('aaCG', preserve_case=True) == 'CGtt'
+
+
+def test_complement_iupac():
+    assert complement.complement('RYKMSWBDHVN-') == 'YRMKSWVHDBN-'
+
+
+def test_complement_invalid_base():
+    with pytest.raises(RuntimeError) as excinfo:
+        complement.complement('ACZT')
+    excinfo.match('Z is not a valid base')
+
+
+def test_reverse_complement_fasta(tmp_path):
+    in_file = tmp_path / 'in.fasta'
+    out_file = tmp_path / 'out.fasta'
+    seqs = ['ACGTTGCAAC' * 13, 'GGGAT']
+    in_file.write_text('>one\n' + seqs[0][:70] + '\n' + seqs[0][70:]
+                       + '\n>two\n' + seqs[1] + '\n')
+    complement.reverse_complement_fasta(str(in_file), str(out_file),
+                                        line_width=7, chunk_size=16)
+    records = list(fasta.read_fasta(str(out_file)))
+    assert [header for header, _ in records] == ['one', 'two']
+    assert [seq for _, seq in records] \
+            == [complement.reverse_complement(seq) for seq in seqs]
+    assert max(len(line) for line in out_file.read_text().split('\n')) == 7
@@ -0,0 +1,130 @@
+import os
+
+import numpy as np
+import pandas as pd
+import data_cache
+import pytest
+
+
+def test_cached_loadtxt(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    data = data_cache.cached_loadtxt('data/wt_lac.csv', cache_dir=cache_dir,
+                                     skiprows=3, delimiter=',')
+    expected = np.loadtxt('data/wt_lac.csv', skiprows=3, delimiter=',')
+    assert isinstance(data, np.memmap)
+    assert np.array_equal(data, expected)
+    assert len(os.listdir(cache_dir)) == 1
+
+    # Hit, and a different set of options gets its own entry
+    again = data_cache.cached_loadtxt('data/wt_lac.csv', cache_dir=cache_dir,
+                                      skiprows=3, delimiter=',', mmap=False)
+    assert not isinstance(again, np.memmap)
+    assert np.array_equal(again, expected)
+    col = data_cache.cached_loadtxt('data/wt_lac.csv', cache_dir=cache_dir,
+                                    skiprows=3, delimiter=',', usecols=1)
+    assert np.array_equal(col, expected[:, 1])
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_rebuild_on_change(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    fname = str(tmp_path / 'data.csv')
+    with open(fname, 'w') as f:
+        f.write('1,2\n3,4\n')
+    assert np.array_equal(data_cache.cached_loadtxt(fname, cache_dir=cache_dir,
+                                                    delimiter=','),
+                          [[1, 2], [3, 4]])
+
+    with open(fname, 'w') as f:
+        f.write('5,6\n7,8\n')
+    stat = os.stat(fname)
+    os.utime(fname, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert np.array_equal(data_cache.cached_loadtxt(fname, cache_dir=cache_dir,
+                                                    delimiter=','),
+                          [[5, 6], [7, 8]])
+
+    # The stale entry is removed
+    assert len(os.listdir(cache_dir)) == 1
+
+
+def test_cached_read_csv(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    expected = pd.read_csv('data/grant_1973.csv', comment='#')
+    for mmap in [True, False]:
+        df = data_cache.cached_read_csv('data/grant_1973.csv',
+                                        cache_dir=cache_dir, mmap=mmap,
+                                        comment='#')
+        assert df.equals(expected)
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_frame_dtypes(tmp_path):
+    fname = str(tmp_path / 'data.csv')
+    df = pd.DataFrame({'species': ['fortis', None, 'scandens'],
+                       'year': [1973, 1975, 2012],
+                       'beak depth (mm)': [8.1, 9.2, np.nan],
+                       'tagged': [True, False, True]})
+    df.to_csv(fname, index=False)
+    cache_dir = str(tmp_path / 'cache')
+
+    for kwargs in [{}, {'index_col': 'year'},
+                   {'dtype': {'species': 'category'}}]:
+        expected = pd.read_csv(fname, **kwargs)
+        for _ in range(2):
+            pd.testing.assert_frame_equal(
+                data_cache.cached_read_csv(fname, cache_dir=cache_dir,
+                                           mmap=False, **kwargs), expected)
+
+
+def test_callable_options_bypass_cache(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    data = data_cache.cached_loadtxt(
+        'data/wt_lac.csv', cache_dir=cache_dir, skiprows=3, delimiter=',',
+        converters={0: lambda s: 2 * float(s)})
+    assert not os.path.exists(cache_dir)
+    assert np.allclose(data[:, 0], 2 * np.loadtxt('data/wt_lac.csv',
+                                                  skiprows=3,
+                                                  delimiter=',')[:, 0])
+
+
+def test_clear_cache(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    data_cache.cached_read_csv('data/grant_1975.csv', cache_dir=cache_dir,
+                               comment='#')
+    data_cache.clear_cache(cache_dir)
+    assert not os.path.exists(cache_dir)
+
+
+def test_frame_round_trip(tmp_path):
+    fname = str(tmp_path / 'data.csv')
+    with open(fname, 'w') as f:
+        f.write('tagged,count,species\nTrue,1,fortis\n,,\nFalse,3,scandens\n')
+    cache_dir = str(tmp_path / 'cache')
+
+    kwargs = {'dtype': {'count': 'Int64'}}
+    expected = pd.read_csv(fname, **kwargs)
+    assert expected['tagged'].dtype == object
+    for mmap in [False, True, False]:
+        df = data_cache.cached_read_csv(fname, cache_dir=cache_dir,
+                                        mmap=mmap, **kwargs)
+        assert df['tagged'].tolist()[::2] == [True, False]
+        assert df['tagged'].isna()[1]
+        assert df['count'].dtype == 'Int64'
+        pd.testing.assert_frame_equal(df, expected, check_exact=True)
+    assert len(os.listdir(cache_dir)) == 1
+
+
+def test_unstorable_columns_not_cached(tmp_path, monkeypatch):
+    df = pd.DataFrame({'a': [1, 'x']})
+    assert not data_cache.can_store(df)
+    with pytest.raises(RuntimeError) as excinfo:
+        data_cache.write_frame(str(tmp_path), df)
+    excinfo.match("Column 'a' of dtype object cannot be stored.")
+
+    # Such frames are returned as parsed, without a cache entry
+    monkeypatch.setattr(pd, 'read_csv', lambda fname, **kwargs: df.copy())
+    cache_dir = str(tmp_path / 'cache')
+    out = data_cache.cached_read_csv('data/grant_1973.csv',
+                                     cache_dir=cache_dir)
+    assert out['a'].tolist() == [1, 'x']
+    assert not os.path.exists(cache_dir) or len(os.listdir(cache_dir)) == 0
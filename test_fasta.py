@@ -0,0 +1,34 @@
+import numpy as np
+import fasta
+import pytest
+
+
+def test_read_fasta_multi_record(tmp_path):
+    fname = tmp_path / 'test.fasta'
+    fname.write_text('>seq1 first\nACGT\nAC\n>seq2\r\nGG\r\nTT\r\n>empty\n')
+    records = list(fasta.read_fasta(str(fname)))
+    assert records == [('seq1 first', 'ACGTAC'), ('seq2', 'GGTT'),
+                       ('empty', '')]
+
+
+def test_read_fasta_types(tmp_path):
+    fname = tmp_path / 'test.fasta'
+    fname.write_text('>seq\nACGT\nAC')
+    assert fasta.read_fasta_seq(str(fname), as_type='bytes') == b'ACGTAC'
+    seq = fasta.read_fasta_seq(str(fname), as_type='numpy')
+    assert seq.dtype == np.uint8
+    assert seq.tobytes() == b'ACGTAC'
+
+
+def test_read_fasta_data_files():
+    seq = fasta.read_fasta_seq('data/salmonella_spi1_region.fna')
+    assert len(seq) == 200000
+    assert len(list(fasta.read_fasta('data/aligned.fasta'))) > 1
+
+
+def test_read_fasta_seq_empty_file(tmp_path):
+    fname = tmp_path / 'empty.fasta'
+    fname.write_text('')
+    with pytest.raises(RuntimeError) as excinfo:
+        fasta.read_fasta_seq(str(fname))
+    excinfo.match('contains no FASTA records')
@@ -0,0 +1,114 @@
+import numpy as np
+import fold_change
+import pytest
+
+
+def _lac_data():
+    cs, fcs, ids = [], [], []
+    for i, name in enumerate(['wt', 'q18a', 'q18m']):
+        data = np.loadtxt('data/' + name + '_lac.csv', skiprows=3,
+                          delimiter=',')
+        cs.append(data[:, 0])
+        fcs.append(data[:, 1])
+        ids.append(np.full(len(data), i))
+    return np.concatenate(cs), np.concatenate(fcs), np.concatenate(ids)
+
+
+def test_bohr_collapse():
+    c = np.logspace(-6, 1, 20)
+    fc = fold_change.fold_change(c, 141.5)
+    bohr = fold_change.bohr_parameter(c, 141.5)
+    assert np.allclose(fold_change.fold_change_bohr(bohr), fc)
+
+
+def test_jacobian():
+    c = np.logspace(-6, 1, 30)
+    params = np.array([0.02, 0.003, 4.0, 100.0])
+    jac = fold_change.fold_change_jacobian(c, params[3], *params[:3])
+    assert jac.shape == (30, 4)
+
+    h = 1e-7
+    for k in range(4):
+        shifted = params.copy()
+        shifted[k] *= np.exp(h)
+        numerical = (fold_change.fold_change(c, shifted[3], *shifted[:3])
+                     - fold_change.fold_change(c, params[3], *params[:3])) / h
+        assert np.allclose(jac[:, k], numerical, atol=1e-6)
+
+
+def test_fit_synthetic():
+    rg = np.random.default_rng(3252)
+    n_mutants = 50
+    c = np.tile(np.logspace(-6, 2, 12), n_mutants)
+    mutant_ids = np.repeat(np.arange(n_mutants), 12)
+    RK = np.exp(rg.uniform(1, 7, n_mutants))
+    fc = fold_change.fold_change(c, RK[mutant_ids], 0.02, 0.003, 4.0)
+
+    fit = fold_change.fit_fold_change(c, fc, mutant_ids)
+    assert fit.converged
+    assert np.allclose([fit.Kda, fit.Kdi, fit.Kswitch], [0.02, 0.003, 4.0],
+                       rtol=1e-4)
+    assert np.allclose(fit.RK, RK, rtol=1e-4)
+
+
+def test_fit_batch_matches_single():
+    c, fc, mutant_ids = _lac_data()
+    fixed = {'Kswitch': 5.8}
+    fits = fold_change.bootstrap_fits(c, fc, mutant_ids, size=20, seed=42,
+                                      fixed=fixed)
+    assert fits.RK.shape == (20, 3)
+    assert np.all(fits.Kswitch == 5.8)
+
+    # Same replicates, fit one at a time
+    rg = np.random.default_rng(42)
+    counts = np.bincount(mutant_ids)[mutant_ids]
+    starts = np.searchsorted(mutant_ids, mutant_ids)
+    inds = starts + (rg.random((20, len(fc))) * counts).astype(np.int64)
+    for i in [0, 7, 19]:
+        single = fold_change.fit_fold_change(c[inds[i]], fc[inds[i]],
+                                             mutant_ids, fixed=fixed)
+        assert np.allclose(single.RK, fits.RK[i], rtol=1e-5)
+        assert np.isclose(single.cost, fits.cost[i])
+
+
+def test_fit_lac_data():
+    c, fc, mutant_ids = _lac_data()
+    fit = fold_change.fit_fold_change(c, fc, mutant_ids,
+                                      fixed={'Kswitch': 5.8})
+    assert fit.converged
+    # Q18M represses most tightly, Q18A least
+    assert fit.RK[2] > fit.RK[0] > fit.RK[1]
+
+
+def test_fit_many_mutants():
+    rg = np.random.default_rng(8124)
+    n_mutants = 400
+    c = np.tile(np.logspace(-6, 2, 8), n_mutants)
+    mutant_ids = np.repeat(np.arange(n_mutants), 8)
+    RK = np.exp(rg.uniform(1, 7, n_mutants))
+    fc = fold_change.fold_change(c, RK[mutant_ids], 0.02, 0.003, 4.0)
+
+    fits = fold_change.fit_fold_change(c, np.stack((fc, fc)), mutant_ids)
+    assert np.all(fits.converged)
+    assert np.allclose(fits.RK, RK, rtol=1e-4)
+    assert np.allclose(fits.Kswitch, 4.0, rtol=1e-4)
+
+
+def test_unidentified_fits_not_converged():
+    # Without saturating inducer, a free Kswitch runs off in most
+    # replicates; those are flagged and give no estimates
+    c, fc, mutant_ids = _lac_data()
+    fits = fold_change.bootstrap_fits(c, fc, mutant_ids, size=20, seed=42)
+    assert not np.all(fits.converged)
+    assert np.all(np.isnan(fits.Kswitch[~fits.converged]))
+    assert np.all(np.isnan(fits.RK[~fits.converged]))
+    assert np.all(np.isfinite(fits.Kswitch[fits.converged]))
+
+
+def test_fit_errors():
+    with pytest.raises(RuntimeError) as excinfo:
+        fold_change.fit_fold_change([1, 2], [0.5, 0.5], [0, 0], fixed={'K': 1})
+    excinfo.match('K is not a shared parameter')
+    with pytest.raises(RuntimeError) as excinfo:
+        fold_change.fit_fold_change([1, 2], [0.5, 0.5], [0])
+    excinfo.match('Need one mutant index per observation')
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import data_cache
+import frame_memory
+
+
+def test_optimize_column():
+    col = pd.Series([1, -200, 3000])
+    assert frame_memory.optimize_column(col).dtype == np.int16
+    col = pd.Series([1.0, 2.0, 3.0])
+    assert frame_memory.optimize_column(col).dtype == np.int8
+
+    # float32 only where it is exact, unless allowed
+    col = pd.Series([0.5, np.nan, 2.25])
+    assert frame_memory.optimize_column(col).dtype == np.float32
+    col = pd.Series([0.1, 0.2])
+    assert frame_memory.optimize_column(col).dtype == np.float64
+    small = frame_memory.optimize_column(col, allow_float32=True)
+    assert small.dtype == np.float32
+    assert np.allclose(small, col, rtol=1e-7)
+
+    col = pd.Series(['a', 'b', 'a', None, 'a'])
+    cat = frame_memory.optimize_column(col)
+    assert isinstance(cat.dtype, pd.CategoricalDtype)
+    assert cat.isna().sum() == 1
+    col = pd.Series(['a', 'b', 'c'])
+    assert frame_memory.optimize_column(col) is col
+
+
+def test_dates():
+    col = pd.Series(['2013_02_26', '2013_03_01', None])
+    dates = frame_memory.optimize_column(col)
+    assert dates.dtype.kind == 'M'
+    assert dates[1] == pd.Timestamp('2013-03-01')
+    assert dates.isna()[2]
+
+    # Strings that are not all dates stay strings
+    col = pd.Series(['2013-02-26', 'I', 'II', 'III'])
+    assert frame_memory.optimize_column(col, max_unique=0) is col
+
+
+def test_frog_data():
+    df = pd.read_csv('data/frog_tongue_adhesion.csv', comment='#')
+    small = frame_memory.optimize_frame(df)
+    assert list(small.columns) == list(df.columns)
+    assert isinstance(small['ID'].dtype, pd.CategoricalDtype)
+    assert small['date'].dtype.kind == 'M'
+    assert small['impact force (mN)'].dtype == np.int16
+    for name in df.columns[2:]:
+        assert np.array_equal(small[name], df[name])
+
+    report = frame_memory.memory_report(df, small)
+    assert list(report.index[-2:]) == ['Index', 'total']
+    assert report.loc['total', 'bytes'] == df.memory_usage(deep=True).sum()
+    assert report.loc['total', 'bytes after'] \
+        < report.loc['total', 'bytes'] / 2
+    assert report.loc['ID', 'dtype after'] == 'category'
+
+
+def test_loader_hook(tmp_path, monkeypatch):
+    fname = 'data/frog_tongue_adhesion.csv'
+    df = data_cache.cached_read_csv(fname, cache_dir=str(tmp_path),
+                                    comment='#',
+                                    postprocess=frame_memory.optimize_frame)
+    assert isinstance(df['ID'].dtype, pd.CategoricalDtype)
+    assert df['trial number'].dtype == np.int8
+
+    # The optimized frame is cached, so a hit parses and converts nothing
+    monkeypatch.setattr(pd, 'read_csv', None)
+    monkeypatch.setattr(frame_memory, 'optimize_column', None)
+    again = data_cache.cached_read_csv(
+        fname, cache_dir=str(tmp_path), comment='#',
+        postprocess=frame_memory.optimize_frame)
+    assert again.equals(df)
+    assert again['date'].dtype.kind == 'M'
+    monkeypatch.undo()
+
+    # Unnamed functions are applied to the cached raw frame
+    raw = data_cache.cached_read_csv(fname, cache_dir=str(tmp_path),
+                                     comment='#',
+                                     postprocess=lambda df: df.iloc[:2])
+    assert len(raw) == 2
+    assert raw['ID'].dtype == pd.read_csv(fname, comment='#')['ID'].dtype
+
+
+def test_large_and_nullable_integers():
+    # Whole numbers too large for exact integers stay floats
+    col = pd.Series([1.0, 2.0, 1e20])
+    out = frame_memory.optimize_column(col)
+    assert out.dtype.kind == 'f'
+    assert out[2] == 1e20
+    col = pd.Series([1.0, 2.0**20])
+    assert frame_memory.optimize_column(col).dtype == np.int32
+    col = pd.Series([1.0, 2.0**53 + 2])
+    assert frame_memory.optimize_column(col) is col
+
+    col = pd.Series([1, None, 300], dtype='Int64')
+    out = frame_memory.optimize_column(col)
+    assert out.dtype == 'Int16'
+    assert out.isna().tolist() == [False, True, False]
+    assert out[2] == 300
+    col = pd.Series([None, None], dtype='Int64')
+    assert frame_memory.optimize_column(col).dtype == 'Int8'
+
+    # Other extension types are left alone
+    col = pd.Series([0.5, None], dtype='Float64')
+    assert frame_memory.optimize_column(col) is col
+
+
+def test_unsigned_and_duplicates():
+    col = pd.Series([1, 200], dtype=np.uint8)
+    assert frame_memory.optimize_column(col) is col
+    col = pd.Series([1, 60000], dtype=np.uint64)
+    assert frame_memory.optimize_column(col).dtype == np.uint16
+    col = pd.Series([1, None], dtype='UInt32')
+    assert frame_memory.optimize_column(col).dtype == 'UInt8'
+    col = pd.Series([-1, 1], dtype=np.int8)
+    assert frame_memory.optimize_column(col) is col
+
+    df = pd.DataFrame([[1, 0.5, 'a'], [2, 1.5, 'a']], columns=['x', 'x', 'y'])
+    small = frame_memory.optimize_frame(df)
+    assert list(small.columns) == ['x', 'x', 'y']
+    assert list(small.dtypes.astype(str)) == ['int8', 'float32', 'category']
+    report = frame_memory.memory_report(df, small)
+    assert list(report['dtype after'][:2]) == ['int8', 'float32']
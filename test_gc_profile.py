@@ -0,0 +1,47 @@
+import numpy as np
+import gc_profile
+import pytest
+
+
+def _gc_windows(seq, block_size, step):
+    return [(seq[i:i+block_size].count('G') + seq[i:i+block_size].count('C'))
+            / block_size
+            for i in range(0, len(seq) - block_size + 1, step)]
+
+
+def test_gc_blocks():
+    assert np.allclose(gc_profile.gc_blocks('ATGACTACGT', 4), [0.25, 0.5])
+    assert np.allclose(gc_profile.gc_blocks('atgactacgt', 4, step=2),
+                       [0.25, 0.5, 0.5, 0.5])
+
+
+def test_gc_tracks_matches_slicing():
+    rng = np.random.default_rng(0)
+    seq = ''.join(rng.choice(list('ACGT'), size=1000))
+    tracks = gc_profile.gc_tracks(seq, [10, 50, 7], steps=[10, 5, 3])
+    for track, (block_size, step) in zip(tracks, [(10, 10), (50, 5), (7, 3)]):
+        assert np.allclose(track, _gc_windows(seq, block_size, step))
+
+
+def test_gc_tracks_stream_matches_gc_tracks():
+    rng = np.random.default_rng(1)
+    seq = ''.join(rng.choice(list('ACGT'), size=1000))
+    chunks = [seq[i:i+37] for i in range(0, len(seq), 37)]
+    block_sizes, steps = [10, 50, 5], [10, 5, 12]
+    streamed = list(gc_profile.gc_tracks_stream(chunks, block_sizes, steps))
+    tracks = gc_profile.gc_tracks(seq, block_sizes, steps)
+    for i, track in enumerate(tracks):
+        assert np.allclose(np.concatenate([out[i] for out in streamed]),
+                           track)
+
+
+def test_gc_map():
+    assert gc_profile.gc_map('GCGCatatGCa', 4, 0.45) == 'GCGCatatgca'
+    assert gc_profile.gc_map(b'atgcGGCCnN', 3, 0.5) == b'atgCGGCCNn'
+    assert gc_profile.gc_map('GC', 4, 0.5) == 'gc'
+
+
+def test_gc_blocks_invalid_step():
+    with pytest.raises(RuntimeError) as excinfo:
+        gc_profile.gc_blocks('ACGT', 2, step=0)
+    excinfo.match('must be positive')
@@ -0,0 +1,146 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import harmonize
+import pytest
+
+
+def test_match_columns():
+    aliases = {'beak length (mm)': ['beak length', 'blength'],
+               'band': []}
+    matched = harmonize.match_columns([' Band', 'BLength', 'species'],
+                                      aliases)
+    assert matched == {'BLength': 'beak length (mm)', ' Band': 'band'}
+
+    with pytest.raises(RuntimeError) as excinfo:
+        harmonize.match_columns(['band'], aliases, fname='a.csv')
+    excinfo.match("a.csv has no column for 'beak length \\(mm\\)'.")
+
+
+grant_aliases = {'band': [],
+                 'species': [],
+                 'beak length (mm)': ['beak length', 'Beak length, mm',
+                                      'blength'],
+                 'beak depth (mm)': ['beak depth', 'Beak depth, mm',
+                                     'bdepth']}
+grant_files = {'data/grant_' + str(year) + '.csv': {'year': year}
+               for year in [1973, 1975, 1987, 1991, 2012]}
+grant_dtypes = {'species': 'category', 'beak length (mm)': np.float32,
+                'beak depth (mm)': np.float32, 'year': np.int16}
+
+
+def test_load_grant():
+    df = harmonize.load_harmonized(grant_files, grant_aliases, grant_dtypes)
+    assert list(df.columns) == ['band', 'species', 'beak length (mm)',
+                                'beak depth (mm)', 'year']
+    assert isinstance(df['species'].dtype, pd.CategoricalDtype)
+    assert df['beak depth (mm)'].dtype == np.float32
+    assert df['year'].dtype == np.int16
+    assert list(df['year'].unique()) == [1973, 1975, 1987, 1991, 2012]
+
+    # Each year keeps its own rows, in order
+    df_1991 = pd.read_csv('data/grant_1991.csv', comment='#')
+    sub = df.loc[df['year'] == 1991]
+    assert np.array_equal(sub['band'], df_1991['band'])
+    assert np.allclose(sub['beak length (mm)'], df_1991['blength'])
+
+
+def _write(fname, text):
+    with open(fname, 'w') as f:
+        f.write(text)
+
+
+def test_update_harmonized(tmp_path, monkeypatch):
+    aliases = {'x': ['X value'], 'kind': []}
+    dtypes = {'x': np.float32, 'kind': 'category', 'batch': np.int16}
+    a, b = str(tmp_path / 'a.csv'), str(tmp_path / 'b.csv')
+    _write(a, '# first\nX value,kind\n1.5,p\n2.5,q\n')
+    _write(b, 'kind,x,extra\nr,3.5,0\n')
+    path = str(tmp_path / 'table')
+
+    df = harmonize.update_harmonized(path, {a: {'batch': 1}}, aliases,
+                                     dtypes)
+    assert list(df['x']) == [1.5, 2.5]
+
+    # Only the new file is read
+    read = []
+    read_harmonized = harmonize.read_harmonized
+
+    def spy(fname, *args, **kwargs):
+        read.append(fname)
+        return read_harmonized(fname, *args, **kwargs)
+
+    monkeypatch.setattr(harmonize, 'read_harmonized', spy)
+    files = {a: {'batch': 1}, b: {'batch': 2}}
+    df = harmonize.update_harmonized(path, files, aliases, dtypes)
+    assert read == [b]
+    assert sorted(os.listdir(path)) == ['part_0', 'part_1', 'sources.json']
+    assert list(df['x']) == [1.5, 2.5, 3.5]
+    assert list(df['batch']) == [1, 1, 2]
+    assert list(df['kind'].cat.categories) == ['p', 'q', 'r']
+
+    # Nothing to read when up to date
+    read.clear()
+    again = harmonize.update_harmonized(path, files, aliases, dtypes)
+    assert read == []
+    assert again.equals(df)
+
+    # A changed file triggers a rebuild
+    _write(a, 'x,kind\n0.5,s\n')
+    os.utime(a, ns=(0, 0))
+    df = harmonize.update_harmonized(path, files, aliases, dtypes)
+    assert sorted(read) == sorted([a, b])
+    assert list(df['x']) == [0.5, 3.5]
+    assert sorted(os.listdir(path)) == ['part_0', 'sources.json']
+    assert not os.path.exists(path + '.tmp')
+
+
+def test_update_metadata(tmp_path, monkeypatch):
+    a = str(tmp_path / 'a.csv')
+    _write(a, 'x\n1\n2\n')
+    path = str(tmp_path / 'table')
+    files = {a: {'batch': np.int64(3), 'rate': np.float32(0.5)}}
+    df = harmonize.update_harmonized(path, files, {'x': []})
+    assert list(df['batch']) == [3, 3]
+
+    # Numpy metadata matches its stored value, so nothing is reread
+    monkeypatch.setattr(harmonize, 'load_harmonized', None)
+    again = harmonize.update_harmonized(path, files, {'x': []})
+    assert again.equals(df)
+
+    with pytest.raises(RuntimeError) as excinfo:
+        harmonize.update_harmonized(path, {a: {'batch': (1, 2)}}, {'x': []})
+    excinfo.match('\\(1, 2\\) is not a valid metadata value')
+
+
+def test_update_merges_parts(tmp_path):
+    path = str(tmp_path / 'table')
+    files = {}
+    for week in range(7):
+        fname = str(tmp_path / (str(week) + '.csv'))
+        _write(fname, 'x\n' + str(week) + '\n' + str(week) + '\n')
+        files[fname] = {'week': week}
+        df = harmonize.update_harmonized(path, files, {'x': []},
+                                         {'x': 'Int64'})
+
+    # Parts merge like binary carries: 7 updates of equal size leave 3
+    with open(os.path.join(path, 'sources.json')) as f:
+        manifest = json.load(f)
+    assert [part['n_rows'] for part in manifest['parts']] == [8, 4, 2]
+    assert sorted(name for name in os.listdir(path)
+                  if name.startswith('part_')) \
+        == sorted(part['name'] for part in manifest['parts'])
+    assert df['x'].dtype == 'Int64'
+    assert list(df['x']) == list(np.repeat(np.arange(7), 2))
+    assert list(df['week']) == list(np.repeat(np.arange(7), 2))
+
+
+def test_bad_n_threads(tmp_path):
+    for func in [harmonize.load_harmonized,
+                 lambda *args, **kwargs: harmonize.update_harmonized(
+                     str(tmp_path), *args, **kwargs)]:
+        with pytest.raises(RuntimeError) as excinfo:
+            func({}, {'x': []}, n_threads=0)
+        excinfo.match('0 is not a valid number of threads')
@@ -0,0 +1,57 @@
+import numpy as np
+import image_stack
+import pytest
+import tifffile
+
+
+def _write_frames(tmp_path, n_frames, compression=None):
+    rg = np.random.default_rng(3252)
+    frames = rg.integers(0, 4096, size=(n_frames, 20, 30), dtype=np.uint16)
+    for i, frame in enumerate(frames):
+        tifffile.imwrite(str(tmp_path / 'frame_{0:04d}.tif'.format(i)),
+                         frame, compression=compression)
+    return frames, str(tmp_path / 'frame_*.tif')
+
+
+def test_memmapped_frames(tmp_path):
+    frames, pattern = _write_frames(tmp_path, 5)
+    with image_stack.TiffStack(pattern) as stack:
+        assert stack.shape == (5, 20, 30)
+        assert isinstance(stack.frame(2), np.memmap)
+        assert np.array_equal(stack[2], frames[2])
+        assert np.array_equal(stack[1:4, 5:10, ::3], frames[1:4, 5:10, ::3])
+        assert np.array_equal(stack[[4, 0], 3], frames[[4, 0], 3])
+        assert stack[3:3].shape == (0, 20, 30)
+
+
+def test_compressed_frames(tmp_path):
+    frames, pattern = _write_frames(tmp_path, 6, compression='zlib')
+    with image_stack.TiffStack(pattern, cache_size=2) as stack:
+        assert not isinstance(stack.frame(0), np.memmap)
+        assert np.array_equal(stack[:], frames)
+        assert np.array_equal(stack[-2:, :, 7], frames[-2:, :, 7])
+        assert len(stack._cache) == 2
+        assert sorted(stack._cache) == [4, 5]
+
+
+def test_shape_mismatch(tmp_path):
+    frames, pattern = _write_frames(tmp_path, 2)
+    tifffile.imwrite(str(tmp_path / 'frame_0002.tif'), frames[0, :10])
+    with image_stack.TiffStack(pattern) as stack:
+        with pytest.raises(RuntimeError) as excinfo:
+            stack[:]
+    excinfo.match('has shape')
+
+
+def test_no_files(tmp_path):
+    with pytest.raises(RuntimeError) as excinfo:
+        image_stack.TiffStack(str(tmp_path / '*.tif'))
+    excinfo.match('matches no files')
+
+
+def test_data_stack():
+    with image_stack.TiffStack('data/HG105_images/noLac_phase_*.tif') \
+            as stack:
+        assert stack.shape == (9, 1040, 1392)
+        assert np.array_equal(stack[4, 100:200],
+                              tifffile.imread(stack.filenames[4])[100:200])
@@ -0,0 +1,84 @@
+import numpy as np
+import ode
+import pytest
+import scipy.integrate
+
+
+def _odeint_lv(y0, t, args):
+    return scipy.integrate.odeint(lambda y, t: ode.lotka_volterra(y, t, *args),
+                                  y0, t, rtol=1e-12, atol=1e-12)
+
+
+def test_rk4_exponential():
+    t = np.linspace(0, 1, 101)
+    t_out, y = ode.rk4(lambda y, t, k: -k * y, [1.0], t, args=(2.0,))
+    assert y.shape == (101, 1)
+    assert np.allclose(y[:, 0], np.exp(-2 * t), atol=1e-8)
+
+
+def test_rk4_decimation():
+    t = np.linspace(0, 10, 1001)
+    args = (1, 0.2, 0.8, 0.3)
+    t_full, y_full = ode.rk4(ode.lotka_volterra, [10, 1], t, args=args)
+    t_out, y = ode.rk4(ode.lotka_volterra, [10, 1], t, args=args, every=100)
+    assert np.array_equal(t_out, t[::100])
+    assert np.array_equal(y, y_full[::100])
+    assert np.allclose(y, _odeint_lv([10, 1], t_out, args), atol=1e-5)
+
+
+def test_rk4_batch():
+    alpha = np.array([0.5, 1.0, 1.5])
+    gamma = np.array([[0.6], [0.8]])
+    t = np.linspace(0, 5, 501)
+    _, y = ode.rk4(ode.lotka_volterra, [10, 1], t,
+                   args=(alpha, 0.2, gamma, 0.3), every=50)
+    assert y.shape == (11, 2, 2, 3)
+    for i in range(2):
+        for j in range(3):
+            ref = _odeint_lv([10, 1], t[::50], (alpha[j], 0.2, gamma[i, 0],
+                                                0.3))
+            assert np.allclose(y[:, :, i, j], ref, atol=1e-5)
+
+
+def test_rk45_batch():
+    rg = np.random.default_rng(3252)
+    n = 20
+    args = (rg.uniform(0.5, 1.5, n), rg.uniform(0.1, 0.3, n),
+            rg.uniform(0.5, 1, n), rg.uniform(0.2, 0.4, n))
+    y0 = np.stack((rg.uniform(5, 15, n), np.ones(n)))
+    t_eval = np.linspace(0, 20, 21)
+    _, y = ode.rk45(ode.lotka_volterra, y0, t_eval, args=args, rtol=1e-10,
+                    atol=1e-12)
+    assert y.shape == (21, 2, n)
+    for i in range(n):
+        ref = _odeint_lv(y0[:, i], t_eval, [arg[i] for arg in args])
+        assert np.allclose(y[:, :, i], ref, rtol=1e-6, atol=1e-6)
+
+
+def test_rk45_scalar():
+    t_eval = np.array([0, 0.5, 3.0])
+    _, y = ode.rk45(lambda y, t: -y, [1.0], t_eval, rtol=1e-10)
+    assert y.shape == (3, 1)
+    assert np.allclose(y[:, 0], np.exp(-t_eval))
+
+
+def test_rk45_errors():
+    with pytest.raises(RuntimeError) as excinfo:
+        ode.rk45(lambda y, t: -y, [1.0], [0, 2, 1])
+    excinfo.match('Output times must be increasing')
+    with pytest.raises(RuntimeError) as excinfo:
+        ode.rk45(lambda y, t: -y, [1.0], [0, 100], max_steps=3)
+    excinfo.match('did not finish')
+
+
+def test_rk45_last_step():
+    # Finishing on the last allowed step is not a failure
+    t, y = ode.rk45(lambda y, t: np.zeros_like(y), [1.0], [0, 1], h0=1,
+                    max_steps=1)
+    assert np.array_equal(y[:, 0], [1, 1])
+
+
+def test_rk45_non_finite():
+    with pytest.raises(RuntimeError) as excinfo:
+        ode.rk45(lambda y, t: np.full_like(y, np.nan), [1.0], [0, 1])
+    excinfo.match('Non-finite state at t = 0.0')
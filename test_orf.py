@@ -0,0 +1,56 @@
+import numpy as np
+import orf
+import pytest
+
+
+def _brute_force_orfs(seq):
+    """ORFs on the forward strand from the earliest ATG before each stop"""
+    orfs = set()
+    for frame in range(3):
+        start = None
+        for i in range(frame, len(seq) - 2, 3):
+            codon = seq[i:i+3]
+            if codon == 'ATG' and start is None:
+                start = i
+            elif codon in ('TAA', 'TAG', 'TGA'):
+                if start is not None:
+                    orfs.add((start, i + 3))
+                start = None
+    return orfs
+
+
+def test_find_orfs_matches_brute_force():
+    rng = np.random.default_rng(0)
+    seq = ''.join(rng.choice(list('ACGT'), size=3000))
+    orfs = orf.find_orfs(seq, strands='+')
+    assert set(zip(orfs['start'], orfs['stop'])) == _brute_force_orfs(seq)
+    assert np.all(orfs['length'] == orfs['stop'] - orfs['start'])
+
+
+def test_find_orfs_minus_strand():
+    # ATG AAA TAG on the reverse strand
+    seq = 'CCCTAtTTCATCC'
+    orfs = orf.find_orfs(seq, strands='-')
+    assert len(orfs) == 1
+    assert orfs[0]['strand'] == -1
+    assert (orfs[0]['start'], orfs[0]['stop']) == (2, 11)
+
+
+def test_find_orfs_min_length():
+    seq = 'ATGTAA' + 'ATG' + 'AAA'*10 + 'TGA'
+    orfs = orf.find_orfs(seq, min_length=10, strands='+')
+    assert len(orfs) == 1
+    assert orfs[0]['length'] == 36
+
+
+def test_longest_orf():
+    assert orf.longest_orf('CCATGAAATAGGG') == 'ATGAAATAG'
+    assert orf.longest_orf('AT') == ''
+    # Partial codons like 'AT' are not starts
+    assert orf.longest_orf('ATTAA') == ''
+
+
+def test_find_orfs_invalid_strand():
+    with pytest.raises(RuntimeError) as excinfo:
+        orf.find_orfs('ATG', strands='x')
+    excinfo.match('x is not a valid strand')
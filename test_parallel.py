@@ -0,0 +1,19 @@
+import os
+
+import numpy as np
+import parallel
+import pytest
+
+
+def test_n_workers():
+    assert parallel.n_workers(1) == 1
+    assert parallel.n_workers(np.int64(3)) == 3
+    assert parallel.n_workers(-1) == os.cpu_count()
+
+    for n_jobs in [0, -2, 1.5, True, None]:
+        with pytest.raises(RuntimeError) as excinfo:
+            parallel.n_workers(n_jobs)
+        excinfo.match(str(n_jobs) + ' is not a valid number of jobs.')
+    with pytest.raises(RuntimeError) as excinfo:
+        parallel.n_workers(0, what='threads')
+    excinfo.match('0 is not a valid number of threads.')
@@ -0,0 +1,112 @@
+import numpy as np
+import pdb_reader
+import pytest
+
+_records = b"""HEADER    TEST
+ATOM      1  N   LYS A   1      18.634  25.437  10.685  1.00  4.81           N
+ATOM      2  CA  LYS A   1      17.984  25.295   9.354  1.00  4.32           C
+ATOM      3  CA AGLY A   2      14.000 -20.000   0.500  0.60  2.00           C
+ATOM      4  CA BGLY A   2      14.100 -20.100   0.600  0.40  2.00           C
+ATOM      5  CA  SER B   7    -100.123-200.456 300.789  1.00 10.00
+TER       6      SER B   7
+HETATM    7  O   HOH B 101       1.000   2.000   3.000  1.00 20.00           O
+END
+"""
+
+
+def test_parse_pdb_columns():
+    struc = pdb_reader.parse_pdb(_records)
+    assert len(struc) == 5
+    assert struc.coords.dtype == np.float32
+    assert np.allclose(struc.coords[3], [-100.123, -200.456, 300.789])
+    assert list(struc.chain) == ['A', 'A', 'A', 'B', 'B']
+    assert list(struc.res_num) == [1, 1, 2, 7, 101]
+    assert list(struc.res_name) == ['LYS', 'LYS', 'GLY', 'SER', 'HOH']
+    assert list(struc.atom_name) == ['N', 'CA', 'CA', 'CA', 'O']
+    assert list(struc.element) == ['N', 'C', 'C', 'C', 'O']
+    assert list(struc.hetero) == [False, False, False, False, True]
+
+
+def test_parse_pdb_alt_locs():
+    # Atoms with only B and C locations keep their first one
+    buf = (b'ATOM      1  CA BSER A   3       1.000   1.000   1.000'
+           b'  0.60  2.00           C\n'
+           b'ATOM      2  CA CSER A   3       2.000   2.000   2.000'
+           b'  0.40  2.00           C\n'
+           b'ATOM      3  CB BSER A   3       3.000   3.000   3.000'
+           b'  0.60  2.00           C\n'
+           b'ATOM      4  CA BSER A   3A      4.000   4.000   4.000'
+           b'  1.00  2.00           C\n')
+    struc = pdb_reader.parse_pdb(buf)
+    assert list(struc.serial) == [1, 3, 4]
+
+
+def test_parse_pdb_first_model():
+    buf = (b'MODEL        1\n' + _records.split(b'TER')[0]
+           + b'ENDMDL\nMODEL        2\n' + _records.split(b'TER')[0]
+           + b'ENDMDL\n')
+    assert len(pdb_reader.parse_pdb(buf)) == 4
+
+
+def test_parse_pdb_line_endings():
+    # DOS line endings, no final newline, and records cut short
+    buf = _records.replace(b'\n', b'\r\n').rstrip() + b'\r\nATOM\r\nHETA'
+    struc = pdb_reader.parse_pdb(buf)
+    expected = pdb_reader.parse_pdb(_records)
+    assert len(struc) == 5
+    assert np.array_equal(struc.coords, expected.coords)
+    assert list(struc.element) == list(expected.element)
+    assert len(pdb_reader.parse_pdb(b'')) == 0
+
+
+def test_select_views():
+    struc = pdb_reader.read_pdb('data/1OLG.pdb')
+    chain_a = struc.select(chain='A')
+    assert set(chain_a.chain) == {'A'}
+    assert np.shares_memory(chain_a.coords, struc.coords)
+
+    segment = chain_a.select(res_range=(330, 339))
+    assert segment.res_num.min() == 330 and segment.res_num.max() == 339
+    assert np.shares_memory(segment.coords, struc.coords)
+
+    ca = struc.select(chain=['A', 'B'], atom_name='CA')
+    assert len(ca) == len(np.unique(ca.residue_ids()))
+    assert set(ca.atom_name) == {'CA'}
+
+
+def test_contacts():
+    rg = np.random.default_rng(3252)
+    coords = rg.uniform(0, 20, size=(300, 3))
+    dists = pdb_reader.distances(coords)
+    i, j = np.nonzero(np.triu(dists <= 3.0, k=1))
+    assert np.array_equal(pdb_reader.contacts(coords, cutoff=3.0),
+                          np.stack((i, j), axis=1))
+
+    other = coords[:50] + 1.0
+    i, j = np.nonzero(pdb_reader.distances(coords, other) <= 3.0)
+    assert np.array_equal(pdb_reader.contacts(coords, other, cutoff=3.0),
+                          np.stack((i, j), axis=1))
+
+
+def test_contact_map():
+    struc = pdb_reader.read_pdb('data/1OLG.pdb').select(chain='A')
+    cmap = pdb_reader.contact_map(struc, cutoff=8.0)
+    ca = struc.select(atom_name='CA')
+    assert np.array_equal(cmap, pdb_reader.distances(ca) <= 8.0)
+
+
+def test_read_pdbs(tmp_path):
+    filenames = []
+    for i in range(3):
+        filename = str(tmp_path / (str(i) + '.pdb'))
+        with open(filename, 'wb') as f:
+            f.write(_records)
+        filenames.append(filename)
+    strucs = pdb_reader.read_pdbs(filenames, n_jobs=2)
+    assert [len(struc) for struc in strucs] == [5, 5, 5]
+    assert np.array_equal(strucs[2].coords,
+                          pdb_reader.parse_pdb(_records).coords)
+
+    with pytest.raises(RuntimeError) as excinfo:
+        pdb_reader.read_pdbs(filenames, n_jobs=True)
+    excinfo.match('True is not a valid number of jobs')
@@ -0,0 +1,75 @@
+import numpy as np
+import rna_fold
+import rna_structure
+import pytest
+
+
+def _max_pairs(seq, min_loop=3):
+    """Reference Nussinov recursion, one cell at a time."""
+    can_pair = rna_structure.pair_matrix(seq, min_loop=min_loop)
+    n = len(seq)
+    N = np.zeros((n + 1, n + 1), dtype=int)
+    for d in range(1, n):
+        for i in range(n - d):
+            j = i + d
+            best = N[i+1, j]
+            for k in range(i + 1, j + 1):
+                if can_pair[i, k]:
+                    best = max(best, 1 + N[i+1, k-1] + N[k+1, j])
+            N[i, j] = best
+    return N[0, n-1] if n > 0 else 0
+
+
+def test_fold_hairpin():
+    struc, energy = rna_fold.fold('GGGAAAUCC')
+    assert struc == '(((...)))'
+    assert energy == -3
+
+
+def test_fold_no_pairs():
+    assert rna_fold.fold('AAAAAA') == ('......', 0.0)
+    assert rna_fold.fold('GCAUC', min_loop=4)[0] == '.....'
+    assert rna_fold.fold('') == ('', 0.0)
+
+
+def test_fold_matches_reference():
+    rg = np.random.default_rng(3252)
+    for _ in range(20):
+        seq = ''.join(rg.choice(list('ACGU'), size=rg.integers(1, 40)))
+        struc, energy = rna_fold.fold(seq)
+        assert rna_structure.rna_ss_validator(seq, struc)
+        assert struc.count('(') == -energy == _max_pairs(seq)
+
+
+def test_fold_stacking():
+    seq = 'GGGGAAAACCCC' + 'A' * 14
+    struc, energy = rna_fold.fold(seq, mode='stacking')
+    assert struc == '((((....))))' + '.' * 14
+    assert np.isclose(energy, rna_fold.loop_energy - 3 * 3.26)
+
+
+def test_fold_stacking_valid():
+    rg = np.random.default_rng(5)
+    seqs = [''.join(rg.choice(list('ACGU'), size=60)) for _ in range(10)]
+    for seq in seqs:
+        struc, energy = rna_fold.fold(seq, mode='stacking', wobble=False)
+        assert rna_structure.rna_ss_validator(seq, struc, wobble=False)
+        assert energy <= 0
+
+
+def test_fold_bad_mode():
+    with pytest.raises(RuntimeError) as excinfo:
+        rna_fold.fold('GGGAAAUCC', mode='zuker')
+    excinfo.match('zuker is not a valid folding mode')
+
+
+def test_fold_batch():
+    rg = np.random.default_rng(42)
+    seqs = [''.join(rg.choice(list('ACGU'), size=30)) for _ in range(6)]
+    expected = [rna_fold.fold(seq, mode='stacking') for seq in seqs]
+    assert rna_fold.fold_batch(seqs, mode='stacking') == expected
+    assert rna_fold.fold_batch(seqs, mode='stacking', n_jobs=2) == expected
+
+    with pytest.raises(RuntimeError) as excinfo:
+        rna_fold.fold_batch(seqs, n_jobs=0)
+    excinfo.match('0 is not a valid number of jobs')
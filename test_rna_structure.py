@@ -0,0 +1,48 @@
+import rna_structure
+import pytest
+
+
+def _stack_pairs(struc):
+    stack, pairs = [], []
+    for i, char in enumerate(struc):
+        if char == '(':
+            stack.append(i)
+        elif char == ')':
+            pairs.append((stack.pop(), i))
+    return sorted(pairs)
+
+
+def test_base_pairs_nested_and_siblings():
+    struc = '((..((...))..((...))))..(((....)))'
+    assert rna_structure.base_pairs(struc) == _stack_pairs(struc)
+
+
+def test_pair_table_indices_above_ten():
+    table = rna_structure.pair_table('.' * 12 + '(...)')
+    assert table[12] == 16 and table[16] == 12
+    assert table[0] == -1
+
+
+def test_pair_table_unbalanced():
+    with pytest.raises(RuntimeError) as excinfo:
+        rna_structure.pair_table('(()')
+    excinfo.match('is not a valid structure')
+    with pytest.raises(RuntimeError):
+        rna_structure.pair_table(')(')
+
+
+def test_rna_ss_validator():
+    assert rna_structure.rna_ss_validator('GCAUCUAUGC', '(((....)))')
+    assert not rna_structure.rna_ss_validator('GCAUCUAUGC', '((((..))))')
+    assert not rna_structure.rna_ss_validator('GCAUCUAUGC', '(((...)))')
+    # G-U wobble pair
+    assert rna_structure.rna_ss_validator('GAAAAU', '(....)')
+    assert not rna_structure.rna_ss_validator('GAAAAU', '(....)',
+                                              wobble=False)
+
+
+def test_validate_structures_batch():
+    seqs = ['GCAUCUAUGC', 'GGAC', 'GGGAAACCC', 'GGGAAACCC', '', 'GAAAC']
+    strucs = ['(((....)))', '(..)..', '(((...)))', '(((.).)))', '', '(...x']
+    assert list(rna_structure.validate_structures(seqs, strucs)) \
+            == [True, False, True, False, True, False]
@@ -0,0 +1,85 @@
+import numpy as np
+import image_stack
+import segmentation
+import tifffile
+import pytest
+
+
+def _disks(n_frames=3, shape=(60, 80)):
+    """Frames of bright disks on a dim, noisy background."""
+    rg = np.random.default_rng(3252)
+    y, x = np.indices(shape)
+    frames = rg.normal(100, 2, size=(n_frames,) + shape)
+    centers = [(15, 20), (40, 55), (45, 15)]
+    radii = []
+    for i in range(n_frames):
+        r = 4 + i
+        for cy, cx in centers:
+            frames[i][(y - cy)**2 + (x - cx)**2 <= r**2] += 200
+        radii.append(r)
+    return frames, centers, radii
+
+
+def test_otsu_threshold():
+    rg = np.random.default_rng(42)
+    im = np.concatenate((rg.normal(10, 1, 1000), rg.normal(50, 1, 200)))
+    thresh = segmentation.otsu_threshold(im)
+    assert 20 < thresh < 40 and (im > thresh).sum() == 200
+    assert segmentation.otsu_threshold(np.ones(10)) >= 1
+
+
+def test_measure():
+    labels = np.array([[0, 1, 1], [2, 0, 1], [2, 2, 0]])
+    im = np.arange(9).reshape(3, 3)
+    area, mean_intensity = segmentation.measure(labels, im)
+    assert np.array_equal(area, [3, 3])
+    assert np.allclose(mean_intensity, [(1 + 2 + 5) / 3, (3 + 6 + 7) / 3])
+
+
+def test_segment_fixed_and_dark():
+    frames, centers, radii = _disks(1)
+    labels, n_objects = segmentation.segment(frames[0], thresh=150,
+                                             sigma=None)
+    assert n_objects == 3
+    labels, n_objects = segmentation.segment(-frames[0], thresh=-150,
+                                             sigma=None, dark_objects=True)
+    assert n_objects == 3
+
+
+def test_segment_stack():
+    frames, centers, radii = _disks()
+    df = segmentation.segment_stack(frames, sigma=None)
+    assert list(df.columns) == ['frame', 'object', 'area', 'mean_intensity']
+    assert np.array_equal(df.groupby('frame').size(), [3, 3, 3])
+
+    # Areas grow with the radius of the disks
+    areas = df.groupby('frame')['area'].mean().values
+    assert np.all(np.abs(areas - np.pi * np.array(radii)**2) < 2 * np.pi
+                  * np.array(radii))
+    assert np.all(df['mean_intensity'] > 250)
+
+
+def test_segment_stack_parallel(tmp_path):
+    frames, _, _ = _disks(4)
+    frames = frames.astype(np.uint16)
+    for i, frame in enumerate(frames):
+        tifffile.imwrite(str(tmp_path / 'f_{0:02d}.tif'.format(i)), frame)
+
+    df = segmentation.segment_stack(frames, sigma=10, min_area=5)
+    with image_stack.TiffStack(str(tmp_path / 'f_*.tif')) as stack:
+        assert df.equals(segmentation.segment_stack(stack, sigma=10,
+                                                    min_area=5, n_jobs=2))
+    assert df.equals(segmentation.segment_stack(frames, sigma=10, min_area=5,
+                                                n_jobs=2))
+
+
+def test_segment_stack_empty():
+    df = segmentation.segment_stack(np.zeros((0, 5, 5)))
+    assert len(df) == 0
+    assert list(df.columns) == ['frame', 'object', 'area', 'mean_intensity']
+
+
+def test_segment_stack_bad_n_jobs():
+    with pytest.raises(RuntimeError) as excinfo:
+        segmentation.segment_stack(np.zeros((2, 5, 5)), n_jobs=-2)
+    excinfo.match('-2 is not a valid number of jobs')
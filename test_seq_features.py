@@ -27,3 +27,33 @@ def test_n_neg_for_invalid_amino_acid():
     with pytest.raises(RuntimeError) as excinfo:
         sf.n_neg('X')
     excinfo.match("X is not a valid amino acid")
+
+
+def test_residue_counts():
+    counts = sf.residue_counts(['AAC', '', 'wk'])
+    assert counts.shape == (3, 20)
+    assert counts[0, sf.amino_acids.index('A')] == 2
+    assert counts[1].sum() == 0
+    assert counts[2, sf.amino_acids.index('W')] == 1
+
+
+def test_protein_features_n_neg_matches():
+    seqs = ['ACKLWTTAE', 'DDDDEEEE', 'acklwttae', '']
+    features = sf.protein_features(seqs)
+    assert list(features['n_neg']) == [sf.n_neg(seq) for seq in seqs]
+    assert list(features['n_pos']) == [1, 0, 1, 0]
+
+
+def test_protein_features_charge_and_pI():
+    features = sf.protein_features(['KKKK', 'DDDD', 'G'])
+    assert features['charge'][0] > 3 and features['charge'][1] < -3
+    assert features['pI'][0] > 10 and features['pI'][1] < 4
+    # Glycine alone is neutral half way between its terminal pKa's
+    assert abs(features['pI'][2] - (9.69 + 2.34) / 2) < 1e-3
+    assert abs(features['mw'][2] - 75.067) < 1e-2
+
+
+def test_protein_features_invalid_amino_acid():
+    with pytest.raises(RuntimeError) as excinfo:
+        sf.protein_features(['ACD', 'AXC'])
+    excinfo.match("X is not a valid amino acid")
@@ -0,0 +1,96 @@
+import numpy as np
+import spikes
+import pytest
+
+
+def _recording(n=20000, seed=3252):
+    """Gaussian noise with downward spikes at known samples."""
+    rg = np.random.default_rng(seed)
+    t = np.arange(n) * 0.05
+    V = rg.normal(0, 5, n)
+    spike_inds = np.array([100, 150, 1000, 1010, 5000, 19990])
+    for i in spike_inds:
+        V[i:i+3] -= [80, 60, 30]
+    return t, V, spike_inds
+
+
+def test_running_mad():
+    rg = np.random.default_rng(42)
+    x = rg.normal(3, 2, 10001)
+    mad = spikes.RunningMAD(resolution=0.001)
+    for chunk in np.array_split(x, 7):
+        mad.update(chunk)
+    mad.update([np.nan])
+    median = np.median(x)
+    assert abs(mad.median() - median) <= 0.001
+    assert abs(mad.mad() - np.median(np.abs(x - median))) <= 0.002
+    assert abs(mad.std() - 2) < 0.1
+
+
+def test_running_mad_artifacts():
+    rg = np.random.default_rng(5230)
+    x = rg.normal(2.0, 1.0, 10000)
+    mad = spikes.RunningMAD(resolution=0.01, max_bins=1000)
+    mad.update(np.concatenate(([1e7, -np.inf], x[:5000])))
+    mad.update(np.concatenate((x[5000:], [1e300])))
+
+    # Far-off values land in the edge bins
+    assert len(mad.counts) <= 1000
+    assert mad.n == 10003
+    assert abs(mad.median() - np.median(x)) < 0.02
+    assert abs(mad.mad() - np.median(np.abs(x - np.median(x)))) < 0.02
+
+
+def test_detector_chunking():
+    t, V, spike_inds = _recording()
+    out = []
+    for chunk_size in [len(t), 1000, 37, 3]:
+        detector = spikes.SpikeDetector(thresh=-40, refractory=1.0, pre=5,
+                                        post=12, max_spikes=2)
+        for i in range(0, len(t), chunk_size):
+            detector.update(t[i:i+chunk_size], V[i:i+chunk_size])
+        out.append(detector.finish())
+
+    # 1010 is within 1 ms of 1000; 19990 runs off the end
+    spike_times, snippets = out[0]
+    assert np.array_equal(spike_times, t[[100, 150, 1000, 5000, 19990]])
+    assert np.array_equal(snippets[0], V[95:112])
+    assert np.all(np.isnan(snippets[-1, -2:]))
+    for spike_times_chunked, snippets_chunked in out[1:]:
+        assert np.array_equal(spike_times_chunked, spike_times)
+        assert np.array_equal(snippets_chunked, snippets, equal_nan=True)
+
+
+def test_detector_noise_threshold():
+    t, V, spike_inds = _recording()
+    detector = spikes.SpikeDetector(n_sigmas=5, refractory=0.1)
+    detector.update(t, V)
+    spike_times, _ = detector.finish()
+    assert np.array_equal(spike_times, t[spike_inds])
+    assert abs(detector.noise.std() - 5) < 0.2
+
+    detector = spikes.SpikeDetector(sign=1, refractory=0.1)
+    detector.update(t, -V)
+    assert np.array_equal(detector.finish()[0], t[spike_inds])
+
+
+def test_detect_spikes_file(tmp_path):
+    t, V, spike_inds = _recording()
+    filename = str(tmp_path / 'rec.csv')
+    with open(filename, 'w') as f:
+        f.write('# comment\nt (ms),V (µV)\n')
+        np.savetxt(f, np.stack((t, V), axis=1), delimiter=',')
+    spike_times, snippets = spikes.detect_spikes(filename, chunk_size=999,
+                                                 refractory=0.1)
+    assert np.allclose(spike_times, t[spike_inds])
+    assert snippets.shape == (len(spike_inds), 40)
+
+
+def test_detector_errors():
+    with pytest.raises(RuntimeError) as excinfo:
+        spikes.SpikeDetector(sign=0)
+    excinfo.match('0 is not a valid spike sign')
+    detector = spikes.SpikeDetector()
+    detector.finish()
+    with pytest.raises(RuntimeError):
+        detector.update([1.0], [1.0])
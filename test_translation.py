@@ -0,0 +1,39 @@
+import bioinfo_dicts
+import translation
+import pytest
+
+
+def _translate_slices(seq, frame=0):
+    return ''.join(bioinfo_dicts.codons[seq[i:i+3]]
+                   for i in range(frame, len(seq) - 2, 3))
+
+
+def test_translate_matches_codon_dict():
+    seq = ''.join(bioinfo_dicts.codons) + 'ACGTA'
+    for frame in range(3):
+        assert translation.translate(seq, frame=frame) \
+                == _translate_slices(seq, frame=frame)
+
+
+def test_translate_lower_case_and_ambiguous():
+    assert translation.translate('atgNNNtaa') == 'MX*'
+
+
+def test_translate_frames():
+    frames = translation.translate_frames('ATGAAATAG')
+    assert len(frames) == 6
+    assert frames[0] == 'MK*'
+    # Reverse complement is CTATTTCAT
+    assert frames[3] == 'LFH'
+
+
+def test_alternative_genetic_code():
+    # TGA codes for Trp in vertebrate mitochondria
+    assert translation.translate('TGAAGA', table=2) == 'W*'
+    assert translation.translate('TGAAGA', table=11) == '*R'
+
+
+def test_invalid_genetic_code():
+    with pytest.raises(RuntimeError) as excinfo:
+        translation.translate('ATG', table=99)
+    excinfo.match('99 is not a valid genetic code')
@@ -0,0 +1,114 @@
+"""
+Translating DNA sequences to protein with lookup tables.
+"""
+import numpy as np
+
+import bioinfo_dicts
+import orf
+
+# Amino acids coded for by the codons in TCAG order (* = STOP codon) for
+# alternative genetic codes, keyed by NCBI translation table number.
+# The standard code (table 1) comes from bioinfo_dicts.codons.
+genetic_codes = {
+    2: 'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSS**VVVVAAAADDEEGGGG',
+    3: 'FFLLSSSSYY**CCWWTTTTPPPPHHQQRRRRIIMMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+    4: 'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+    5: 'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSSSSVVVVAAAADDEEGGGG',
+    11: ''.join(bioinfo_dicts.codons.values()),
+}
+
+
+def codon_table(table=1):
+    """
+    Build a lookup array from codon index to amino acid.
+
+    Parameters
+    ----------
+    table : int or dict, default 1
+        NCBI translation table number, or a dict mapping all 64
+        codons to one-letter amino acids, like `bioinfo_dicts.codons`.
+
+    Returns
+    -------
+    output : ndarray
+        uint8 array of length 65. Entry i is the ASCII code of the
+        amino acid of codon index i (see `orf.codon_indices()`). The
+        last entry is 'X', for codons with a non-ACGT base.
+    """
+    if table == 1:
+        table = bioinfo_dicts.codons
+    elif not isinstance(table, dict):
+        if table not in genetic_codes:
+            raise RuntimeError(str(table) + ' is not a valid genetic code.')
+        table = dict(zip(bioinfo_dicts.codons, genetic_codes[table]))
+
+    # Codon index of each codon, in TCAG order
+    lookup = np.full(65, ord('X'), dtype=np.uint8)
+    for codon, amino_acid in table.items():
+        ind = orf.codon_indices(orf.encode(codon.upper()), 0)[0]
+        lookup[ind] = ord(amino_acid)
+
+    return lookup
+
+
+def _translate_codes(codes, frame, lookup):
+    """Translate a frame of base codes with a lookup array."""
+    return lookup[orf.codon_indices(codes, frame)].tobytes().decode('ascii')
+
+
+def translate(seq, frame=0, table=1):
+    """
+    Translate a DNA sequence.
+
+    Parameters
+    ----------
+    seq : str, bytes, or ndarray
+        DNA sequence.
+    frame : int, default 0
+        Offset of the first codon, 0, 1, or 2.
+    table : int or dict, default 1
+        Genetic code. See `codon_table()`.
+
+    Returns
+    -------
+    output : str
+        Protein sequence, with '*' for stop codons and 'X' for codons
+        containing a non-ACGT base. A trailing partial codon is
+        ignored.
+    """
+    return _translate_codes(orf.encode(seq), frame, codon_table(table))
+
+
+def translate_frames(seq, n_frames=6, table=1):
+    """
+    Translate a DNA sequence in three or six reading frames.
+
+    Parameters
+    ----------
+    seq : str, bytes, or ndarray
+        DNA sequence.
+    n_frames : int, default 6
+        If 3, translate the forward strand only. If 6, also translate
+        the reverse complement.
+    table : int or dict, default 1
+        Genetic code. See `codon_table()`.
+
+    Returns
+    -------
+    output : list of str
+        Protein sequences of frames 0, 1, 2 of the forward strand,
+        followed by those of the reverse complement if `n_frames` is 6.
+    """
+    if n_frames not in (3, 6):
+        raise RuntimeError('Number of frames must be 3 or 6.')
+
+    codes = orf.encode(seq)
+    lookup = codon_table(table)
+
+    strands = [codes]
+    if n_frames == 6:
+        # Complement swaps T <-> A and C <-> G, which is flipping bit 1
+        strands.append(codes[::-1] ^ 2)
+
+    return [_translate_codes(strand, frame, lookup)
+            for strand in strands for frame in range(3)]